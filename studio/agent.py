@@ -4,6 +4,9 @@ from langchain_openai import ChatOpenAI
 from langgraph.graph import START, StateGraph, MessagesState
 from langgraph.prebuilt import tools_condition, ToolNode
 
+from llm_router import make_router
+from tool_executor import offload_cpu_bound
+
 
 def add(a: int, b: int) -> int:
     """Adds a and b.
@@ -38,7 +41,7 @@ def divide(a: int, b: int) -> float:
 tools = [add, multiply, divide]
 
 # Define LLM with bound tools
-llm = ChatOpenAI(model="gpt-4o-mini")
+llm = make_router(ChatOpenAI(model="gpt-4o-mini"))
 llm_with_tools = llm.bind_tools(tools)
 
 # System message
@@ -55,7 +58,7 @@ def assistant(state: MessagesState):
 # Build graph
 builder = StateGraph(MessagesState)
 builder.add_node("assistant", assistant)
-builder.add_node("tools", ToolNode(tools))
+builder.add_node("tools", ToolNode(offload_cpu_bound(tools)))
 builder.add_edge(START, "assistant")
 builder.add_conditional_edges(
     "assistant",
@@ -1,9 +1,15 @@
-from langchain_core.messages import SystemMessage
+import os
+import re
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
 
 from langgraph.graph import START, StateGraph, MessagesState
 from langgraph.prebuilt import tools_condition, ToolNode
 
+from llm_router import make_router
+from tool_executor import offload_cpu_bound
+
 # Nodefrom langgraph.graph import START, StateGraph
 from langgraph.checkpoint.memory import MemorySaver
 
@@ -41,10 +47,62 @@ def divide(a: int, b: int) -> float:
 tools = [add, multiply, divide]
 
 # Define LLM with bound tools
-llm = ChatOpenAI(model="gpt-4o-mini")
+llm = make_router(ChatOpenAI(model="gpt-4o-mini"))
 llm_with_tools = llm.bind_tools(tools)
 
 
+# How the request is confirmed before tools run:
+#   llm      - a model call rephrases the request as a rhetorical question, then pause
+#   template - the request is parsed locally into planned calls, no model call, then pause
+#   batched  - the assistant plans the tool calls, the confirmation is built from them, pause before tools
+CONFIRM_MODE = os.environ.get("CONFIRM_MODE", "llm")
+
+OPERATIONS = {
+    "add": (re.compile(r"\+|\badd|\bplus\b|\bsum\b"), "add {a} and {b}"),
+    "multiply": (re.compile(r"[*×]|\bmultipl|\btimes\b|\bproduct\b"), "multiply {a} by {b}"),
+    "divide": (re.compile(r"[/÷]|\bdivide"), "divide {a} by {b}"),
+}
+_number_re = re.compile(r"-?\d+(?:\.\d+)?")
+_step_re = re.compile(r"\bthen\b|[;,]")
+RESULT = "the result"
+
+
+def parse_request(text: str):
+    """Parse an arithmetic request into planned tool calls.
+
+    Steps are split on "then", commas and semicolons; a step with a single
+    number applies to the previous result. Returns [] if any step is not
+    understood: no operation, more than one operator, more than two
+    numbers or a decimal (the tools take ints).
+    """
+    calls = []
+    for step in filter(None, (s.strip() for s in _step_re.split(text.lower()))):
+        names = [n for n, (pattern, _) in OPERATIONS.items() if pattern.search(step)]
+        operators = sum(len(pattern.findall(step)) for pattern, _ in OPERATIONS.values())
+        found = _number_re.findall(step)
+        # Showing a partial or guessed plan would get approval for something else
+        if len(names) != 1 or operators != 1 or len(found) > 2 or any("." in n for n in found):
+            return []
+        name, numbers = names[0], [int(n) for n in found]
+        if len(numbers) == 2:
+            args = {"a": numbers[0], "b": numbers[1]}
+        elif len(numbers) == 1 and calls:
+            args = {"a": RESULT, "b": numbers[0]}
+        else:
+            return []
+        calls.append({"name": name, "args": args})
+    return calls
+
+
+def describe_calls(calls) -> str:
+    steps = [OPERATIONS[c["name"]][1].format(**c["args"]) if c["name"] in OPERATIONS else c["name"] for c in calls]
+    return ", then ".join(steps)
+
+
+def last_request(state: MessagesState) -> str:
+    return next((m.content for m in reversed(state["messages"]) if isinstance(m, HumanMessage)), "")
+
+
 # Node
 def confirm(state: MessagesState):
     # System message
@@ -55,6 +113,17 @@ def confirm(state: MessagesState):
     return {"messages": [llm_with_tools.invoke([sys_msg] + state["messages"])]}
 
 
+# Node
+def confirm_template(state: MessagesState):
+    request = last_request(state)
+    calls = parse_request(request)
+    if calls:
+        question = f"Do you really want me to {describe_calls(calls)}?"
+    else:
+        question = f"Do you really want me to work out \"{request}\"?"
+    return {"messages": [AIMessage(content=question)]}
+
+
 # Node
 def assistant(state: MessagesState):
     sys_msg = SystemMessage(
@@ -63,24 +132,41 @@ def assistant(state: MessagesState):
     return {"messages": [llm_with_tools.invoke([sys_msg] + state["messages"])]}
 
 
-# Graph
-builder = StateGraph(MessagesState)
-
-# Define nodes: these do the work
-builder.add_node("assistant", assistant)
-builder.add_node("confirm", confirm)
-builder.add_node("tools", ToolNode(tools))
-
-# Define edges: these determine how the control flow moves
-builder.add_edge(START, "confirm")
-builder.add_edge("confirm", "assistant")
-builder.add_conditional_edges(
-    "assistant",
-    # If the latest message (result) from assistant is a tool call -> tools_condition routes to tools
-    # If the latest message (result) from assistant is a not a tool call -> tools_condition routes to END
-    tools_condition,
-)
-builder.add_edge("tools", "assistant")
+# Node
+def plan_and_confirm(state: MessagesState):
+    # The planning call doubles as the confirmation: the question is built from its tool calls
+    message = assistant(state)["messages"][0]
+    if message.tool_calls:
+        message.content = f"Do you really want me to {describe_calls(message.tool_calls)}?"
+    return {"messages": [message]}
+
+
+def build_graph(mode: str = CONFIRM_MODE, checkpointer=None):
+    builder = StateGraph(MessagesState)
+    builder.add_node("tools", ToolNode(offload_cpu_bound(tools)))
+
+    if mode == "batched":
+        builder.add_node("assistant", plan_and_confirm)
+        builder.add_edge(START, "assistant")
+        builder.add_conditional_edges("assistant", tools_condition)
+        builder.add_edge("tools", "assistant")
+        return builder.compile(checkpointer=checkpointer, interrupt_before=["tools"])
+
+    # Define nodes: these do the work
+    builder.add_node("assistant", assistant)
+    builder.add_node("confirm", confirm_template if mode == "template" else confirm)
+
+    # Define edges: these determine how the control flow moves
+    builder.add_edge(START, "confirm")
+    builder.add_edge("confirm", "assistant")
+    builder.add_conditional_edges(
+        "assistant",
+        # If the latest message (result) from assistant is a tool call -> tools_condition routes to tools
+        # If the latest message (result) from assistant is a not a tool call -> tools_condition routes to END
+        tools_condition,
+    )
+    builder.add_edge("tools", "assistant")
+    return builder.compile(checkpointer=checkpointer, interrupt_before=["assistant"])
 
 
-graph = builder.compile(interrupt_before=["assistant"])
+graph = build_graph()
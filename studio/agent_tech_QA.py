@@ -4,28 +4,19 @@ from langchain_openai import ChatOpenAI
 from langgraph.graph import START, StateGraph, MessagesState
 from langgraph.prebuilt import tools_condition, ToolNode
 
+from blob_store import resolve, store_large_results
+from doc_registry import bind_doc_tools, make_find_document_tool
+from llm_router import make_router
+from single_flight import coalesce_tool
 
-def find_document(type: str) -> str:
-    """Finds the tech document based on the type.
-
-    Args:
-        type: the type of tech document to find only include "frontend", "backend"
-    """
-    if type == "frontend":
-        with open("./tech_doc/frontend.md", "r", encoding="utf-8") as file:
-            return file.read()  # read file from frontend.md
-    elif type == "backend":
-        with open("./tech_doc/backend.md", "r", encoding="utf-8") as file:
-            return file.read()  # read file from backend.md
-    else:
-        raise ValueError("Unsupported type. Only 'frontend' and 'backend' are allowed.")
 
+# Document tool generated from the tech_doc/ registry; concurrent identical lookups run once
+find_document = coalesce_tool(make_find_document_tool("find_document", "type"))
 
 tools = [find_document]
 
-# Define LLM with bound tools
-llm = ChatOpenAI(model="gpt-4o-mini")
-llm_with_tools = llm.bind_tools(tools)
+# Define LLM, tools are bound per call from the doc registry
+llm = make_router(ChatOpenAI(model="gpt-4o-mini"))
 
 
 # Node
@@ -35,7 +26,7 @@ def confirm(state: MessagesState):
         content="What ever user asked, you should confirm it by a rhetorical question."
     )
 
-    return {"messages": [llm_with_tools.invoke([sys_msg] + state["messages"])]}
+    return {"messages": [bind_doc_tools(llm, tools).invoke([sys_msg] + resolve(state["messages"]))]}
 
 
 # Node
@@ -45,7 +36,7 @@ def assistant(state: MessagesState):
 You will act as a senior [Frontend/Backend] Web Programmer. Should answer the user's question based on the tech document provided.
 """
     )
-    return {"messages": [llm_with_tools.invoke([sys_msg] + state["messages"])]}
+    return {"messages": [bind_doc_tools(llm, tools).invoke([sys_msg] + resolve(state["messages"]))]}
 
 
 # Graph
@@ -53,7 +44,8 @@ builder = StateGraph(MessagesState)
 
 # Define nodes: these do the work
 builder.add_node("assistant", assistant)
-builder.add_node("tools", ToolNode(tools))
+# Documents are stored once in the blob store; state keeps references
+builder.add_node("tools", store_large_results(ToolNode(tools)))
 
 # Define edges: these determine how the control flow moves
 builder.add_edge(START, "assistant")
@@ -1,36 +1,79 @@
 import asyncio
+import logging
 import os
 import subprocess
+import time
 from langchain_core.messages import SystemMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import START, StateGraph, MessagesState
 from langgraph.prebuilt import tools_condition, ToolNode
 from langchain_mcp_adapters.client import MultiServerMCPClient
 
+from blob_store import resolve, store_large_results
+from doc_client import DocClient
+from llm_router import make_router
+from profiling import profiled
+from single_flight import coalesce_tool
+from tool_cache import bound_model
+from tool_retrieval import called_tools, retriever_for
+
+logger = logging.getLogger(__name__)
+
+# 每轮只绑定与问题最相关的k个工具（0表示绑定全部工具）
+TOOL_TOP_K = int(os.environ.get("MCP_TOOL_TOP_K") or 8)
+
+# 离线模式：用本地fake_mcp_server替代远程文档服务（用于CI和压测）
+MCP_OFFLINE = os.environ.get("MCP_OFFLINE", "").lower() in ("1", "true", "yes")
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def fake_server(profile: str, url_env: str):
+    """本地假服务配置：设置了URL则连接已启动的HTTP服务，否则通过stdio启动"""
+    url = os.environ.get(url_env)
+    if url:
+        return {"transport": "streamable_http", "url": url}
+    return {
+        "command": "python",
+        "args": [os.path.join(current_dir, "fake_mcp_server.py"), "--profile", profile],
+        "transport": "stdio",
+        # stdio子进程不继承环境变量，需显式传入假服务的延迟/错误率等配置
+        "env": {k: v for k, v in os.environ.items() if k.startswith("FAKE_MCP_")},
+    }
+
+
+def mcp_servers():
+    """MCP服务配置"""
+    servers = {
+        "read_arch_doc": {
+            "command": "python",
+            # "args": ["mcp_server.py"],
+            "args": ["mcp_from_scratch.py"],
+            "transport": "stdio",
+        },
+        "microsoft.docs.mcp": {
+            "transport": "streamable_http",
+            "url": "https://learn.microsoft.com/api/mcp",
+        },
+        "awslabs.aws-documentation-mcp-server": {
+            "command": "uvx",
+            "args": ["awslabs.aws-documentation-mcp-server@latest"],
+            "transport": "stdio"
+        }
+    }
+    # 设置了ARCH_DOC_MCP_URL时连接共享的HTTP文档服务，不再为每个worker启动子进程
+    if os.environ.get("ARCH_DOC_MCP_URL"):
+        servers["read_arch_doc"] = {"transport": "streamable_http", "url": os.environ["ARCH_DOC_MCP_URL"]}
+    if MCP_OFFLINE:
+        servers["microsoft.docs.mcp"] = fake_server("microsoft", "FAKE_MCP_MICROSOFT_URL")
+        servers["awslabs.aws-documentation-mcp-server"] = fake_server("aws", "FAKE_MCP_AWS_URL")
+    return servers
+
+
 # 创建MCP客户端
 def create_mcp_client():
     """创建MCP客户端"""
     try:
-        client = MultiServerMCPClient(
-            {
-                "read_arch_doc": {
-                    "command": "python",
-                    # "args": ["mcp_server.py"],
-                    "args": ["mcp_from_scratch.py"],
-                    "transport": "stdio",
-                },
-                "microsoft.docs.mcp": {
-                    "transport": "streamable_http",
-                    "url": "https://learn.microsoft.com/api/mcp",
-                },
-                "awslabs.aws-documentation-mcp-server": {
-                    "command": "uvx",
-                    "args": ["awslabs.aws-documentation-mcp-server@latest"],
-                    "transport": "streamable_http",
-                    "transport": "stdio"
-                }
-            }
-        )
+        client = MultiServerMCPClient(mcp_servers())
         print("✅ MCP客户端创建成功")
         return client
     except Exception as e:
@@ -43,22 +86,27 @@ client = create_mcp_client()
 
 # 全局变量存储工具和LLM
 tools = []
+llm = None
 llm_with_tools = None
 
 async def initialize_tools():
     """初始化工具和LLM"""
-    global tools, llm_with_tools
+    global tools, llm, llm_with_tools
     
     # 获取MCP工具
     mcp_tools = await client.get_tools()
+    # 共享HTTP文档服务：文档按ETag条件请求读取，未变化的文档只返回304
+    if os.environ.get("ARCH_DOC_MCP_URL"):
+        doc_client = DocClient.from_mcp_url(os.environ["ARCH_DOC_MCP_URL"])
+        mcp_tools = [doc_client.wrap_tool(t) if t.name == "read_document_with_mcp" else t for t in mcp_tools]
     
-    # 合并工具列表
-    tools = mcp_tools
+    # 合并工具列表；多个会话同时发起的相同工具调用只请求一次MCP服务
+    tools = [coalesce_tool(t) for t in mcp_tools]
     print(f"📦 总工具数量: {len(tools)}")
     
     # 定义LLM并绑定工具
-    llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", thinking_budget=0)
-    llm_with_tools = llm.bind_tools(tools)
+    llm = make_router(ChatGoogleGenerativeAI(model="gemini-2.5-flash", thinking_budget=0))
+    llm_with_tools = bound_model(llm, tools)
     
     return tools, llm_with_tools
 
@@ -73,18 +121,33 @@ def initialize_tools_sync():
         #     print(f"❌ 初始化工具失败: {e}")
     return tools, llm_with_tools
 
+sys_msg = SystemMessage(
+    content="""
+You will act as a senior [Frontend/Backend] Web Programmer. Should answer the user's question based on the tech document provided.
+"""
+)
+
+def call_model(messages, top_k: int = TOOL_TOP_K):
+    """按问题检索工具后调用LLM，返回(回复, 绑定的工具数, 耗时)"""
+    # 已调用过的工具始终保留，保证多轮工具调用可以继续
+    question = next((m.content for m in reversed(messages) if m.type == "human"), "")
+    selected = retriever_for(tools).select(str(question), top_k, called_tools(messages))
+    # 相同的工具子集复用同一个绑定好的模型
+    model = llm_with_tools if len(selected) == len(tools) else bound_model(llm, selected)
+    start = time.perf_counter()
+    response = model.invoke([sys_msg] + resolve(messages))
+    return response, len(selected), time.perf_counter() - start
+
 # Node
 def assistant(state: MessagesState):
     # 确保工具已初始化
     if llm_with_tools is None:
         initialize_tools_sync()
-    
-    sys_msg = SystemMessage(
-        content="""
-You will act as a senior [Frontend/Backend] Web Programmer. Should answer the user's question based on the tech document provided.
-"""
-    )
-    return {"messages": [llm_with_tools.invoke([sys_msg] + state["messages"])]}
+
+    response, n_tools, elapsed = call_model(state["messages"])
+    usage = response.usage_metadata or {}
+    logger.debug(f"绑定工具 {n_tools}/{len(tools)}，输入tokens: {usage.get('input_tokens', '?')}，耗时: {elapsed:.2f}s")
+    return {"messages": [response]}
 
 # 初始化工具
 initialize_tools_sync()
@@ -93,8 +156,10 @@ initialize_tools_sync()
 builder = StateGraph(MessagesState)
 
 # Define nodes: these do the work
-builder.add_node("assistant", assistant)
-builder.add_node("tools", ToolNode(tools))
+# configurable.profile=true 时对该次运行采样，火焰图写入PROFILE_DIR
+builder.add_node("assistant", profiled(assistant, "assistant"))
+# 大的工具结果只在blob存储中保存一份，状态中保存引用
+builder.add_node("tools", profiled(store_large_results(ToolNode(tools)), "tools"))
 
 # Define edges: these determine how the control flow moves
 builder.add_edge(START, "assistant")
@@ -6,30 +6,20 @@ import json
 
 from langgraph.graph import START, StateGraph, MessagesState, END
 from langgraph.prebuilt import tools_condition, ToolNode
-from langchain_core.tools import tool
 
-@tool
-def find_document(layer: str) -> str:
-    """Finds the tech document based on the layer.
+from blob_store import blob_store, resolve
+from doc_registry import bind_doc_tools, make_find_document_tool
+from llm_router import make_router
+from single_flight import coalesce_tool
 
-    Args:
-        layer: the layer of tech document to find only include "frontend", "backend"
-    """
-    if layer == "frontend":
-        with open("./tech_doc/frontend.md", "r", encoding="utf-8") as file:
-            return file.read()  # read file from frontend.md
-    elif layer == "backend":
-        with open("./tech_doc/backend.md", "r", encoding="utf-8") as file:
-            return file.read()  # read file from backend.md
-    else:
-        raise ValueError("Unsupported layer. Only 'frontend' and 'backend' are allowed.")
+# Document tool generated from the tech_doc/ registry; concurrent identical lookups run once
+find_document = coalesce_tool(make_find_document_tool("find_document", "layer"))
 
 
 tools = [find_document]
 
-# Define LLM with bound tools
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash",thinking_budget=0)
-llm_with_tools = llm.bind_tools(tools)
+# Define LLM, tools are bound per call from the doc registry
+llm = make_router(ChatGoogleGenerativeAI(model="gemini-2.5-flash",thinking_budget=0))
 
 
 
@@ -40,7 +30,7 @@ def assistant(state: MessagesState):
 You will act as a senior [Frontend/Backend] Web Programmer. Should answer the user's question based on the tech document provided.
 """
     )
-    return {"messages": [llm_with_tools.invoke([sys_msg] + state["messages"])]}
+    return {"messages": [bind_doc_tools(llm, tools).invoke([sys_msg] + resolve(state["messages"]))]}
 class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], add_messages]
 
@@ -50,10 +40,13 @@ def tool_node(state: AgentState):
     for tool_call in state["messages"][-1].tool_calls:
         tool_result = tools_by_name[tool_call["name"]].invoke(tool_call["args"])
         outputs.append(
-            ToolMessage(
-                content=json.dumps(tool_result),
-                name=tool_call["name"],
-                tool_call_id=tool_call["id"],
+            # Large documents go to the blob store; state keeps a reference
+            blob_store.externalize(
+                ToolMessage(
+                    content=json.dumps(tool_result),
+                    name=tool_call["name"],
+                    tool_call_id=tool_call["id"],
+                )
             )
         )
     return {"messages": outputs}
@@ -1,31 +1,36 @@
-from langchain_core.messages import SystemMessage
+import re
+from typing import Annotated, Optional
+from typing_extensions import TypedDict
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 from langchain_openai import ChatOpenAI
 
-from langgraph.graph import START, StateGraph, MessagesState
+from langgraph.graph import START, END, StateGraph, MessagesState
+from langgraph.config import get_stream_writer
+from langgraph.types import Send
 from langgraph.prebuilt import tools_condition, ToolNode
 
+from blob_store import resolve, store_large_results
+from component_graph import (
+    Component,
+    ComponentGraph,
+    ComponentStreamParser,
+    TaskSplit,
+    render_component,
+    validate_components,
+)
+from doc_prefetch import classifier, prefetch, requested_layers, stats
+from doc_registry import bind_doc_tools, make_find_document_tool, registry
+from llm_router import make_router
 
-def find_document(type: str) -> str:
-    """Finds the tech document based on the type.
-
-    Args:
-        type: the type of tech document to find only include "frontend", "backend"
-    """
-    if type == "frontend":
-        with open("./tech_doc/frontend.md", "r", encoding="utf-8") as file:
-            return file.read()  # read file from frontend.md
-    elif type == "backend":
-        with open("./tech_doc/backend.md", "r", encoding="utf-8") as file:
-            return file.read()  # read file from backend.md
-    else:
-        raise ValueError("Unsupported type. Only 'frontend' and 'backend' are allowed.")
 
+# Document tool generated from the tech_doc/ registry
+find_document = make_find_document_tool("find_document", "type")
 
 tools = [find_document]
 
-# Define LLM with bound tools
-llm = ChatOpenAI(model="gpt-4o-mini")
-llm_with_tools = llm.bind_tools(tools)
+# Define LLM, tools are bound per call from the doc registry
+llm = make_router(ChatOpenAI(model="gpt-4o-mini"))
 
 
 # Node
@@ -35,23 +40,10 @@ def confirm(state: MessagesState):
         content="What ever user asked, you should confirm it by a rhetorical question."
     )
 
-    return {"messages": [llm_with_tools.invoke([sys_msg] + state["messages"])]}
-
-
-# Node
-def assistant(state: MessagesState):
-    sys_msg = SystemMessage(
-        content="""
-You will act as a senior [Frontend/Backend] Web Programmer. Your mission is to generate a detailed implementation strategy for a given user story, based on the context provided in a knowledge base.
-
-Important Note: The term 'component' used below refers to an architectural component (e.g., a Controller, Service, Repository, API Client), not a UI component like a 'React Component' or 'Page Component'.
+    return {"messages": [bind_doc_tools(llm, tools).invoke([sys_msg] + resolve(state["messages"]))]}
 
-Before you start, you should use the tool to find the relevant tech document based on the type of tech aspect (either 'frontend' or 'backend'). The document will provide you with the architecture and general strategies to follow.
-
-If you can not specify the type, you should ask the user to specify it.
-
-You must think through the business logic and technology stack from the knowledge base. Based on the architecture and general strategies defined in the knowledge base, list all the components required to implement the user story.
 
+COMPONENT_FORMAT = """
 Use the following strict format for each component:
 
 name: The name of the component (e.g., UserAuthController, ProductService).
@@ -68,22 +60,71 @@ ComponentName: The type of the component it depends on (e.g., AuthService: Servi
 ...
 
 (Repeat the block above for every component required to fully implement the user story.)
+"""
+
+
+class SplitState(MessagesState):
+    prefetched: list[str]
+
+
+# Node
+def prefetch_docs(state: SplitState):
+    # Predict the layers from the user story so the docs can be injected
+    # up front instead of waiting for a find_document round-trip
+    story = "\n".join(
+        str(m.content) for m in state["messages"] if isinstance(m, HumanMessage)
+    )
+    return {"prefetched": classifier.predict(story)}
+
+
+def format_docs(docs: dict) -> str:
+    return "\n\n".join(
+        f'<Document layer="{layer}">\n{content}\n</Document>'
+        for layer, content in docs.items()
+    )
+
+
+# Node
+def assistant(state: SplitState):
+    prefetched = state.get("prefetched", [])
+    sys_msg = SystemMessage(
+        content="""
+You will act as a senior [Frontend/Backend] Web Programmer. Your mission is to generate a detailed implementation strategy for a given user story, based on the context provided in a knowledge base.
+
+Important Note: The term 'component' used below refers to an architectural component (e.g., a Controller, Service, Repository, API Client), not a UI component like a 'React Component' or 'Page Component'.
+
+The relevant tech documents may already be provided at the end of this message. If the document for the type of tech aspect (either 'frontend' or 'backend') you need is not provided, use the tool to find it. The document will provide you with the architecture and general strategies to follow.
+
+If you can not specify the type, you should ask the user to specify it.
+
+You must think through the business logic and technology stack from the knowledge base. Based on the architecture and general strategies defined in the knowledge base, list all the components required to implement the user story.
+
+"""
+        + COMPONENT_FORMAT
+        + """
 
 Remember to think systematically and break down the requirements step-by-step to ensure all necessary components are identified.
 """
+        + format_docs(prefetch(prefetched))
     )
-    return {"messages": [llm_with_tools.invoke([sys_msg] + state["messages"])]}
+    message = bind_doc_tools(llm, tools).invoke([sys_msg] + resolve(state["messages"]))
+    # Only the first answer to a story says whether the prediction was enough
+    if not isinstance(state["messages"][-1], ToolMessage):
+        stats.record(prefetched, requested_layers(message, "find_document", "type"))
+    return {"messages": [message]}
 
 
 # Graph
-builder = StateGraph(MessagesState)
+builder = StateGraph(SplitState)
 
 # Define nodes: these do the work
+builder.add_node("prefetch", prefetch_docs)
 builder.add_node("assistant", assistant)
-builder.add_node("tools", ToolNode(tools))
+builder.add_node("tools", store_large_results(ToolNode(tools)))
 
 # Define edges: these determine how the control flow moves
-builder.add_edge(START, "assistant")
+builder.add_edge(START, "prefetch")
+builder.add_edge("prefetch", "assistant")
 builder.add_conditional_edges(
     "assistant",
     # If the latest message (result) from assistant is a tool call -> tools_condition routes to tools
@@ -94,3 +135,202 @@ builder.add_edge("tools", "assistant")
 
 
 graph = builder.compile()
+
+
+# Fan-out mode: one sub-task per layer, merged by a reducer node
+def reduce_layer_results(left: list, right: Optional[list]) -> list:
+    # None resets the results once they have been merged
+    if right is None:
+        return []
+    return (left or []) + right
+
+
+class FanoutState(MessagesState):
+    prefetched: list[str]
+    layer_results: Annotated[list[dict], reduce_layer_results]
+
+
+class LayerTask(TypedDict):
+    layer: str
+    messages: list
+
+
+def fan_out(state: FanoutState):
+    layers = state.get("prefetched") or classifier.layers()
+    return [Send("layer_worker", {"layer": layer, "messages": state["messages"]}) for layer in layers]
+
+
+def layer_prompt(layer: str, output_format: str) -> SystemMessage:
+    return SystemMessage(
+        content=f"""
+You will act as a senior {layer} Web Programmer. Your mission is to generate a detailed implementation strategy for the {layer} part of a given user story, based on the {layer} tech document provided below.
+
+Important Note: The term 'component' used below refers to an architectural component (e.g., a Controller, Service, Repository, API Client), not a UI component like a 'React Component' or 'Page Component'.
+
+Only list the components that belong to the {layer}. Other layers are handled separately, so when a component depends on a component from another layer, still list it under Depends On and append the layer in square brackets (e.g., CartController: Controller [backend]).
+"""
+        + output_format
+        + format_docs({layer: registry.read(layer)})
+    )
+
+
+# Node
+def layer_worker(task: LayerTask):
+    layer = task["layer"]
+    message = llm.invoke([layer_prompt(layer, COMPONENT_FORMAT)] + task["messages"])
+    return {"layer_results": [{"layer": layer, "content": message.content}]}
+
+
+_name_re = re.compile(r"^[\s*#-]*name\**\s*:\s*\**\s*(.+?)\**\s*$", re.IGNORECASE | re.MULTILINE)
+_depends_re = re.compile(r"^[\s*#-]*depends on\**\s*:?\**\s*$", re.IGNORECASE)
+_dependency_re = re.compile(r"^[\s*-]*`?(\w+)`?\s*:\s*([^\[\n]*?)\s*(?:\[(\w+)\])?\s*$")
+
+
+def parse_dependencies(content: str) -> dict:
+    """Map each component name to the names listed under its Depends On."""
+    deps = {}
+    current = None
+    in_depends = False
+    for line in content.splitlines():
+        name = _name_re.match(line)
+        if name:
+            current = name.group(1).strip("`* ")
+            deps[current] = []
+            in_depends = False
+        elif _depends_re.match(line):
+            in_depends = True
+        elif in_depends and current:
+            dep = _dependency_re.match(line)
+            if dep and dep.group(1).lower() not in ("name", "type", "layer", "job", "props"):
+                deps[current].append((dep.group(1), dep.group(3)))
+            elif line.strip():
+                # another field of the component ends the list
+                in_depends = False
+    return deps
+
+
+# Node
+def merge_layers(state: FanoutState):
+    results = sorted(state.get("layer_results", []), key=lambda r: r["layer"])
+    parsed = {r["layer"]: parse_dependencies(r["content"]) for r in results}
+    owner = {name: layer for layer, deps in parsed.items() for name in deps}
+    edges = []
+    for layer, deps in parsed.items():
+        for name, depends_on in deps.items():
+            for dep, dep_layer in depends_on:
+                # A name defined in the dependent's own layer refers to that one
+                target = dep_layer or (layer if dep in deps else owner.get(dep))
+                if target and target != layer:
+                    edges.append(f"- {name} ({layer}) -> {dep} ({target})")
+    sections = [f"## {r['layer'].capitalize()}\n\n{r['content']}" for r in results]
+    if edges:
+        sections.append("## Cross-layer Dependencies\n\n" + "\n".join(edges))
+    return {"messages": [AIMessage(content="\n\n".join(sections))], "layer_results": None}
+
+
+fanout_builder = StateGraph(FanoutState)
+fanout_builder.add_node("prefetch", prefetch_docs)
+fanout_builder.add_node("layer_worker", layer_worker)
+fanout_builder.add_node("merge", merge_layers)
+fanout_builder.add_edge(START, "prefetch")
+fanout_builder.add_conditional_edges("prefetch", fan_out, ["layer_worker"])
+fanout_builder.add_edge("layer_worker", "merge")
+fanout_builder.add_edge("merge", END)
+
+fanout_graph = fanout_builder.compile()
+
+
+# Structured mode: the fan-out workers return typed component records
+STRUCTURED_FORMAT = """
+Call the TaskSplit tool once with every component required to fully implement the user story. For a dependency on a component from another layer, set its layer to that layer's name (e.g. backend).
+"""
+
+
+class StructuredState(FanoutState):
+    components: list[dict]
+    build_order: list[str]
+
+
+# Node
+def structured_layer_worker(task: LayerTask):
+    layer = task["layer"]
+    model = llm.bind_tools([TaskSplit], tool_choice="TaskSplit")
+    parser = ComponentStreamParser()
+    writer = get_stream_writer()
+    full = None
+    for chunk in model.stream([layer_prompt(layer, STRUCTURED_FORMAT)] + task["messages"]):
+        full = chunk if full is None else full + chunk
+        for call in chunk.tool_call_chunks:
+            # Emit each component as soon as its JSON object is complete
+            for component in parser.feed(call.get("args") or ""):
+                writer({"layer": layer, "component": component.model_dump()})
+    components, errors = parser.components, parser.errors
+    if (not components or errors) and full is not None and full.tool_calls:
+        # Providers that only send complete arguments at the end; the full
+        # arguments also recover components that failed to parse mid-stream
+        components, errors = validate_components(full.tool_calls[0]["args"].get("components", []))
+    return {
+        "layer_results": [
+            {"layer": layer, "components": [c.model_dump() for c in components], "errors": errors}
+        ]
+    }
+
+
+# Node
+def merge_structured(state: StructuredState):
+    results = sorted(state.get("layer_results", []), key=lambda r: r["layer"])
+    # Keyed by layer:name, so same-named components of different layers both survive
+    component_graph = ComponentGraph(
+        (result["layer"], Component.model_validate(record))
+        for result in results
+        for record in result["components"]
+    )
+    try:
+        order = component_graph.topological_order()
+        order_note = "\n".join(f"{i}. {key}" for i, key in enumerate(order, 1))
+    except ValueError as e:
+        order = list(component_graph.components)
+        order_note = str(e)
+    sections = []
+    for result in results:
+        blocks = [
+            render_component(c)
+            for key, c in component_graph.components.items()
+            if component_graph.scopes[key] == result["layer"]
+        ]
+        sections.append(f"## {result['layer'].capitalize()}\n\n" + "\n\n".join(blocks))
+    edges = component_graph.cross_scope_edges()
+    if edges:
+        sections.append(
+            "## Cross-layer Dependencies\n\n" + "\n".join(f"- {a} -> {b}" for a, b in edges)
+        )
+    if component_graph.duplicates:
+        sections.append(
+            "## Duplicate Components\n\n"
+            + "\n".join(f"- {key} (only the first definition is kept)" for key in component_graph.duplicates)
+        )
+    invalid = [f"- {r['layer']}: {error}" for r in results for error in r.get("errors", [])]
+    if invalid:
+        sections.append("## Invalid Components\n\n" + "\n".join(invalid))
+    sections.append("## Build Order\n\n" + order_note)
+    return {
+        "messages": [AIMessage(content="\n\n".join(sections))],
+        "components": [
+            {"scope": component_graph.scopes[key], "key": key, **c.model_dump()}
+            for key, c in component_graph.components.items()
+        ],
+        "build_order": order,
+        "layer_results": None,
+    }
+
+
+structured_builder = StateGraph(StructuredState)
+structured_builder.add_node("prefetch", prefetch_docs)
+structured_builder.add_node("layer_worker", structured_layer_worker)
+structured_builder.add_node("merge", merge_structured)
+structured_builder.add_edge(START, "prefetch")
+structured_builder.add_conditional_edges("prefetch", fan_out, ["layer_worker"])
+structured_builder.add_edge("layer_worker", "merge")
+structured_builder.add_edge("merge", END)
+
+structured_graph = structured_builder.compile()
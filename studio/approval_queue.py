@@ -0,0 +1,235 @@
+"""
+Approval queue for threads paused at a breakpoint (`interrupt_before`).
+
+Indexes the interrupted threads of a LangGraph server by the node they
+are waiting on and how long they have waited, and resolves many of them
+in one call: approvals resume the threads concurrently, rejections and
+TTL expiry close them without running the paused node.
+
+    python approval_queue.py list [--node action_taken]
+    python approval_queue.py approve --node action_taken [--older-than 60]
+    python approval_queue.py reject <thread_id> ... --reason "not during peak"
+    python approval_queue.py expire --ttl 3600
+"""
+
+import argparse
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 3600.0
+PAGE_SIZE = 100
+
+
+@dataclass
+class PendingApproval:
+    """A thread paused before `node`."""
+
+    thread_id: str
+    graph_id: Optional[str]
+    node: str
+    paused_at: datetime
+    last_message: str
+
+    @property
+    def age(self) -> float:
+        return (datetime.now(timezone.utc) - self.paused_at).total_seconds()
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+
+def _last_message(values) -> str:
+    messages = values.get("messages") if isinstance(values, dict) else None
+    if not messages:
+        return ""
+    content = messages[-1].get("content", "") if isinstance(messages[-1], dict) else str(messages[-1])
+    return str(content)[:200]
+
+
+class ApprovalQueue:
+    """Index of interrupted threads with bulk resolution.
+
+    `refresh()` pages through the server's interrupted threads and reads
+    their states with at most `concurrency` requests in flight; approve,
+    reject and expire use the same bound. Results are per thread, so one
+    failing thread never blocks the rest of a batch.
+    """
+
+    def __init__(self, client, concurrency: int = 8, ttl: float = DEFAULT_TTL,
+                 default_assistant: Optional[str] = None):
+        self.client = client
+        self.ttl = ttl
+        self.default_assistant = default_assistant
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._pending: Dict[str, PendingApproval] = {}
+
+    async def _bounded(self, coroutine):
+        async with self._semaphore:
+            return await coroutine
+
+    async def _load(self, thread) -> Optional[PendingApproval]:
+        state = await self.client.threads.get_state(thread["thread_id"])
+        next_nodes = state.get("next") or []
+        if not next_nodes:
+            return None
+        return PendingApproval(
+            thread_id=thread["thread_id"],
+            graph_id=(thread.get("metadata") or {}).get("graph_id"),
+            node=next_nodes[0],
+            paused_at=_as_datetime(thread["updated_at"]),
+            last_message=_last_message(state.get("values")),
+        )
+
+    async def refresh(self) -> int:
+        """Rebuild the index from the server; returns the number of pending threads."""
+        threads, offset = [], 0
+        while True:
+            page = await self.client.threads.search(
+                status="interrupted", limit=PAGE_SIZE, offset=offset, sort_by="updated_at", sort_order="asc"
+            )
+            threads.extend(page)
+            if len(page) < PAGE_SIZE:
+                break
+            offset += PAGE_SIZE
+        results = await asyncio.gather(*(self._bounded(self._load(t)) for t in threads), return_exceptions=True)
+        pending = {}
+        for thread, result in zip(threads, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to read state of {thread['thread_id']}: {result}")
+                continue
+            if result is not None:
+                pending[result.thread_id] = result
+        self._pending = pending
+        return len(pending)
+
+    def pending(self, node: Optional[str] = None, graph_id: Optional[str] = None,
+                older_than: Optional[float] = None) -> List[PendingApproval]:
+        """Indexed threads, oldest first, optionally filtered."""
+        items = [
+            p for p in self._pending.values()
+            if (node is None or p.node == node)
+            and (graph_id is None or p.graph_id == graph_id)
+            and (older_than is None or p.age >= older_than)
+        ]
+        return sorted(items, key=lambda p: p.paused_at)
+
+    def by_node(self) -> Dict[str, List[PendingApproval]]:
+        index: Dict[str, List[PendingApproval]] = {}
+        for item in self.pending():
+            index.setdefault(item.node, []).append(item)
+        return index
+
+    def _resolve(self, thread_ids: Iterable[str]) -> List[PendingApproval]:
+        items = []
+        for thread_id in thread_ids:
+            item = self._pending.get(thread_id)
+            if item is None:
+                logger.warning(f"Thread {thread_id} is not waiting for approval, skipping")
+            else:
+                items.append(item)
+        return items
+
+    async def _run_all(self, items: List[PendingApproval], action) -> Dict[str, str]:
+        results = await asyncio.gather(*(self._bounded(action(item)) for item in items), return_exceptions=True)
+        outcome = {}
+        for item, result in zip(items, results):
+            if isinstance(result, Exception):
+                outcome[item.thread_id] = f"error: {result}"
+                logger.error(f"Thread {item.thread_id}: {result}")
+            else:
+                outcome[item.thread_id] = "ok"
+                self._pending.pop(item.thread_id, None)
+        return outcome
+
+    async def approve(self, thread_ids: Iterable[str]) -> Dict[str, str]:
+        """Resume the threads from their breakpoints and wait for the runs."""
+
+        async def resume(item: PendingApproval):
+            assistant = item.graph_id or self.default_assistant
+            if assistant is None:
+                raise ValueError("unknown graph, pass default_assistant")
+            await self.client.runs.wait(item.thread_id, assistant, input=None)
+
+        return await self._run_all(self._resolve(thread_ids), resume)
+
+    async def reject(self, thread_ids: Iterable[str], reason: str = "rejected by operator") -> Dict[str, str]:
+        """Close the threads without running the paused node.
+
+        The rejection is written as the paused node's output, so the graph
+        continues from after that node with a message explaining why.
+        """
+
+        async def close(item: PendingApproval):
+            message = {"type": "ai", "content": f"Action rejected: {reason}"}
+            await self.client.threads.update_state(item.thread_id, {"messages": [message]}, as_node=item.node)
+
+        return await self._run_all(self._resolve(thread_ids), close)
+
+    async def expire(self, ttl: Optional[float] = None) -> Dict[str, str]:
+        """Reject every pause older than `ttl` seconds."""
+        ttl = self.ttl if ttl is None else ttl
+        stale = [p.thread_id for p in self.pending(older_than=ttl)]
+        if not stale:
+            return {}
+        logger.info(f"Expiring {len(stale)} pauses older than {ttl:.0f}s")
+        return await self.reject(stale, reason=f"approval expired after {ttl:.0f}s")
+
+
+def format_pending(items: List[PendingApproval]) -> str:
+    lines = [f"{'thread':<38} {'graph':<14} {'node':<14} {'age':>8}  last message"]
+    for p in items:
+        lines.append(f"{p.thread_id:<38} {str(p.graph_id):<14} {p.node:<14} {p.age:>7.0f}s  {p.last_message[:60]!r}")
+    return "\n".join(lines)
+
+
+async def run_cli(args):
+    from langgraph_sdk import get_client
+
+    queue = ApprovalQueue(get_client(url=args.url), concurrency=args.concurrency, default_assistant=args.assistant)
+    count = await queue.refresh()
+    if args.command == "list":
+        print(f"{count} threads waiting")
+        print(format_pending(queue.pending(args.node, args.graph, args.older_than)))
+        return
+    if args.command == "expire":
+        outcome = await queue.expire(args.ttl)
+    else:
+        thread_ids = args.thread_ids or [p.thread_id for p in queue.pending(args.node, args.graph, args.older_than)]
+        if args.command == "approve":
+            outcome = await queue.approve(thread_ids)
+        else:
+            outcome = await queue.reject(thread_ids, args.reason)
+    ok = sum(1 for v in outcome.values() if v == "ok")
+    print(f"{args.command}: {ok}/{len(outcome)} succeeded")
+    for thread_id, result in outcome.items():
+        if result != "ok":
+            print(f"  {thread_id}: {result}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk approval of interrupted LangGraph threads")
+    parser.add_argument("command", choices=["list", "approve", "reject", "expire"])
+    parser.add_argument("thread_ids", nargs="*")
+    parser.add_argument("--url", default="http://localhost:2024")
+    parser.add_argument("--node")
+    parser.add_argument("--graph")
+    parser.add_argument("--older-than", type=float)
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL)
+    parser.add_argument("--reason", default="rejected by operator")
+    parser.add_argument("--assistant", help="assistant for threads without graph_id metadata")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(run_cli(args))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
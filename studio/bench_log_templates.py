@@ -0,0 +1,77 @@
+"""
+Benchmark: template mining on synthetic multi-MB alert logs.
+
+Reports throughput, peak memory, template count and how much smaller the
+template view is than the raw log that would otherwise go to the LLM.
+
+    python bench_log_templates.py [--sizes 1,4,16] [--seed 0]
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from log_templates import TemplateMiner, format_templates
+
+LINES = [
+    "{ts} [DEBUG] [HikariCP-ConnectionPool-{n}]\ncom.zaxxer.hikari.pool.HikariPool - \n"
+    "[DB_POOL] Connection acquired in {ms}ms, thread=TransactionProcessor-Worker-{w}",
+    "{ts} [INFO] [http-nio-8080-exec-{n}]\ncom.example.api.PaymentController - \n"
+    "[UserAction] Received payment request: userId=U{user}, amount=¥{amount}, method={method}, clientIp=10.0.{n}.{w}",
+    "{ts} [INFO] [TransactionProcessor-Worker-{w}]\ncom.example.payment.repository.TransactionRepository - \n"
+    "[DB_WRITE] Inserting new transaction record: TXN-2025{txn} into `payment_transaction` table",
+    "{ts} [WARN] [TransactionProcessor-Worker-{w}]\ncom.example.payment.transaction.TransactionProcessor - \n"
+    "[TransactionFailed] External payment initiation failed, retrying (attempt {attempt}/3)",
+    "{ts} [ERROR] [TransactionProcessor-Worker-{w}]\ncom.example.payment.gateway.ExternalGatewayClient - \n"
+    "[Timeout] No response from {method} gateway within 5000ms (requestId=GW-REQ-{txn})",
+]
+WEIGHTS = [40, 20, 20, 12, 8]
+
+
+def synthetic_log(size_mb: float, rng: random.Random) -> str:
+    parts, size, second = [], 0, 0
+    while size < size_mb * 1024 * 1024:
+        second += rng.random() * 0.05
+        line = rng.choices(LINES, WEIGHTS)[0].format(
+            ts=f"2025-04-07 {14 + int(second // 3600) % 10:02d}:{int(second // 60) % 60:02d}:{second % 60:06.3f}",
+            n=rng.randint(1, 200),
+            w=rng.randint(1, 32),
+            ms=rng.randint(1, 50),
+            user=rng.randint(100000, 999999),
+            amount=f"{rng.randint(1, 9999)}.{rng.randint(0, 99):02d}",
+            method=rng.choice(["WeChatPay", "Alipay", "UnionPay"]),
+            txn=rng.randint(10**11, 10**12),
+            attempt=rng.randint(1, 3),
+        )
+        parts.append(line)
+        size += len(line) + 2
+    return "\n\n".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1,4,16", help="log sizes in MB, comma separated")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'size MB':>8} {'entries':>9} {'MB/s':>7} {'peak MB':>8} {'templates':>10} {'raw chars':>11} {'view chars':>11} {'ratio':>7}")
+    for size in (float(s) for s in args.sizes.split(",")):
+        text = synthetic_log(size, rng)
+        miner = TemplateMiner()
+        tracemalloc.start()
+        start = time.perf_counter()
+        miner.add_log(text)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        view = format_templates(miner)
+        print(
+            f"{size:>8.1f} {miner.lines:>9} {len(text) / 1024 / 1024 / elapsed:>7.2f} {peak / 1024 / 1024:>8.1f} "
+            f"{len(miner.clusters):>10} {len(text):>11} {len(view):>11} {len(text) / len(view):>6.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: pickled in-memory store (what `langgraph dev` persists to
+`.langgraph_api/store.pckl` / `store.vectors.pckl`) vs. SQLiteStore.
+
+Reports, per item count: bulk load, persisting one put, get, namespace
+prefix search, vector search and start-up (load from disk until the first
+get returns).
+
+    python bench_sqlite_store.py [--sizes 10000,100000,1000000] [--dims 64]
+"""
+
+import argparse
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import time
+
+from langgraph.store.base import PutOp
+from langgraph.store.memory import InMemoryStore
+
+from sqlite_store import SQLiteStore
+
+NAMESPACES = 1000
+
+
+def make_embed(dims: int):
+    """Deterministic pseudo-embeddings, cheap enough for a million items."""
+
+    def embed(texts):
+        return [[random.Random(text).uniform(-1, 1) for _ in range(dims)] for text in texts]
+
+    return embed
+
+
+def items(count: int):
+    for i in range(count):
+        yield ("users", f"u{i % NAMESPACES}"), f"item-{i}", {"text": f"memory {i} about topic {i % 97}", "n": i}
+
+
+def batches(count: int, size: int = 1000):
+    batch = []
+    for namespace, key, value in items(count):
+        batch.append(PutOp(namespace, key, value))
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def pickle_state(store: InMemoryStore, root: str) -> float:
+    """Whole-file save, as the dev server does after changes."""
+    start = time.perf_counter()
+    with open(os.path.join(root, "store.pckl"), "wb") as file:
+        pickle.dump({ns: dict(v) for ns, v in store._data.items()}, file)
+    with open(os.path.join(root, "store.vectors.pckl"), "wb") as file:
+        pickle.dump({ns: {k: dict(f) for k, f in v.items()} for ns, v in store._vectors.items()}, file)
+    return time.perf_counter() - start
+
+
+def load_pickles(root: str, index) -> InMemoryStore:
+    store = InMemoryStore(index=index)
+    with open(os.path.join(root, "store.pckl"), "rb") as file:
+        store._data.update(pickle.load(file))
+    with open(os.path.join(root, "store.vectors.pckl"), "rb") as file:
+        for ns, keys in pickle.load(file).items():
+            for key, fields in keys.items():
+                store._vectors[ns][key].update(fields)
+    return store
+
+
+def timed(fn, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def bench(store, count: int, save) -> dict:
+    """Common measurements; `save` persists the store after a single put."""
+    rng = random.Random(0)
+    keys = [rng.randrange(count) for _ in range(1000)]
+    result = {}
+    result["put+persist ms"] = timed(lambda: (store.put(("users", "u1"), "extra", {"text": "one more memory"}), save()), 5) * 1000
+    result["get us"] = timed(lambda: [store.get(("users", f"u{k % NAMESPACES}"), f"item-{k}") for k in keys]) * 1e6 / len(keys)
+    result["prefix search ms"] = timed(lambda: store.search(("users", "u42"), limit=10), 20) * 1000
+    result["vector search ms"] = timed(lambda: store.search(("users",), query="memory about topic 7", limit=10), 5) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--dims", type=int, default=64)
+    args = parser.parse_args()
+
+    embed = make_embed(args.dims)
+    index = {"dims": args.dims, "embed": embed, "fields": ["text"]}
+    rows = []
+    for count in [int(s) for s in args.sizes.split(",")]:
+        root = tempfile.mkdtemp(prefix="bench_store_")
+        try:
+            memory = InMemoryStore(index=index)
+            load_s = timed(lambda: [memory.batch(batch) for batch in batches(count)])
+            pickled = bench(memory, count, lambda: pickle_state(memory, root))
+            pickled["bulk load s"] = load_s
+            pickled["startup s"] = timed(lambda: load_pickles(root, index).get(("users", "u0"), "item-0"))
+            del memory
+
+            path = os.path.join(root, "store.sqlite3")
+            sqlite = SQLiteStore(path, index=index)
+            load_s = timed(lambda: [sqlite.batch(batch) for batch in batches(count)])
+            local = bench(sqlite, count, lambda: None)
+            local["bulk load s"] = load_s
+            sqlite.close()
+
+            def startup():
+                store = SQLiteStore(path, index=index)
+                store.get(("users", "u0"), "item-0")
+                store.close()
+
+            local["startup s"] = timed(startup)
+            rows.append((count, pickled, local))
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    metrics = ["bulk load s", "put+persist ms", "get us", "prefix search ms", "vector search ms", "startup s"]
+    print(f"{'items':>8} {'metric':<18} {'pickle':>10} {'sqlite':>10} {'speedup':>8}")
+    for count, pickled, local in rows:
+        for metric in metrics:
+            print(f"{count:>8} {metric:<18} {pickled[metric]:>10.3f} {local[metric]:>10.3f} "
+                  f"{pickled[metric] / max(local[metric], 1e-9):>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
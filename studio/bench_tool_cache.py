@@ -0,0 +1,75 @@
+"""
+Benchmark: per-turn cost of binding tools to a model, rebinding every
+turn (`llm.bind_tools`) vs. the schema and bound-model cache.
+
+    python bench_tool_cache.py [--turns 200]
+"""
+
+import argparse
+import os
+import time
+
+from langchain_core.tools import StructuredTool
+from langchain_openai import ChatOpenAI
+
+from llm_router import make_router
+from tool_cache import ToolSpecCache
+
+
+def mcp_like_tools(count: int):
+    """Tools with dict JSON schemas, as MCP adapters produce them."""
+
+    def call(**kwargs):
+        return ""
+
+    return [
+        StructuredTool(
+            name=f"tool_{i}",
+            description=f"Search documentation set {i} and return matching passages with source links.",
+            args_schema={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "search terms"},
+                    "limit": {"type": "integer", "description": "max results", "default": 5},
+                    "filters": {
+                        "type": "object",
+                        "properties": {
+                            "product": {"type": "string", "enum": ["azure", "aws", "m365", "dotnet"]},
+                            "since": {"type": "string", "format": "date"},
+                        },
+                    },
+                },
+                "required": ["query"],
+            },
+            func=call,
+        )
+        for i in range(count)
+    ]
+
+
+def per_turn_ms(fn, turns: int) -> float:
+    start = time.perf_counter()
+    for _ in range(turns):
+        fn()
+    return (time.perf_counter() - start) * 1000 / turns
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    llm = make_router(ChatOpenAI(model="gpt-4o-mini"))
+
+    print(f"{'tools':>6} {'rebind ms/turn':>15} {'cached ms/turn':>15} {'speedup':>8}")
+    for count in (1, 10, 40, 100):
+        tools = mcp_like_tools(count)
+        cache = ToolSpecCache()
+        rebind = per_turn_ms(lambda: llm.bind_tools(tools), args.turns)
+        cached = per_turn_ms(lambda: cache.bound_model(llm, tools), args.turns)
+        print(f"{count:>6} {rebind:>15.3f} {cached:>15.3f} {rebind / cached:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: concurrent ToolNode runs with growing CPU-bound tool load,
+in-process vs. the warm process pool from tool_executor.
+
+    python bench_tool_executor.py [--runs 32] [--threads 8]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import START, StateGraph, MessagesState
+from langgraph.prebuilt import ToolNode
+
+from agent import add
+from tool_executor import cpu_bound, offload_cpu_bound
+
+
+@cpu_bound
+def count_primes(limit: int) -> int:
+    """Counts the primes below limit by trial division.
+
+    Args:
+        limit: upper bound (exclusive)
+    """
+    count = 0
+    for n in range(2, limit):
+        if all(n % d for d in range(2, int(n**0.5) + 1)):
+            count += 1
+    return count
+
+
+def build_graph(tools):
+    builder = StateGraph(MessagesState)
+    builder.add_node("tools", ToolNode(tools))
+    builder.add_edge(START, "tools")
+    return builder.compile()
+
+
+def run_load(graph, n: int, heavy_calls: int, runs: int, threads: int) -> float:
+    calls = [{"name": "add", "args": {"a": 1, "b": 2}, "id": "add-0"}]
+    calls += [
+        {"name": "count_primes", "args": {"limit": n}, "id": f"primes-{i}"}
+        for i in range(heavy_calls)
+    ]
+    state = {"messages": [AIMessage(content="", tool_calls=calls)]}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda _: graph.invoke(state), range(runs)))
+    return runs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--n", type=int, default=20000)
+    args = parser.parse_args()
+
+    tools = [add, count_primes]
+    in_process = build_graph(tools)
+    # offloading the marked count_primes starts the workers
+    pooled = build_graph(offload_cpu_bound(tools))
+
+    print(f"{'heavy calls/run':>16} {'in-process runs/s':>18} {'process pool runs/s':>20}")
+    for heavy_calls in (0, 1, 2, 4, 8):
+        a = run_load(in_process, args.n, heavy_calls, args.runs, args.threads)
+        b = run_load(pooled, args.n, heavy_calls, args.runs, args.threads)
+        print(f"{heavy_calls:>16} {a:>18.1f} {b:>20.1f}")
+
+
+if __name__ == "__main__":
+    main()
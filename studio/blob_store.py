@@ -0,0 +1,138 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from langchain_core.messages import BaseMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+
+current_file_path = os.path.abspath(__file__)
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(current_file_path), ".blob_store")
+BLOB_PREFIX = "blob://sha256/"
+
+
+class BlobStore:
+    """Content-addressed store for large tool results.
+
+    Blobs are files named by the SHA-256 of their content, so storing the
+    same document from a thousand threads writes it once; graph state only
+    keeps the `blob://sha256/<digest>` reference. Recently read blobs stay
+    in an LRU cache bounded by `cache_bytes`.
+    """
+
+    def __init__(self, root: str = DEFAULT_ROOT, threshold: int = 2048, cache_bytes: int = 64 << 20):
+        self.root = root
+        self.threshold = threshold
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:])
+
+    def _remember(self, digest: str, text: str):
+        with self._lock:
+            if digest in self._cache:
+                self._cache.move_to_end(digest)
+                return
+            self._cache[digest] = text
+            self._cached_bytes += len(text)
+            while self._cached_bytes > self.cache_bytes and len(self._cache) > 1:
+                _, old = self._cache.popitem(last=False)
+                self._cached_bytes -= len(old)
+
+    def put(self, text: str) -> str:
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as file:
+                file.write(data)
+            os.replace(tmp, path)
+        self._remember(digest, text)
+        return digest
+
+    def get(self, digest: str) -> str:
+        with self._lock:
+            text = self._cache.get(digest)
+        if text is None:
+            with open(self._path(digest), "rb") as file:
+                text = file.read().decode("utf-8")
+            self._remember(digest, text)
+        return text
+
+    def externalize(self, message: BaseMessage) -> BaseMessage:
+        """Replace a large ToolMessage content with a blob reference."""
+        if not isinstance(message, ToolMessage) or is_ref(message.content):
+            return message
+        if isinstance(message.content, str):
+            text, kind = message.content, "text"
+        else:
+            text, kind = json.dumps(message.content, ensure_ascii=False), "json"
+        if len(text) < self.threshold:
+            return message
+        digest = self.put(text)
+        return message.model_copy(
+            update={
+                "content": f"{BLOB_PREFIX}{digest}",
+                "additional_kwargs": {**message.additional_kwargs, "blob": {"kind": kind, "size": len(text)}},
+            }
+        )
+
+    def resolve(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Messages with blob references replaced by their content, for prompts."""
+        resolved = []
+        for message in messages:
+            if isinstance(message, ToolMessage) and is_ref(message.content):
+                try:
+                    text = self.get(message.content[len(BLOB_PREFIX):])
+                except OSError as e:
+                    logger.error(f"Missing blob {message.content}: {e}")
+                    text = f"(tool result {message.content} is no longer available)"
+                kind = message.additional_kwargs.get("blob", {}).get("kind")
+                message = message.model_copy(update={"content": json.loads(text) if kind == "json" else text})
+            resolved.append(message)
+        return resolved
+
+
+def is_ref(content) -> bool:
+    return isinstance(content, str) and content.startswith(BLOB_PREFIX)
+
+
+blob_store = BlobStore(
+    root=os.environ.get("BLOB_STORE_DIR") or DEFAULT_ROOT,
+    threshold=int(os.environ.get("BLOB_THRESHOLD") or 2048),
+)
+
+
+def _externalize_output(output, store: BlobStore):
+    if isinstance(output, dict) and "messages" in output:
+        return {**output, "messages": [store.externalize(m) for m in output["messages"]]}
+    if isinstance(output, list):
+        return [store.externalize(m) if isinstance(m, BaseMessage) else m for m in output]
+    return output
+
+
+def store_large_results(tool_node, store: Optional[BlobStore] = None):
+    """Wrap a tool node so its large results go to the blob store."""
+    store = store or blob_store
+
+    def run(state, config):
+        return _externalize_output(tool_node.invoke(state, config), store)
+
+    async def arun(state, config):
+        return _externalize_output(await tool_node.ainvoke(state, config), store)
+
+    return RunnableLambda(run, afunc=arun, name=getattr(tool_node, "name", None) or "tools")
+
+
+def resolve(messages: List[BaseMessage]) -> List[BaseMessage]:
+    return blob_store.resolve(messages)
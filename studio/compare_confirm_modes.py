@@ -0,0 +1,104 @@
+"""
+Latency of agent_human_in_loop per CONFIRM_MODE: time until the
+confirmation question reaches the human, time to finish after approval,
+and model calls per request.
+
+By default a scripted model with a fixed per-call latency stands in for
+the LLM, so the numbers isolate the graph's round-trips; `--live` uses
+the configured model instead.
+
+    python compare_confirm_modes.py [--latency 0.8] [--repeat 5] [--live]
+"""
+
+import argparse
+import statistics
+import time
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.checkpoint.memory import MemorySaver
+
+import agent_human_in_loop as hil
+
+REQUESTS = [
+    "Add 3 and 4.",
+    "Multiply 6 by 7, then divide by 2.",
+    "What is 120 / 8?",
+]
+
+
+class ScriptedArithmeticModel(BaseChatModel):
+    """Sleeps `latency` seconds per call, then answers like the real graph's model would."""
+
+    latency: float = 0.8
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-arithmetic"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency)
+        self.calls += 1
+        request = next(m.content for m in reversed(messages) if isinstance(m, HumanMessage))
+        done = sum(1 for m in messages if isinstance(m, ToolMessage))
+        planned = hil.parse_request(request)[done:done + 1]
+        last = next((m.content for m in reversed(messages) if isinstance(m, ToolMessage)), None)
+        if "rhetorical" in str(messages[0].content):
+            message = AIMessage(content=f"Are you sure you want me to {request[0].lower()}{request[1:]}")
+        elif not planned:
+            message = AIMessage(content=f"The result is {last}.")
+        else:
+            args = {k: (float(last) if v == hil.RESULT else v) for k, v in planned[0]["args"].items()}
+            message = AIMessage(content="", tool_calls=[
+                {"name": planned[0]["name"], "args": args, "id": f"call-{time.monotonic_ns()}"}
+            ])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def run(mode: str, request: str, thread: int, model):
+    graph = hil.build_graph(mode, checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": str(thread)}}
+    calls_before = getattr(model, "calls", 0)
+    start = time.perf_counter()
+    graph.invoke({"messages": [HumanMessage(content=request)]}, config)
+    to_confirmation = time.perf_counter() - start
+    # Approve every pause until the run finishes
+    while graph.get_state(config).next:
+        graph.invoke(None, config)
+    total = time.perf_counter() - start
+    return to_confirmation, total, getattr(model, "calls", 0) - calls_before
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.8, help="seconds per scripted model call")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--live", action="store_true", help="use the configured model")
+    args = parser.parse_args()
+
+    model = hil.llm_with_tools
+    if not args.live:
+        model = hil.llm_with_tools = ScriptedArithmeticModel(latency=args.latency)
+
+    print(f"{'mode':>9} {'to confirmation s':>18} {'total s':>8} {'model calls':>12}")
+    thread = 0
+    for mode in ("llm", "template", "batched"):
+        confirmations, totals, calls = [], [], []
+        for _ in range(args.repeat):
+            for request in REQUESTS:
+                thread += 1
+                c, t, n = run(mode, request, thread, model)
+                confirmations.append(c)
+                totals.append(t)
+                calls.append(n)
+        calls_column = "-" if args.live else f"{statistics.mean(calls):.1f}"
+        print(f"{mode:>9} {statistics.mean(confirmations):>18.3f} {statistics.mean(totals):>8.3f} {calls_column:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Compare one assistant turn of the MCP QA graph with every tool bound vs.
+only the top-k retrieved tools: prompt tokens reported by the model and
+latency, averaged over the queries in sample_queries.txt.
+
+Needs the MCP servers and model credentials that agent_tech_QA_MCP uses.
+
+    python compare_tool_pruning.py [--k 8] [--repeat 3]
+"""
+
+import argparse
+import os
+import statistics
+
+from langchain_core.messages import HumanMessage
+
+import agent_tech_QA_MCP as qa
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_queries():
+    with open(os.path.join(current_dir, "sample_queries.txt"), "r", encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=qa.TOOL_TOP_K or 8)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    queries = load_queries()
+    print(f"{len(qa.tools)} tools, {len(queries)} queries x {args.repeat}")
+    print(f"{'mode':>10} {'tools':>6} {'input tokens':>13} {'latency s':>10} {'p95 s':>7}")
+    for mode, k in (("all", 0), (f"top-{args.k}", args.k)):
+        tokens, latencies, bound = [], [], []
+        for _ in range(args.repeat):
+            for query in queries:
+                response, n_tools, elapsed = qa.call_model([HumanMessage(content=query)], k)
+                tokens.append((response.usage_metadata or {}).get("input_tokens", 0))
+                latencies.append(elapsed)
+                bound.append(n_tools)
+        latencies.sort()
+        print(
+            f"{mode:>10} {statistics.mean(bound):>6.1f} {statistics.mean(tokens):>13.0f} "
+            f"{statistics.mean(latencies):>10.2f} {latencies[int(0.95 * (len(latencies) - 1))]:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import json
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel, Field, ValidationError
+
+
+class Property(BaseModel):
+    name: str = Field(description="The property name, e.g. userId")
+    type: str = Field(description="The property type, e.g. string")
+
+
+class Dependency(BaseModel):
+    name: str = Field(description="The name of the component it depends on, e.g. AuthService")
+    type: str = Field(description="The type of that component, e.g. Service")
+    layer: Optional[str] = Field(
+        default=None,
+        description="The tech document layer of that component when it belongs to another layer, e.g. backend",
+    )
+
+
+class Component(BaseModel):
+    """An architectural component required to implement the user story."""
+
+    name: str = Field(description="The name of the component, e.g. UserAuthController, ProductService")
+    type: str = Field(description="The type of the component within the architecture, e.g. Controller, Service, Repository, API Client, Hook")
+    layer: str = Field(description="The architectural layer this component belongs to, e.g. Presentation Layer, Business Logic Layer")
+    job: str = Field(description="The specific responsibility of this component in the context of the user story")
+    props: List[Property] = Field(default_factory=list, description="Properties, if applicable")
+    depends_on: List[Dependency] = Field(default_factory=list, description="Components it depends on")
+
+
+class TaskSplit(BaseModel):
+    """List all the components required to implement the user story."""
+
+    components: List[Component]
+
+
+def describe_error(error: Exception) -> str:
+    """One-line description of a component that failed to parse or validate."""
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors())
+    return str(error)
+
+
+def validate_components(records: Iterable) -> Tuple[List[Component], List[str]]:
+    """The valid components of `records`, and a description of each invalid one."""
+    components, errors = [], []
+    for record in records:
+        try:
+            components.append(Component.model_validate(record))
+        except ValidationError as e:
+            name = record.get("name") if isinstance(record, dict) else None
+            errors.append(f"{name or '?'}: {describe_error(e)}")
+    return components, errors
+
+
+def render_component(component: Component) -> str:
+    """Render a component in the strict text format of the task-split prompt."""
+    lines = [
+        f"name: {component.name}",
+        f"type: {component.type}",
+        f"layer: {component.layer}",
+        f"job: {component.job}",
+    ]
+    if component.props:
+        lines.append("props:")
+        lines.extend(f"  {p.name}: {p.type}" for p in component.props)
+    if component.depends_on:
+        lines.append("Depends On:")
+        lines.extend(
+            f"  {d.name}: {d.type}" + (f" [{d.layer}]" if d.layer else "")
+            for d in component.depends_on
+        )
+    return "\n".join(lines)
+
+
+class ComponentStreamParser:
+    """Incremental parser for streamed `TaskSplit` JSON.
+
+    Feed the raw JSON text as it arrives (e.g. tool call argument chunks);
+    every element of the `components` array is returned from `feed` as
+    soon as its closing brace is seen, without waiting for the rest of
+    the document. Scanning is linear in the input size.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._start = None
+        self._array_depth = None
+        self._pos = 0
+        self._text = ""
+        self._last_key = None
+        self._key_start = None
+        self.components: List[Component] = []
+        self.errors: List[str] = []
+
+    def feed(self, chunk: str) -> List[Component]:
+        emitted = []
+        self._text += chunk
+        text = self._text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._last_key = text[self._key_start : i]
+                        self._key_start = None
+                continue
+            if ch == '"':
+                self._in_string = True
+                # Only strings at the components' parent level can be the key
+                if self._array_depth is None and self._depth == 1:
+                    self._key_start = i + 1
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "[" and self._array_depth is None and self._last_key == "components":
+                    self._array_depth = self._depth
+                elif ch == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._start = i
+            elif ch in "}]":
+                if ch == "}" and self._start is not None and self._depth == self._array_depth + 1:
+                    component = self._parse(text[self._start : i + 1])
+                    if component is not None:
+                        emitted.append(component)
+                    self._start = None
+                if ch == "]" and self._depth == self._array_depth:
+                    self._array_depth = None
+                self._depth -= 1
+        self._pos = len(text)
+        # Drop everything before the open component to keep the buffer small
+        keep = self._start if self._start is not None else self._pos
+        if self._key_start is not None:
+            keep = min(keep, self._key_start)
+            self._key_start -= keep
+        self._text = text[keep:]
+        self._pos -= keep
+        if self._start is not None:
+            self._start -= keep
+        self.components.extend(emitted)
+        return emitted
+
+    def _parse(self, raw: str) -> Optional[Component]:
+        try:
+            record = json.loads(raw)
+        except json.JSONDecodeError as e:
+            self.errors.append(describe_error(e))
+            return None
+        components, errors = validate_components([record])
+        self.errors.extend(errors)
+        return components[0] if components else None
+
+
+def component_key(name: str, scope: Optional[str] = None) -> str:
+    """Graph key of a component: `scope:name`, or just the name without scopes."""
+    return f"{scope}:{name}" if scope else name
+
+
+class ComponentGraph:
+    """Dependency graph over components.
+
+    Components are given as `(scope, component)` pairs (e.g. the doc layer
+    that produced them) and keyed by `scope:name`, so components with the
+    same name in different layers stay separate. A dependency resolves to
+    the layer it names, then to the dependent's own layer, then to the only
+    component with that name; anything else is external. A second
+    component with the same key is dropped and listed in `duplicates`.
+    """
+
+    def __init__(self, components: Iterable[Tuple[Optional[str], Component]]):
+        self.components: Dict[str, Component] = {}
+        self.scopes: Dict[str, Optional[str]] = {}
+        self.duplicates: List[str] = []
+        by_name: Dict[str, List[str]] = {}
+        for scope, component in components:
+            key = component_key(component.name, scope)
+            if key in self.components:
+                self.duplicates.append(key)
+                continue
+            self.components[key] = component
+            self.scopes[key] = scope
+            by_name.setdefault(component.name, []).append(key)
+        self.edges: Dict[str, List[str]] = {key: [] for key in self.components}
+        self.external: Dict[str, List[Dependency]] = {key: [] for key in self.components}
+        for key, component in self.components.items():
+            for dep in component.depends_on:
+                target = self._resolve(dep, self.scopes[key], by_name)
+                if target is not None and target != key:
+                    if target not in self.edges[key]:
+                        self.edges[key].append(target)
+                elif target is None:
+                    self.external[key].append(dep)
+
+    def _resolve(self, dep: Dependency, scope: Optional[str], by_name: Dict[str, List[str]]) -> Optional[str]:
+        for candidate in (dep.layer, scope):
+            key = component_key(dep.name, candidate)
+            if key in self.components:
+                return key
+        if dep.layer is None and len(by_name.get(dep.name, [])) == 1:
+            return by_name[dep.name][0]
+        return None
+
+    def cross_scope_edges(self) -> List[tuple]:
+        """(component key, dependency key) pairs across scopes (e.g. frontend/backend)."""
+        pairs = []
+        for key, deps in self.edges.items():
+            for dep in deps:
+                if self.scopes[key] != self.scopes[dep]:
+                    pairs.append((key, dep))
+        for key, deps in self.external.items():
+            for dep in deps:
+                if dep.layer and dep.layer != self.scopes[key]:
+                    pairs.append((key, component_key(dep.name, dep.layer)))
+        return pairs
+
+    def find_cycle(self) -> Optional[List[str]]:
+        """Return one dependency cycle as a list of keys, or None."""
+        WHITE, GREY, BLACK = 0, 1, 2
+        color = {name: WHITE for name in self.edges}
+        for root in self.edges:
+            if color[root] != WHITE:
+                continue
+            stack = [(root, iter(self.edges[root]))]
+            path = [root]
+            color[root] = GREY
+            while stack:
+                node, children = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    color[node] = BLACK
+                    stack.pop()
+                    path.pop()
+                elif color[child] == GREY:
+                    return path[path.index(child) :] + [child]
+                elif color[child] == WHITE:
+                    color[child] = GREY
+                    stack.append((child, iter(self.edges[child])))
+                    path.append(child)
+        return None
+
+    def topological_order(self) -> List[str]:
+        """Components ordered so that dependencies come first.
+
+        Raises:
+            ValueError: if the dependencies contain a cycle.
+        """
+        remaining = {name: len(deps) for name, deps in self.edges.items()}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.edges}
+        for name, deps in self.edges.items():
+            for dep in deps:
+                dependents[dep].append(name)
+        ready = deque(name for name, count in remaining.items() if count == 0)
+        order = []
+        while ready:
+            name = ready.popleft()
+            order.append(name)
+            for dependent in dependents[name]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) != len(self.edges):
+            cycle = self.find_cycle()
+            raise ValueError(f"Dependency cycle detected: {' -> '.join(cycle or [])}")
+        return order
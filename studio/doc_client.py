@@ -0,0 +1,116 @@
+"""
+Conditional-GET client for the doc routes of the HTTP doc servers.
+
+`mcp_server.py --transport streamable-http` and `mcp_from_scratch.py
+--transport http` serve GET /docs/<layer> with an ETag next to /mcp. The
+client keeps the last body of each doc and revalidates it with
+If-None-Match, so reading an unchanged doc again is a 304 without a body
+instead of an MCP tool call that sends the whole document.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class DocClient:
+    """ETag-revalidating reader for `<base_url>/docs/<layer>`."""
+
+    def __init__(self, base_url: str, timeout: float = 10.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._cache: Dict[str, Tuple[str, str]] = {}  # layer -> (etag, content)
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self._async_clients: Dict[int, httpx.AsyncClient] = {}
+        self.fetched = 0
+        self.not_modified = 0
+
+    @classmethod
+    def from_mcp_url(cls, url: str, **kwargs) -> "DocClient":
+        """Client for the server whose MCP endpoint is `url` (e.g. http://host:8100/mcp)."""
+        base = url.rstrip("/")
+        if base.endswith("/mcp"):
+            base = base[: -len("/mcp")]
+        return cls(base, **kwargs)
+
+    def _url(self, layer: str) -> str:
+        return f"{self.base_url}/docs/{quote(layer, safe='')}"
+
+    def _headers(self, layer: str) -> Dict[str, str]:
+        cached = self._cache.get(layer)
+        return {"If-None-Match": cached[0]} if cached else {}
+
+    def _handle(self, layer: str, response: httpx.Response) -> Optional[str]:
+        """The doc content, or None when the server does not have it."""
+        if response.status_code == 304:
+            cached = self._cache.get(layer)
+            if cached is not None:
+                with self._lock:
+                    self.not_modified += 1
+                return cached[1]
+        if response.status_code == 404:
+            self._cache.pop(layer, None)
+            return None
+        response.raise_for_status()
+        etag = response.headers.get("etag")
+        with self._lock:
+            self.fetched += 1
+            if etag:
+                self._cache[layer] = (etag, response.text)
+        return response.text
+
+    def get(self, layer: str) -> Optional[str]:
+        if self._client is None:
+            self._client = httpx.Client(timeout=self.timeout)
+        return self._handle(layer, self._client.get(self._url(layer), headers=self._headers(layer)))
+
+    async def aget(self, layer: str) -> Optional[str]:
+        # httpx async connections belong to the loop that opened them
+        loop_id = id(asyncio.get_running_loop())
+        client = self._async_clients.get(loop_id)
+        if client is None:
+            client = self._async_clients[loop_id] = httpx.AsyncClient(timeout=self.timeout)
+        response = await client.get(self._url(layer), headers=self._headers(layer))
+        return self._handle(layer, response)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"fetched": self.fetched, "not_modified": self.not_modified, "cached": len(self._cache)}
+
+    def wrap_tool(self, tool, arg: str = "layer"):
+        """Copy of a doc MCP tool that reads through the doc routes.
+
+        Unknown docs and HTTP errors fall back to calling the tool itself,
+        so its own error messages are kept.
+        """
+        func, coroutine = tool.func, tool.coroutine
+
+        def result(text: str):
+            if tool.response_format == "content_and_artifact":
+                return [{"type": "text", "text": text}], None
+            return text
+
+        def run(**kwargs):
+            try:
+                text = self.get(kwargs[arg])
+            except httpx.HTTPError as e:
+                logger.warning(f"Doc route failed for {kwargs.get(arg)!r}, calling {tool.name}: {e}")
+                text = None
+            return result(text) if text is not None else func(**kwargs)
+
+        async def arun(**kwargs):
+            try:
+                text = await self.aget(kwargs[arg])
+            except httpx.HTTPError as e:
+                logger.warning(f"Doc route failed for {kwargs.get(arg)!r}, calling {tool.name}: {e}")
+                text = None
+            return result(text) if text is not None else await coroutine(**kwargs)
+
+        return tool.model_copy(update={"func": run if func else None, "coroutine": arun if coroutine else None})
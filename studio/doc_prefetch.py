@@ -0,0 +1,140 @@
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from doc_registry import registry
+
+logger = logging.getLogger(__name__)
+
+# Which docs are layers (`kind`) and the hint words implying each layer
+# (`hints`) come from the docs' front matter, e.g.
+#
+#     ---
+#     kind: layer
+#     hints: api, database, endpoint
+#     ---
+HINT_WEIGHT = 1.5
+
+_token_re = re.compile(r"[a-z][a-z0-9]{2,}|[一-鿿]")
+_STOPWORDS = {
+    "the", "and", "for", "with", "that", "this", "should", "from", "into", "are",
+    "was", "will", "can", "have", "has", "when", "then", "given", "want", "not",
+    "its", "our", "your", "their", "which", "such", "all", "any", "each",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _token_re.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class LayerClassifier:
+    """IDF-weighted term overlap between a story and each layer doc.
+
+    Document vocabularies and hints are rebuilt only when the registry
+    version changes, so a prediction is a handful of dict lookups.
+    """
+
+    def __init__(self, min_ratio: float = 0.6):
+        self.min_ratio = min_ratio
+        self._version = -1
+        self._vocab: Dict[str, Counter] = {}
+        self._idf: Dict[str, float] = {}
+        self._hints: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    def layers(self) -> List[str]:
+        entries = (registry.get(n) for n in registry.names())
+        return [e.name for e in entries if e is not None and e.kind == "layer"]
+
+    def _rebuild(self):
+        with self._lock:
+            if self._version == registry.version:
+                return
+            entries = [e for e in (registry.get(n) for n in self.layers()) if e is not None]
+            self._vocab = {e.name: Counter(tokenize(e.content)) for e in entries}
+            self._hints = {e.name: {h.lower() for h in e.hints} for e in entries}
+            df = Counter(t for vocab in self._vocab.values() for t in vocab)
+            n_docs = max(len(entries), 1)
+            self._idf = {t: math.log(1 + n_docs / c) for t, c in df.items()}
+            self._version = registry.version
+
+    def scores(self, text: str) -> Dict[str, float]:
+        registry.refresh()
+        if self._version != registry.version:
+            self._rebuild()
+        tokens = set(tokenize(text))
+        scores = {}
+        for layer, vocab in self._vocab.items():
+            score = sum(self._idf[t] for t in tokens if t in vocab)
+            score += HINT_WEIGHT * len(tokens & self._hints.get(layer, set()))
+            scores[layer] = score
+        return scores
+
+    def predict(self, text: str) -> List[str]:
+        """Layers scoring within `min_ratio` of the best one."""
+        scores = self.scores(text)
+        if not scores:
+            return []
+        best = max(scores.values())
+        if best <= 0:
+            return []
+        return [l for l, s in scores.items() if s >= best * self.min_ratio]
+
+
+classifier = LayerClassifier()
+
+
+def prefetch(layers: Iterable[str]) -> Dict[str, str]:
+    """Contents of the given docs, skipping unknown names.
+
+    The registry keeps every doc in memory, so this is a dict lookup each.
+    """
+    docs = {}
+    for layer in layers:
+        entry = registry.get(layer)
+        if entry is not None:
+            docs[layer] = entry.content
+    return docs
+
+
+class PrefetchStats:
+    """Hit/miss counters for layer predictions."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def record(self, predicted: List[str], requested: List[str]) -> bool:
+        """Record one answer; a miss is any requested doc we didn't predict."""
+        missing = [l for l in requested if l not in predicted]
+        with self._lock:
+            if missing:
+                self.misses += 1
+            else:
+                self.hits += 1
+            total = self.hits + self.misses
+            logger.info(
+                f"Doc prefetch {'miss' if missing else 'hit'}: predicted={predicted} "
+                f"requested={requested} (hit rate {self.hits}/{total} = {self.hits / total:.0%})"
+            )
+        return not missing
+
+
+stats = PrefetchStats()
+
+
+def requested_layers(message, tool_name: str = "find_document", arg: Optional[str] = None) -> List[str]:
+    """Layers the model asked for via doc tool calls in `message`."""
+    layers = []
+    for call in getattr(message, "tool_calls", None) or []:
+        if call["name"] != tool_name:
+            continue
+        args = call.get("args") or {}
+        value = args.get(arg) if arg else next(iter(args.values()), None)
+        if value:
+            layers.append(value)
+    return layers
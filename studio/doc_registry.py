@@ -0,0 +1,278 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+current_file_path = os.path.abspath(__file__)
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(current_file_path), "tech_doc")
+DOC_SUFFIXES = (".md", ".markdown", ".txt")
+
+_heading_re = re.compile(r"^#{1,6}\s+(.+?)\s*#*\s*$", re.MULTILINE)
+_front_matter_re = re.compile(r"\A---[ \t]*\r?\n(.*?)^---[ \t]*(?:\r?\n|\Z)", re.MULTILINE | re.DOTALL)
+
+
+def split_front_matter(text: str) -> tuple:
+    """Split an optional leading `---` block of `key: value` lines from a doc.
+
+    Comma separated values become lists, e.g. `hints: api, database`.
+    Returns (metadata, body).
+    """
+    match = _front_matter_re.match(text)
+    if not match:
+        return {}, text
+    metadata = {}
+    for line in match.group(1).splitlines():
+        key, sep, value = line.partition(":")
+        if not sep or not key.strip() or key.lstrip().startswith("#"):
+            continue
+        value = value.strip()
+        metadata[key.strip().lower()] = [v.strip() for v in value.split(",") if v.strip()] if "," in value else value
+    return metadata, text[match.end():]
+
+
+@dataclass
+class DocEntry:
+    """Manifest entry for one tech document."""
+
+    name: str
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str
+    headings: List[str]
+    token_estimate: int
+    content: str = field(repr=False)
+    metadata: Dict[str, object] = field(default_factory=dict)
+
+    @property
+    def kind(self) -> str:
+        """`layer` for layer knowledge bases (the default), e.g. `input` for sample stories."""
+        return str(self.metadata.get("kind") or "layer")
+
+    @property
+    def hints(self) -> List[str]:
+        """Words that imply this doc's layer without appearing in it."""
+        hints = self.metadata.get("hints") or []
+        return [hints] if isinstance(hints, str) else list(hints)
+
+    @property
+    def etag(self) -> str:
+        """Strong HTTP entity tag; changes exactly when the content does."""
+        return f'"{self.sha256[:32]}"'
+
+    def manifest(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "path": self.path,
+            "size": self.size,
+            "sha256": self.sha256,
+            "headings": self.headings,
+            "token_estimate": self.token_estimate,
+            "metadata": self.metadata,
+        }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 chars per token, CJK counted per char)."""
+    cjk = sum(1 for ch in text if "一" <= ch <= "鿿")
+    return cjk + (len(text) - cjk) // 4
+
+
+def default_roots() -> List[str]:
+    """`tech_doc/` next to this file plus any roots in `TECH_DOC_ROOTS`."""
+    roots = [DEFAULT_ROOT]
+    extra = os.environ.get("TECH_DOC_ROOTS", "")
+    roots.extend(p for p in extra.split(os.pathsep) if p)
+    return roots
+
+
+class DocRegistry:
+    """Index of the tech documents under the configured roots.
+
+    The roots are scanned once on creation. Afterwards `refresh()` only
+    re-stats the files (at most once per `min_interval` seconds) and
+    re-reads the ones whose size or mtime changed, so new, edited or
+    deleted docs are picked up without a restart. Lookups by name are a
+    single dict access.
+    """
+
+    def __init__(self, roots: Optional[List[str]] = None, min_interval: float = 1.0):
+        self.roots = [os.path.abspath(r) for r in (roots or default_roots())]
+        self.min_interval = min_interval
+        self.version = 0
+        self._entries: Dict[str, DocEntry] = {}
+        self._lock = threading.Lock()
+        self._last_scan = 0.0
+        self.refresh(force=True)
+
+    def _scan(self) -> Dict[str, tuple]:
+        found = {}
+        for root in self.roots:
+            if not os.path.isdir(root):
+                continue
+            for item in sorted(os.scandir(root), key=lambda e: e.name):
+                if not item.is_file() or not item.name.endswith(DOC_SUFFIXES):
+                    continue
+                name = os.path.splitext(item.name)[0]
+                if name in found:
+                    logger.warning(f"Duplicate doc name {name!r}, keeping the first one")
+                    continue
+                found[name] = (item.path, item.stat())
+        return found
+
+    def _load(self, name: str, path: str, stat: os.stat_result) -> DocEntry:
+        with open(path, "r", encoding="utf-8") as file:
+            text = file.read()
+        # Front matter describes the doc; tools only return the body
+        metadata, content = split_front_matter(text)
+        return DocEntry(
+            name=name,
+            path=path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            sha256=hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            headings=_heading_re.findall(content),
+            token_estimate=estimate_tokens(content),
+            content=content,
+            metadata=metadata,
+        )
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-stat the roots and reload changed docs. Returns True on change."""
+        now = time.monotonic()
+        if not force and now - self._last_scan < self.min_interval:
+            return False
+        with self._lock:
+            self._last_scan = now
+            found = self._scan()
+            entries = {}
+            changed = set(found) != set(self._entries)
+            for name, (path, stat) in found.items():
+                old = self._entries.get(name)
+                if (
+                    old is not None
+                    and old.path == path
+                    and old.size == stat.st_size
+                    and old.mtime_ns == stat.st_mtime_ns
+                ):
+                    entries[name] = old
+                    continue
+                try:
+                    entries[name] = self._load(name, path, stat)
+                except OSError as e:
+                    logger.error(f"Failed to load doc {path}: {e}")
+                    continue
+                changed = changed or old is None or old.sha256 != entries[name].sha256
+            self._entries = entries
+            if changed:
+                self.version += 1
+                logger.info(f"Doc registry v{self.version}: {sorted(entries)}")
+            return changed
+
+    def names(self) -> List[str]:
+        self.refresh()
+        return list(self._entries)
+
+    def get(self, name: str) -> Optional[DocEntry]:
+        self.refresh()
+        return self._entries.get(name)
+
+    def read(self, name: str) -> str:
+        entry = self.get(name)
+        if entry is None:
+            allowed = ", ".join(f"'{n}'" for n in self._entries)
+            raise ValueError(f"Unsupported layer. Only {allowed} are allowed.")
+        return entry.content
+
+    def manifest(self) -> List[Dict[str, object]]:
+        self.refresh()
+        return [entry.manifest() for entry in self._entries.values()]
+
+    def describe(self) -> str:
+        """Human readable list of docs used in tool descriptions."""
+        return ", ".join(f'"{name}"' for name in self.names())
+
+    def input_schema(self, arg: str = "layer") -> Dict[str, object]:
+        """JSON schema for a `{arg: <doc name>}` tool input."""
+        return {
+            "type": "object",
+            "properties": {
+                arg: {
+                    "type": "string",
+                    "enum": self.names(),
+                    "description": f"the {arg} of tech document to find",
+                }
+            },
+            "required": [arg],
+        }
+
+    def tool_description(self, arg: str = "layer") -> str:
+        return f"""Finds the tech document based on the {arg}.
+
+Args:
+    {arg}: the {arg} of tech document to find only include {self.describe()}
+"""
+
+
+registry = DocRegistry()
+
+
+def make_find_document_tool(name: str = "find_document", arg: str = "layer"):
+    """Build a LangChain tool whose schema enumerates the current docs."""
+    from langchain_core.tools import StructuredTool
+
+    def find_document(**kwargs) -> str:
+        return registry.read(kwargs[arg])
+
+    return StructuredTool.from_function(
+        func=find_document,
+        name=name,
+        description=registry.tool_description(arg),
+        args_schema=registry.input_schema(arg),
+        metadata={"doc_tool": (name, arg)},
+    )
+
+
+# (llm, tools, registry version, bound model) by ids; holding llm and the
+# tools keeps their ids from being reused while the entry exists
+_bound_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_bound_lock = threading.Lock()
+MAX_BOUND = 64
+
+
+def bind_doc_tools(llm, tools: list):
+    """`llm.bind_tools(tools)`, rebound only when the registry changes.
+
+    Doc tools built by `make_find_document_tool` freeze the layer enum at
+    creation, so they are rebuilt (same name and arg) when docs are added
+    or removed; other tools are passed through unchanged.
+    """
+    from tool_cache import bound_model
+
+    registry.refresh()
+    key = (id(llm), tuple(id(t) for t in tools))
+    with _bound_lock:
+        cached = _bound_cache.get(key)
+        if cached is not None and cached[2] == registry.version:
+            _bound_cache.move_to_end(key)
+            return cached[3]
+    rebuilt = [
+        make_find_document_tool(*t.metadata["doc_tool"])
+        if "doc_tool" in (getattr(t, "metadata", None) or {})
+        else t
+        for t in tools
+    ]
+    bound = bound_model(llm, rebuilt)
+    with _bound_lock:
+        _bound_cache[key] = (llm, list(tools), registry.version, bound)
+        _bound_cache.move_to_end(key)
+        while len(_bound_cache) > MAX_BOUND:
+            _bound_cache.popitem(last=False)
+    return bound
@@ -0,0 +1,250 @@
+"""
+Offline stand-ins for the remote documentation MCP servers.
+
+Serves the same tool names and argument schemas as the Microsoft Learn MCP
+server (`--profile microsoft`) or the AWS documentation MCP server
+(`--profile aws`) over a small fixture corpus, so agent_tech_QA_MCP can be
+load-tested without network access. Latency, error rate and payload size
+are configurable per process:
+
+    python fake_mcp_server.py --profile microsoft                      # stdio
+    python fake_mcp_server.py --profile aws --transport streamable-http --port 8102
+    python fake_mcp_server.py --profile microsoft --latency 0.2 --jitter 0.1 --error-rate 0.05 --payload 4000
+
+The same settings can come from FAKE_MCP_LATENCY, FAKE_MCP_JITTER,
+FAKE_MCP_ERROR_RATE, FAKE_MCP_PAYLOAD and FAKE_MCP_SEED.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+from typing import Dict, List, Optional
+
+from mcp.server.fastmcp import FastMCP
+
+from doc_prefetch import tokenize
+
+MICROSOFT_DOCS = [
+    {
+        "title": "Azure Database for PostgreSQL - Flexible Server pricing",
+        "url": "https://learn.microsoft.com/azure/postgresql/flexible-server/concepts-compute",
+        "content": "Azure Database for PostgreSQL flexible server is billed per vCore hour for compute, "
+        "per GiB month for provisioned storage and per GiB for backup storage beyond the free allowance. "
+        "Burstable B1ms instances suit development workloads; General Purpose D-series suit production.",
+    },
+    {
+        "title": "Azure App Service plans overview",
+        "url": "https://learn.microsoft.com/azure/app-service/overview-hosting-plans",
+        "content": "An App Service plan defines the compute resources for a web app. Basic, Standard and "
+        "Premium tiers add scale out, deployment slots and VNet integration. Apps in the same plan share "
+        "instances, so the plan tier drives the monthly cost.",
+    },
+    {
+        "title": "Azure Static Web Apps overview",
+        "url": "https://learn.microsoft.com/azure/static-web-apps/overview",
+        "content": "Azure Static Web Apps hosts static frontend builds from frameworks such as React, Vue and "
+        "Angular with a global CDN, staging environments from pull requests and an integrated API backed "
+        "by Azure Functions.",
+    },
+    {
+        "title": "Azure Pricing Calculator and cost estimation",
+        "url": "https://learn.microsoft.com/azure/cost-management-billing/costs/pricing-calculator",
+        "content": "Use the pricing calculator to estimate the monthly cost of Azure services. Add each "
+        "service, choose region, tier and expected usage, then export the estimate.",
+    },
+    {
+        "title": "Azure OpenAI Service quotas and limits",
+        "url": "https://learn.microsoft.com/azure/ai-services/openai/quotas-limits",
+        "content": "Azure OpenAI enforces tokens-per-minute and requests-per-minute quotas per deployment "
+        "and region. Exceeding a quota returns HTTP 429 with a retry-after header.",
+    },
+]
+
+MICROSOFT_SAMPLES = [
+    {
+        "title": "Connect to Azure Database for PostgreSQL from Python",
+        "language": "python",
+        "url": "https://learn.microsoft.com/azure/postgresql/flexible-server/connect-python",
+        "code": "import psycopg2\nconn = psycopg2.connect(host=host, dbname=dbname, user=user, "
+        "password=password, sslmode='require')\n",
+    },
+    {
+        "title": "Deploy a Node.js web app to Azure App Service",
+        "language": "javascript",
+        "url": "https://learn.microsoft.com/azure/app-service/quickstart-nodejs",
+        "code": "const express = require('express');\nconst app = express();\n"
+        "app.listen(process.env.PORT || 3000);\n",
+    },
+]
+
+AWS_DOCS = [
+    {
+        "title": "Amazon RDS for PostgreSQL",
+        "url": "https://docs.aws.amazon.com/AmazonRDS/latest/UserGuide/CHAP_PostgreSQL.html",
+        "content": "Amazon RDS for PostgreSQL manages provisioning, patching, backups and Multi-AZ failover. "
+        "Instances are billed per hour by instance class plus provisioned storage and I/O.",
+    },
+    {
+        "title": "Amazon Bedrock user guide",
+        "url": "https://docs.aws.amazon.com/bedrock/latest/userguide/what-is-bedrock.html",
+        "content": "Amazon Bedrock offers foundation models through a single API, with knowledge bases for "
+        "retrieval augmented generation, agents and guardrails for AI applications.",
+    },
+    {
+        "title": "Amazon SageMaker AI developer guide",
+        "url": "https://docs.aws.amazon.com/sagemaker/latest/dg/whatis.html",
+        "content": "SageMaker AI provides managed notebooks, training jobs and real-time or serverless "
+        "inference endpoints for building and deploying machine learning models.",
+    },
+    {
+        "title": "AWS Lambda developer guide",
+        "url": "https://docs.aws.amazon.com/lambda/latest/dg/welcome.html",
+        "content": "Lambda runs code without provisioning servers. You pay per request and per GB-second "
+        "of compute, and functions scale automatically with incoming events.",
+    },
+    {
+        "title": "Amazon S3 and CloudFront for static websites",
+        "url": "https://docs.aws.amazon.com/AmazonS3/latest/userguide/WebsiteHosting.html",
+        "content": "Host a static frontend in an S3 bucket and serve it through CloudFront for HTTPS, "
+        "caching at edge locations and custom domains.",
+    },
+]
+
+
+class FakeBehaviour:
+    """Latency, failure and payload settings shared by every tool call."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 payload: int = 0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.payload = payload
+        self.random = random.Random(seed)
+
+    async def before_call(self, tool: str):
+        delay = max(0.0, self.random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+        if delay:
+            await asyncio.sleep(delay)
+        if self.random.random() < self.error_rate:
+            raise RuntimeError(f"Injected failure in {tool}")
+
+    def pad(self, text: str) -> str:
+        """Repeat `text` up to `payload` characters, like long doc pages."""
+        if not self.payload or len(text) >= self.payload or not text:
+            return text
+        return (text + "\n\n") * (self.payload // (len(text) + 2)) + text[: self.payload % (len(text) + 2)]
+
+
+def search(corpus: List[Dict], query: str, limit: int) -> List[Dict]:
+    """Rank fixture docs by term overlap with the query."""
+    terms = set(tokenize(query))
+    scored = [(len(terms & set(tokenize(d["title"] + " " + d.get("content", d.get("code", ""))))), i)
+              for i, d in enumerate(corpus)]
+    ranked = [corpus[i] for score, i in sorted(scored, key=lambda s: (-s[0], s[1])) if score > 0]
+    return (ranked or corpus)[:limit]
+
+
+def microsoft_server(behaviour: FakeBehaviour, **settings) -> FastMCP:
+    mcp = FastMCP("Fake Microsoft Learn Docs", **settings)
+
+    @mcp.tool()
+    async def microsoft_docs_search(query: str) -> str:
+        """Search official Microsoft/Azure documentation to find the most relevant and trustworthy content
+        for a user's query. This tool returns up to 10 high-quality content chunks (each max 500 tokens),
+        extracted from Microsoft Learn and other official sources."""
+        await behaviour.before_call("microsoft_docs_search")
+        results = [
+            {"title": d["title"], "content": behaviour.pad(d["content"]), "contentUrl": d["url"]}
+            for d in search(MICROSOFT_DOCS, query, 10)
+        ]
+        return json.dumps(results, ensure_ascii=False)
+
+    @mcp.tool()
+    async def microsoft_docs_fetch(url: str) -> str:
+        """Fetch and convert a Microsoft Learn documentation page to markdown format.
+        Use this to read the complete page after finding it with microsoft_docs_search."""
+        await behaviour.before_call("microsoft_docs_fetch")
+        doc = next((d for d in MICROSOFT_DOCS if d["url"] == url), None)
+        if doc is None:
+            return f"Failed to fetch {url}: page not found"
+        return behaviour.pad(f"# {doc['title']}\n\n{doc['content']}")
+
+    @mcp.tool()
+    async def microsoft_code_sample_search(query: str, language: Optional[str] = None) -> str:
+        """Search for code snippets and examples in official Microsoft Learn documentation.
+        Optionally filter by programming language."""
+        await behaviour.before_call("microsoft_code_sample_search")
+        samples = [s for s in MICROSOFT_SAMPLES if not language or s["language"] == language.lower()]
+        results = [
+            {"title": s["title"], "language": s["language"], "link": s["url"], "codeSnippet": behaviour.pad(s["code"])}
+            for s in search(samples or MICROSOFT_SAMPLES, query, 5)
+        ]
+        return json.dumps(results, ensure_ascii=False)
+
+    return mcp
+
+
+def aws_server(behaviour: FakeBehaviour, **settings) -> FastMCP:
+    mcp = FastMCP("Fake AWS Documentation", **settings)
+
+    @mcp.tool()
+    async def search_documentation(search_phrase: str, limit: int = 10) -> str:
+        """Search AWS documentation using the official AWS Documentation Search API.
+        Returns a list of results with rank order, URL, title and context."""
+        await behaviour.before_call("search_documentation")
+        results = [
+            {"rank_order": i + 1, "url": d["url"], "title": d["title"], "context": behaviour.pad(d["content"])}
+            for i, d in enumerate(search(AWS_DOCS, search_phrase, limit))
+        ]
+        return json.dumps(results, ensure_ascii=False)
+
+    @mcp.tool()
+    async def read_documentation(url: str, max_length: int = 5000, start_index: int = 0) -> str:
+        """Fetch and convert an AWS documentation page to markdown format.
+        For long pages, read further with start_index."""
+        await behaviour.before_call("read_documentation")
+        doc = next((d for d in AWS_DOCS if d["url"] == url), None)
+        if doc is None:
+            return f"Failed to fetch {url}: page not found"
+        page = behaviour.pad(f"# {doc['title']}\n\n{doc['content']}")
+        return f"AWS Documentation from {url}:\n\n{page[start_index : start_index + max_length]}"
+
+    @mcp.tool()
+    async def recommend(url: str) -> str:
+        """Get content recommendations for an AWS documentation page: highly rated, new,
+        similar and journey pages."""
+        await behaviour.before_call("recommend")
+        results = [{"url": d["url"], "title": d["title"], "context": d["content"][:120]}
+                   for d in AWS_DOCS if d["url"] != url]
+        return json.dumps(results, ensure_ascii=False)
+
+    return mcp
+
+
+PROFILES = {"microsoft": microsoft_server, "aws": aws_server}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline fake documentation MCP server")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="microsoft")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http"], default="stdio")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8101)
+    parser.add_argument("--latency", type=float, default=float(os.environ.get("FAKE_MCP_LATENCY") or 0))
+    parser.add_argument("--jitter", type=float, default=float(os.environ.get("FAKE_MCP_JITTER") or 0))
+    parser.add_argument("--error-rate", type=float, default=float(os.environ.get("FAKE_MCP_ERROR_RATE") or 0))
+    parser.add_argument("--payload", type=int, default=int(os.environ.get("FAKE_MCP_PAYLOAD") or 0),
+                        help="pad each returned document to this many characters")
+    parser.add_argument("--seed", type=int, default=int(os.environ["FAKE_MCP_SEED"]) if os.environ.get("FAKE_MCP_SEED") else None)
+    args = parser.parse_args()
+
+    behaviour = FakeBehaviour(args.latency, args.jitter, args.error_rate, args.payload, args.seed)
+    mcp = PROFILES[args.profile](behaviour, host=args.host, port=args.port)
+    mcp.run(transport=args.transport)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Set, Tuple
+
+from log_ingest import parse_entries
+
+current_file_path = os.path.abspath(__file__)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(current_file_path), ".incident_index.json")
+
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+
+# Deterministic permutations so signatures stay valid across restarts
+_coeffs = [
+    struct.unpack("<QQ", hashlib.blake2b(f"perm-{i}".encode(), digest_size=16).digest())
+    for i in range(NUM_PERM)
+]
+_PERMS = [(a % _PRIME or 1, b % _PRIME) for a, b in _coeffs]
+
+_mask_patterns = [
+    (re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?"), "<TS>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I), "<UUID>"),
+    (re.compile(r"\b\d{1,3}(?:\.(?:\d{1,3}|\*\*)){3}\b"), "<IP>"),
+    (re.compile(r"\b(?=[A-Z0-9-]*\d)[A-Z][A-Z0-9]*-[A-Z0-9-]+\b"), "<ID>"),
+    (re.compile(r"\b[A-Z]\d{3,}\b"), "<ID>"),
+    (re.compile(r"[¥$€]?\d+(?:[.,]\d+)*"), "<NUM>"),
+]
+_error_code_re = re.compile(r"\b[A-Z][A-Z0-9]+(?:_[A-Z0-9]+){2,}\b")
+_word_re = re.compile(r"<\w+>|[A-Za-z_][\w.]*")
+
+
+def mask(text: str) -> str:
+    """Replace timestamps, IDs, IPs and numbers with placeholders."""
+    for pattern, placeholder in _mask_patterns:
+        text = pattern.sub(placeholder, text)
+    return text
+
+
+def log_features(log: str) -> Set[str]:
+    """Normalised signature features of a log.
+
+    Error codes, logger classes, the sequence of entry tags and shingles
+    of the masked message text; IDs and timestamps never reach a feature.
+    """
+    features = set()
+    entries = parse_entries(log) or [{"level": "", "logger": "", "tag": "", "message": log}]
+    tags = []
+    for entry in entries:
+        features.update(f"code:{c}" for c in _error_code_re.findall(entry["message"]))
+        if entry["logger"]:
+            features.add(f"logger:{entry['logger']}")
+        if entry["tag"]:
+            tags.append(f"{entry['level']}/{entry['tag']}")
+        words = _word_re.findall(mask(entry["message"]))
+        features.update(f"w:{' '.join(words[i:i + 3])}" for i in range(max(1, len(words) - 2)))
+    features.update(f"tags:{a}>{b}" for a, b in zip(tags, tags[1:]))
+    return features
+
+
+def _feature_hash(feature: str) -> int:
+    return struct.unpack("<Q", hashlib.blake2b(feature.encode(), digest_size=8).digest())[0]
+
+
+def minhash(features: Set[str]) -> List[int]:
+    hashes = [_feature_hash(f) for f in features] or [0]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+
+def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / NUM_PERM
+
+
+class IncidentIndex:
+    """Past log analyses keyed by a MinHash of the normalised log signature.
+
+    Candidates come from LSH buckets (32 bands of 4 rows), so a lookup
+    touches only incidents that share a band. The index persists as a JSON
+    file and evicts the least recently used incidents beyond `max_entries`
+    and those unused for `ttl` seconds.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, threshold: float = 0.8,
+                 max_entries: int = 1000, ttl: Optional[float] = 30 * 24 * 3600):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: Dict[str, Dict] = {}
+        self._buckets: Dict[Tuple[int, tuple], Set[str]] = {}
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self._load()
+
+    def _bands(self, signature: List[int]):
+        for band in range(BANDS):
+            yield band, tuple(signature[band * ROWS : (band + 1) * ROWS])
+
+    def _insert(self, incident_id: str, entry: Dict):
+        self._entries[incident_id] = entry
+        for key in self._bands(entry["signature"]):
+            self._buckets.setdefault(key, set()).add(incident_id)
+
+    def _remove(self, incident_id: str):
+        entry = self._entries.pop(incident_id)
+        for key in self._bands(entry["signature"]):
+            bucket = self._buckets.get(key)
+            if bucket:
+                bucket.discard(incident_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Failed to load incident index {self.path}: {e}")
+            return
+        for incident_id, entry in data.get("incidents", {}).items():
+            self._insert(incident_id, entry)
+
+    def _save(self):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump({"incidents": self._entries}, file, ensure_ascii=False)
+        os.replace(tmp, self.path)
+        self._last_save = time.monotonic()
+
+    def _evict(self):
+        now = time.time()
+        if self.ttl is not None:
+            for incident_id in [i for i, e in self._entries.items() if now - e["last_used"] > self.ttl]:
+                self._remove(incident_id)
+        if len(self._entries) > self.max_entries:
+            by_age = sorted(self._entries, key=lambda i: self._entries[i]["last_used"])
+            for incident_id in by_age[: len(self._entries) - self.max_entries]:
+                self._remove(incident_id)
+
+    def lookup(self, log: str, signature: Optional[List[int]] = None) -> Optional[Tuple[Dict, float]]:
+        """Best prior incident at or above the threshold, with its similarity."""
+        signature = signature or minhash(log_features(log))
+        with self._lock:
+            candidates = set()
+            for key in self._bands(signature):
+                candidates |= self._buckets.get(key, set())
+            now = time.time()
+            expired = [
+                i for i in candidates
+                if self.ttl is not None and now - self._entries[i]["last_used"] > self.ttl
+            ]
+            # An expired match must not be served, or its hit would keep it alive
+            for incident_id in expired:
+                self._remove(incident_id)
+            best, best_score = None, 0.0
+            for incident_id in candidates.difference(expired):
+                score = similarity(signature, self._entries[incident_id]["signature"])
+                if score > best_score:
+                    best, best_score = incident_id, score
+            if best is None or best_score < self.threshold:
+                if expired:
+                    self._save()
+                return None
+            entry = self._entries[best]
+            entry["last_used"] = now
+            entry["hits"] += 1
+            # Usage stats only drive eviction, so hits don't rewrite the file every time
+            if expired or time.monotonic() - self._last_save > 30:
+                self._save()
+            return entry, best_score
+
+    def add(self, log: str, summary: str, signature: Optional[List[int]] = None) -> str:
+        signature = signature or minhash(log_features(log))
+        incident_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._insert(
+                incident_id,
+                {"signature": signature, "summary": summary, "created": now, "last_used": now, "hits": 0},
+            )
+            self._evict()
+            self._save()
+        return incident_id
+
+    def __len__(self):
+        return len(self._entries)
+
+
+incident_index = IncidentIndex(
+    path=os.environ.get("INCIDENT_INDEX_PATH") or DEFAULT_PATH,
+    threshold=float(os.environ.get("INCIDENT_INDEX_THRESHOLD") or 0.8),
+    max_entries=int(os.environ.get("INCIDENT_INDEX_MAX") or 1000),
+)
@@ -0,0 +1,326 @@
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+_duration_re = re.compile(r"([\d.]+)(ms|s|m|h)")
+_units = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Parse rate-limit reset values such as `20ms`, `1s`, `6m0s` or `2`."""
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _duration_re.findall(value)
+    if not parts:
+        return None
+    return sum(float(n) * _units[u] for n, u in parts)
+
+
+class TokenBucket:
+    """Bucket refilled continuously at `per_minute / 60` units per second."""
+
+    def __init__(self, per_minute: Optional[float]):
+        self.capacity = per_minute
+        self.level = per_minute or 0.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        if self.capacity is None:
+            return
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken (0 if available now)."""
+        if self.capacity is None:
+            return 0.0
+        self._refill(now)
+        # Requests larger than the bucket only need a full bucket
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60 / self.capacity
+
+    def take(self, amount: float, now: float):
+        if self.capacity is None:
+            return
+        self._refill(now)
+        # May go negative when actual usage exceeds the estimate
+        self.level -= amount
+
+
+class ProviderState:
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.queue = deque()
+        self.backoff_until = 0.0
+        self.consecutive_429 = 0
+        self.in_flight = 0
+        self.waits = deque(maxlen=500)
+        self.throttled = 0
+        self.admitted = 0
+
+
+class Governor:
+    """Process-wide admission control for LLM and tool calls.
+
+    Each provider has request-per-minute and token-per-minute buckets and
+    a FIFO queue, so callers are admitted in arrival order. All providers
+    share a bounded number of concurrent calls. A 429 or rate-limit headers
+    that report exhausted quota pause the provider until the advertised
+    reset, or with exponential back-off if no reset is advertised.
+    """
+
+    def __init__(self, max_concurrency: int = 32, limits: Optional[Dict[str, Dict[str, float]]] = None,
+                 base_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.max_concurrency = max_concurrency
+        self.limits = limits or {}
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.in_flight = 0
+        self._providers: Dict[str, ProviderState] = {}
+        self._cond = threading.Condition()
+        self._async_waiters = set()
+
+    def _provider(self, name: str) -> ProviderState:
+        state = self._providers.get(name)
+        if state is None:
+            limit = self.limits.get(name, {})
+            state = self._providers[name] = ProviderState(limit.get("rpm"), limit.get("tpm"))
+        return state
+
+    def _delay(self, state: ProviderState, ticket, tokens: float, now: float) -> Optional[float]:
+        """0 when `ticket` can be admitted, seconds to wait, or None to wait for a release."""
+        if state.queue[0] is not ticket:
+            return None
+        delay = max(
+            state.backoff_until - now,
+            state.requests.wait_time(1, now),
+            state.tokens.wait_time(tokens, now),
+        )
+        if delay <= 0 and self.in_flight >= self.max_concurrency:
+            return None
+        return max(delay, 0.0)
+
+    def _admit(self, state: ProviderState, tokens: float, start: float) -> float:
+        now = time.monotonic()
+        state.requests.take(1, now)
+        state.tokens.take(tokens, now)
+        state.in_flight += 1
+        state.admitted += 1
+        self.in_flight += 1
+        waited = now - start
+        state.waits.append(waited)
+        return waited
+
+    def _notify(self):
+        """Wake sync and async waiters; called with the lock held."""
+        self._cond.notify_all()
+        for loop, event in list(self._async_waiters):
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:  # loop already closed
+                self._async_waiters.discard((loop, event))
+
+    def acquire(self, provider: str, tokens: float = 0) -> float:
+        """Block until admitted; returns the time spent waiting."""
+        start = time.monotonic()
+        ticket = object()
+        with self._cond:
+            state = self._provider(provider)
+            state.queue.append(ticket)
+            try:
+                while True:
+                    delay = self._delay(state, ticket, tokens, time.monotonic())
+                    if delay == 0:
+                        break
+                    self._cond.wait(timeout=delay)
+            finally:
+                state.queue.remove(ticket)
+                self._notify()
+            return self._admit(state, tokens, start)
+
+    async def aacquire(self, provider: str, tokens: float = 0) -> float:
+        """Async `acquire`: waits on the event loop, and a cancelled waiter
+        leaves the queue without taking a slot."""
+        start = time.monotonic()
+        ticket = object()
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._cond:
+            state = self._provider(provider)
+            state.queue.append(ticket)
+            self._async_waiters.add(waiter)
+        try:
+            while True:
+                with self._cond:
+                    delay = self._delay(state, ticket, tokens, time.monotonic())
+                    if delay == 0:
+                        return self._admit(state, tokens, start)
+                    waiter[1].clear()
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._cond:
+                state.queue.remove(ticket)
+                self._async_waiters.discard(waiter)
+                self._notify()
+
+    def release(self, provider: str, estimated_tokens: float = 0, actual_tokens: Optional[float] = None):
+        with self._cond:
+            state = self._provider(provider)
+            if actual_tokens is not None:
+                state.tokens.take(actual_tokens - estimated_tokens, time.monotonic())
+            state.in_flight -= 1
+            self.in_flight -= 1
+            self._notify()
+
+    @contextmanager
+    def limit(self, provider: str, tokens: float = 0):
+        """Admit one call; set `usage["tokens"]` to correct the estimate."""
+        self.acquire(provider, tokens)
+        usage: Dict[str, Any] = {}
+        try:
+            yield usage
+        except Exception as e:
+            self.observe_error(provider, e)
+            raise
+        else:
+            self.observe_success(provider)
+        finally:
+            self.release(provider, tokens, usage.get("tokens"))
+
+    @asynccontextmanager
+    async def alimit(self, provider: str, tokens: float = 0):
+        await self.aacquire(provider, tokens)
+        usage: Dict[str, Any] = {}
+        try:
+            yield usage
+        except Exception as e:
+            self.observe_error(provider, e)
+            raise
+        else:
+            self.observe_success(provider)
+        finally:
+            self.release(provider, tokens, usage.get("tokens"))
+
+    def _backoff(self, state: ProviderState, seconds: float):
+        with self._cond:
+            state.backoff_until = max(state.backoff_until, time.monotonic() + seconds)
+            state.throttled += 1
+
+    def observe_success(self, provider: str):
+        self._provider(provider).consecutive_429 = 0
+
+    def observe_headers(self, provider: str, headers: Optional[Mapping[str, str]]):
+        """Pause the provider when headers report exhausted quota."""
+        if not headers:
+            return
+        headers = {k.lower(): v for k, v in headers.items()}
+        state = self._provider(provider)
+        if "retry-after" in headers:
+            try:
+                delay = parse_duration(headers["retry-after"])
+            except ValueError:
+                delay = None
+            if delay:
+                self._backoff(state, delay)
+                return
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = headers.get(f"x-ratelimit-reset-{kind}")
+            if remaining is None or reset is None:
+                continue
+            try:
+                exhausted = float(remaining) <= 0
+                delay = parse_duration(reset) if exhausted else None
+            except ValueError:
+                # A malformed header must not fail the call that returned it
+                logger.warning(f"Ignoring malformed rate-limit headers from {provider}: {remaining!r}, {reset!r}")
+                continue
+            if delay:
+                self._backoff(state, delay)
+
+    def observe_error(self, provider: str, error: BaseException):
+        response = getattr(error, "response", None)
+        status = getattr(error, "status_code", None) or getattr(response, "status_code", None)
+        if status != 429 and "429" not in type(error).__name__ and "RateLimit" not in type(error).__name__:
+            return
+        state = self._provider(provider)
+        state.consecutive_429 += 1
+        headers = getattr(response, "headers", None)
+        before = state.backoff_until
+        self.observe_headers(provider, headers)
+        if state.backoff_until == before:
+            delay = min(self.max_backoff, self.base_backoff * 2 ** (state.consecutive_429 - 1))
+            self._backoff(state, delay)
+        logger.warning(f"{provider} rate limited, backing off until +{state.backoff_until - time.monotonic():.1f}s")
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        with self._cond:
+            result = {}
+            for name, state in self._providers.items():
+                waits = sorted(state.waits)
+                result[name] = {
+                    "queue_depth": len(state.queue),
+                    "in_flight": state.in_flight,
+                    "admitted": state.admitted,
+                    "throttled": state.throttled,
+                    "wait_avg": sum(waits) / len(waits) if waits else 0.0,
+                    "wait_p95": waits[int(0.95 * (len(waits) - 1))] if waits else 0.0,
+                    "backoff_remaining": max(0.0, state.backoff_until - time.monotonic()),
+                }
+            return result
+
+
+def parse_limits(spec: str) -> Dict[str, Dict[str, float]]:
+    """Parse `openai=500rpm/200000tpm,tavily=60rpm` into per-provider limits."""
+    limits = {}
+    for item in filter(None, (s.strip() for s in spec.split(","))):
+        provider, _, values = item.partition("=")
+        limit = {}
+        for value in values.split("/"):
+            match = re.fullmatch(r"([\d.]+)\s*(rpm|tpm)", value.strip())
+            if match:
+                limit[match.group(2)] = float(match.group(1))
+        limits[provider.strip()] = limit
+    return limits
+
+
+PROVIDER_NAMES = {
+    "ChatOpenAI": "openai",
+    "AzureChatOpenAI": "openai",
+    "ChatGoogleGenerativeAI": "google_genai",
+    "ChatAnthropic": "anthropic",
+}
+
+
+def provider_of(model) -> str:
+    bound = getattr(model, "bound", model)
+    name = type(bound).__name__
+    return PROVIDER_NAMES.get(name, name)
+
+
+def estimate_message_tokens(messages) -> int:
+    if isinstance(messages, str):
+        return len(messages) // 4 + 1
+    return sum(len(str(getattr(m, "content", m))) for m in messages) // 4 + 1
+
+
+governor = Governor(
+    max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY") or 32),
+    limits=parse_limits(os.environ.get("LLM_RATE_LIMITS", "")),
+)
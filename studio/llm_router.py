@@ -0,0 +1,375 @@
+import asyncio
+import importlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import Field, model_validator
+
+from llm_governor import Governor, estimate_message_tokens, governor as default_governor, provider_of
+
+logger = logging.getLogger(__name__)
+
+# provider prefix -> (module, class) for LLM_FALLBACK_MODELS entries
+PROVIDERS = {
+    "openai": ("langchain_openai", "ChatOpenAI"),
+    "google_genai": ("langchain_google_genai", "ChatGoogleGenerativeAI"),
+    "anthropic": ("langchain_anthropic", "ChatAnthropic"),
+}
+
+_hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-hedge")
+
+
+class BackendHealth:
+    """Rolling latency / error window and circuit breaker for one backend.
+
+    Errors only weigh on the latency score for `error_window` seconds.
+    After `cooldown` an open circuit is half-open: one caller claims the
+    probe, and its outcome closes or re-opens the circuit. A probe that
+    never reports back (e.g. a cancelled hedge) expires after `cooldown`.
+    """
+
+    def __init__(self, window: int = 100, failure_threshold: int = 3, cooldown: float = 30.0,
+                 error_window: float = 60.0):
+        self.latencies = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)  # (monotonic time, ok)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.error_window = error_window
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self.latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    @property
+    def error_rate(self) -> float:
+        """Share of failed calls within the last `error_window` seconds."""
+        since = time.monotonic() - self.error_window
+        with self._lock:
+            recent = [ok for at, ok in self.outcomes if at >= since]
+        if not recent:
+            return 0.0
+        return recent.count(False) / len(recent)
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def claim_probe(self) -> bool:
+        """True for the one caller that may probe a half-open backend."""
+        now = time.monotonic()
+        with self._lock:
+            if self.opened_at is None or now - self.opened_at < self.cooldown:
+                return False
+            if self.probe_at is not None and now - self.probe_at < self.cooldown:
+                return False
+            self.probe_at = now
+            return True
+
+    def release_probe(self):
+        with self._lock:
+            self.probe_at = None
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.latencies.append(latency)
+            self.outcomes.append((time.monotonic(), True))
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.probe_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.outcomes.append((time.monotonic(), False))
+            self.consecutive_failures += 1
+            # A failed half-open probe re-opens the circuit for another cooldown
+            if self.consecutive_failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+            self.probe_at = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "error_rate": self.error_rate,
+            "samples": len(self.latencies),
+        }
+
+
+def backend_name(model) -> str:
+    bound = getattr(model, "bound", model)
+    model_name = getattr(bound, "model_name", None) or getattr(bound, "model", None)
+    return f"{type(bound).__name__}:{model_name}" if model_name else type(bound).__name__
+
+
+class RouterChatModel(BaseChatModel):
+    """Chat model that routes each call to the fastest healthy backend.
+
+    Backends are ranked by rolling p95 latency weighted by their error rate
+    over the last `error_window` seconds; backends without enough samples
+    keep their configured order, so the first backend stays the primary
+    until it is measured to be slower. Failed calls fall through to the
+    next backend, a circuit breaker skips a backend for `cooldown` seconds
+    after `failure_threshold` consecutive failures and then lets one call
+    probe it, and with `hedge_after` set a duplicate request
+    is sent to the runner-up when the first one is still pending after
+    that many seconds. `bind_tools` binds every backend and returns a
+    router sharing the same health stats.
+
+    Fake models work as backends for tests, e.g. a `GenericFakeChatModel`
+    or a `RunnableLambda` that sleeps before returning an `AIMessage`.
+    """
+
+    backends: List[Any]
+    names: List[str] = Field(default_factory=list)
+    hedge_after: Optional[float] = None
+    min_samples: int = 5
+    failure_threshold: int = 3
+    cooldown: float = 30.0
+    error_window: float = 60.0
+    health: Dict[str, BackendHealth] = Field(default_factory=dict, exclude=True)
+    governor: Governor = Field(default_factory=lambda: default_governor, exclude=True)
+
+    @model_validator(mode="after")
+    def _init_health(self):
+        if not self.names:
+            names = [backend_name(b) for b in self.backends]
+            self.names = [
+                name if names.count(name) == 1 else f"{name}#{i}"
+                for i, name in enumerate(names)
+            ]
+        for name in self.names:
+            if name not in self.health:
+                self.health[name] = BackendHealth(
+                    failure_threshold=self.failure_threshold,
+                    cooldown=self.cooldown,
+                    error_window=self.error_window,
+                )
+        return self
+
+    @property
+    def _llm_type(self) -> str:
+        return "router"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(
+            update={"backends": [b.bind_tools(tools, **kwargs) for b in self.backends]}
+        )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: self.health[name].snapshot() for name in self.names}
+
+    def _ranked(self) -> List[int]:
+        """Backends to try, in order.
+
+        A half-open backend whose probe this call claimed goes first (a
+        failure still falls through to the others), then closed backends by
+        score, then backends whose circuit is open as a last resort.
+        """
+        probes, closed, down = [], [], []
+        for i, name in enumerate(self.names):
+            health = self.health[name]
+            state = health.state
+            if state == "closed":
+                closed.append(i)
+            elif state == "half_open" and health.claim_probe():
+                probes.append(i)
+            else:
+                down.append(i)
+
+        def score(i):
+            health = self.health[self.names[i]]
+            p95 = health.percentile(0.95)
+            if p95 is None or len(health.latencies) < self.min_samples:
+                return (float("inf"), i)
+            return (p95 * (1 + health.error_rate), i)
+
+        return probes + sorted(closed, key=score) + down
+
+    def _observe(self, provider: str, message, usage: dict, headers: Optional[dict] = None):
+        usage["tokens"] = (getattr(message, "usage_metadata", None) or {}).get("total_tokens")
+        # Headers are only requested for the governor; keep cookies and
+        # request ids out of the message that ends up in checkpoints
+        metadata = getattr(message, "response_metadata", None)
+        if metadata:
+            headers = metadata.pop("headers", None) or headers
+        self.governor.observe_headers(provider, headers)
+
+    def _call(self, i: int, messages, stop, **kwargs):
+        name = self.names[i]
+        provider = provider_of(self.backends[i])
+        with self.governor.limit(provider, estimate_message_tokens(messages)) as usage:
+            # Latency is measured after admission so queueing doesn't count against the backend
+            start = time.perf_counter()
+            try:
+                message = self.backends[i].invoke(messages, stop=stop, **kwargs)
+            except Exception:
+                self.health[name].record_failure()
+                raise
+            self.health[name].record_success(time.perf_counter() - start)
+            self._observe(provider, message, usage)
+        return message
+
+    async def _acall(self, i: int, messages, stop, **kwargs):
+        name = self.names[i]
+        provider = provider_of(self.backends[i])
+        async with self.governor.alimit(provider, estimate_message_tokens(messages)) as usage:
+            start = time.perf_counter()
+            try:
+                message = await self.backends[i].ainvoke(messages, stop=stop, **kwargs)
+            except asyncio.CancelledError:
+                # A cancelled hedge says nothing about the backend; free its probe
+                self.health[name].release_probe()
+                raise
+            except Exception:
+                self.health[name].record_failure()
+                raise
+            self.health[name].record_success(time.perf_counter() - start)
+            self._observe(provider, message, usage)
+        return message
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        ranked = self._ranked()
+        if self.hedge_after is None:
+            error = None
+            for i in ranked:
+                try:
+                    message = self._call(i, messages, stop, **kwargs)
+                except Exception as e:
+                    logger.warning(f"Backend {self.names[i]} failed: {e}")
+                    error = e
+                    continue
+                return ChatResult(generations=[ChatGeneration(message=message)])
+            raise error or RuntimeError("No LLM backend available")
+        pending = {}
+        error = None
+        while ranked or pending:
+            if ranked:
+                i = ranked.pop(0)
+                pending[_hedge_executor.submit(self._call, i, messages, stop, **kwargs)] = i
+            timeout = self.hedge_after if ranked and self.hedge_after is not None else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                logger.info(f"Hedging: {self.names[list(pending.values())[0]]} slower than {self.hedge_after}s")
+                continue
+            for future in done:
+                i = pending.pop(future)
+                try:
+                    message = future.result()
+                except Exception as e:
+                    logger.warning(f"Backend {self.names[i]} failed: {e}")
+                    error = e
+                    continue
+                return ChatResult(generations=[ChatGeneration(message=message)])
+        raise error or RuntimeError("No LLM backend available")
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        ranked = self._ranked()
+        pending = {}
+        error = None
+        try:
+            while ranked or pending:
+                if ranked and (not pending or self.hedge_after is not None):
+                    i = ranked.pop(0)
+                    pending[asyncio.ensure_future(self._acall(i, messages, stop, **kwargs))] = i
+                timeout = self.hedge_after if ranked and self.hedge_after is not None else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    i = pending.pop(task)
+                    try:
+                        message = task.result()
+                    except Exception as e:
+                        logger.warning(f"Backend {self.names[i]} failed: {e}")
+                        error = e
+                        continue
+                    return ChatResult(generations=[ChatGeneration(message=message)])
+        finally:
+            # Losing hedged requests are cancelled
+            for task in pending:
+                task.cancel()
+        raise error or RuntimeError("No LLM backend available")
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        # Streams are not hedged; fall back only until the first chunk arrives
+        error = None
+        for i in self._ranked():
+            name = self.names[i]
+            provider = provider_of(self.backends[i])
+            started = False
+            full = None
+            headers = None
+            try:
+                with self.governor.limit(provider, estimate_message_tokens(messages)) as usage:
+                    start = time.perf_counter()
+                    for chunk in self.backends[i].stream(messages, stop=stop, **kwargs):
+                        started = True
+                        if not isinstance(chunk, AIMessageChunk):
+                            chunk = AIMessageChunk(content=chunk.content)
+                        headers = chunk.response_metadata.pop("headers", None) or headers
+                        full = chunk if full is None else full + chunk
+                        yield ChatGenerationChunk(message=chunk)
+                    self._observe(provider, full, usage, headers)
+            except Exception as e:
+                self.health[name].record_failure()
+                if started:
+                    raise
+                logger.warning(f"Backend {name} failed: {e}")
+                error = e
+                continue
+            self.health[name].record_success(time.perf_counter() - start)
+            return
+        raise error or RuntimeError("No LLM backend available")
+
+
+def load_model(spec: str, **kwargs):
+    """Build a chat model from a `provider:model` spec, e.g. `openai:gpt-4o`."""
+    provider, _, model = spec.partition(":")
+    module_name, class_name = PROVIDERS[provider]
+    cls = getattr(importlib.import_module(module_name), class_name)
+    return cls(model=model, **kwargs)
+
+
+def make_router(primary, *fallbacks, **kwargs) -> RouterChatModel:
+    """Wrap `primary` (plus fallbacks) in a router.
+
+    Extra backends are appended from `LLM_FALLBACK_MODELS`
+    (comma separated `provider:model` specs) and hedging is enabled by
+    `LLM_HEDGE_AFTER` (seconds). With neither set the router simply
+    forwards to `primary` while tracking its latency.
+    """
+    backends = [primary, *fallbacks]
+    for spec in filter(None, os.environ.get("LLM_FALLBACK_MODELS", "").split(",")):
+        try:
+            backends.append(load_model(spec.strip()))
+        except Exception as e:
+            logger.error(f"Failed to load fallback model {spec}: {e}")
+    # OpenAI-compatible models only return rate-limit headers when asked,
+    # and the governor needs them to back off before hitting a 429
+    backends = [
+        b.model_copy(update={"include_response_headers": True})
+        if "include_response_headers" in getattr(type(b), "model_fields", {}) and not b.include_response_headers
+        else b
+        for b in backends
+    ]
+    if "hedge_after" not in kwargs and os.environ.get("LLM_HEDGE_AFTER"):
+        kwargs["hedge_after"] = float(os.environ["LLM_HEDGE_AFTER"])
+    return RouterChatModel(backends=backends, **kwargs)
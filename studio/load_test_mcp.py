@@ -0,0 +1,136 @@
+"""
+Load generator for agent_tech_QA_MCP.graph against the offline fake MCP
+servers. Runs `--requests` questions from sample_queries.txt with
+`--concurrency` in flight and reports throughput, p50/p95/p99 latency of
+whole graph runs and the number of failed MCP tool calls.
+
+    MCP_OFFLINE=1 python load_test_mcp.py --requests 200 --concurrency 16 --fake-llm
+
+`--fake-llm` replaces Gemini with a scripted model that calls one bound
+tool and then answers, so the run needs no network or credentials. Fake
+server behaviour is set with FAKE_MCP_LATENCY, FAKE_MCP_JITTER,
+FAKE_MCP_ERROR_RATE and FAKE_MCP_PAYLOAD (see fake_mcp_server.py); to
+reuse long-running HTTP fakes, start them with `--transport
+streamable-http` and set FAKE_MCP_MICROSOFT_URL / FAKE_MCP_AWS_URL.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import time
+from typing import List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+os.environ.setdefault("MCP_OFFLINE", "1")
+os.environ.setdefault("GOOGLE_API_KEY", "offline")
+
+import agent_tech_QA_MCP as qa  # noqa: E402
+import single_flight  # noqa: E402
+from tool_cache import tool_cache  # noqa: E402
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+_turns = itertools.count()
+
+
+class ScriptedToolModel(BaseChatModel):
+    """Calls one bound tool with the question, then answers from its result.
+
+    Tools are picked round-robin so every server sees load.
+    """
+
+    tools: List[dict] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-tool-model"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"tools": list(tools)})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        question = next(m.content for m in reversed(messages) if isinstance(m, HumanMessage))
+        if isinstance(messages[-1], ToolMessage) or not self.tools:
+            message = AIMessage(content=f"Answer based on {len(str(messages[-1].content))} chars of docs.")
+        else:
+            function = self.tools[next(_turns) % len(self.tools)]["function"]
+            properties = function.get("parameters", {}).get("properties", {})
+            args = {name: question for name, spec in properties.items() if spec.get("type") == "string"}
+            if "enum" in properties.get("layer", {}):
+                args["layer"] = properties["layer"]["enum"][0]
+            message = AIMessage(
+                content="", tool_calls=[{"name": function["name"], "args": args, "id": f"call-{time.monotonic_ns()}"}]
+            )
+        tokens = sum(len(str(m.content)) for m in messages) // 4
+        message.usage_metadata = {"input_tokens": tokens, "output_tokens": 10, "total_tokens": tokens + 10}
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def load_queries() -> List[str]:
+    with open(os.path.join(current_dir, "sample_queries.txt"), "r", encoding="utf-8") as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+async def run_load(requests: int, concurrency: int, timeout: Optional[float]):
+    queries = load_queries()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors, tool_errors = 0, 0
+
+    async def one(i: int):
+        nonlocal errors, tool_errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(
+                    qa.graph.ainvoke({"messages": [HumanMessage(content=queries[i % len(queries)])]}), timeout
+                )
+            except Exception as e:
+                errors += 1
+                print(f"❌ request {i} failed: {type(e).__name__}: {e}")
+                return
+            latencies.append(time.perf_counter() - start)
+            tool_errors += sum(1 for m in result["messages"] if isinstance(m, ToolMessage) and m.status == "error")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    return elapsed, latencies, errors, tool_errors
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--fake-llm", action="store_true")
+    args = parser.parse_args()
+
+    if args.fake_llm:
+        qa.llm = ScriptedToolModel()
+        qa.llm_with_tools = qa.llm.bind_tools([tool_cache.spec(t) for t in qa.tools])
+    print(f"🚀 {args.requests} requests, concurrency {args.concurrency}, {len(qa.tools)} tools, offline={qa.MCP_OFFLINE}")
+
+    elapsed, latencies, errors, tool_errors = asyncio.run(run_load(args.requests, args.concurrency, args.timeout))
+    print(f"完成 {len(latencies)}/{args.requests}，失败 {errors}，工具错误 {tool_errors}，总耗时 {elapsed:.1f}s")
+    print(f"吞吐量: {len(latencies) / elapsed:.2f} req/s")
+    print(
+        f"延迟: p50 {percentile(latencies, 0.50):.3f}s  p95 {percentile(latencies, 0.95):.3f}s  "
+        f"p99 {percentile(latencies, 0.99):.3f}s  max {max(latencies, default=0):.3f}s"
+    )
+    coalesced = {name: s["coalesced"] for name, s in single_flight.stats().items() if s["coalesced"]}
+    print(f"合并的重复工具调用: {sum(coalesced.values())} {coalesced}")
+
+
+if __name__ == "__main__":
+    main()
@@ -67,6 +67,8 @@ com.example.api.PaymentController -
 # Web search tool
 from langchain_community.tools.tavily_search import TavilySearchResults
 
+from llm_governor import governor
+
 
 @tool
 def search_web(query: str):
@@ -81,8 +83,9 @@ def search_web(query: str):
 
     # Search query
 
-    # Search
-    search_docs = tavily_search.invoke(query)
+    # Search, admitted by the process-wide rate limiter
+    with governor.limit("tavily"):
+        search_docs = tavily_search.invoke(query)
 
     # Format
     formatted_search_docs = "\n\n---\n\n".join(
@@ -97,16 +100,30 @@ def search_web(query: str):
 
 from langchain_openai import ChatOpenAI
 
-llm = ChatOpenAI(model="gpt-4o", temperature=0.0)
+from blob_store import blob_store, resolve
+from incident_index import incident_index, log_features, minhash
+from llm_router import make_router
+from log_ingest import format_entries, format_index, ingest
+from log_templates import compress_log
+from profiling import profiled
+from single_flight import flight, invoke as coalesced_invoke
+from tool_cache import bound_model
+
+llm = make_router(ChatOpenAI(model="gpt-4o", temperature=0.0))
+# Identical summary requests in flight at the same time share one call
+summary_flight = flight("init_summary")
 
 
 class AgentState(MessagesState):
     log: str
     summary: str
+    log_chunk: str
+    log_index: dict
 
 
 class InputState(MessagesState):
     log: str
+    log_chunk: str
 
 
 class Agent:
@@ -114,11 +131,13 @@ class Agent:
         graph = StateGraph(AgentState, input=InputState, output=MessagesState)
         self.tools = [search_web]
 
-        graph.add_node("init_summary", self.init_summary_node)
-        graph.add_node("action_confirm", self.action_confirm_node)
-        graph.add_node("query_agent", self.query_agent_node)
-        graph.add_node("query_tools", self.query_tools_node)
-        graph.add_node("action_taken", self.action_taken_node)
+        # Runs with configurable.profile=true are sampled into PROFILE_DIR
+        graph.add_node("init_summary", profiled(self.init_summary_node, "init_summary"))
+        graph.add_node("ingest_log", profiled(self.ingest_log_node, "ingest_log"))
+        graph.add_node("action_confirm", profiled(self.action_confirm_node, "action_confirm"))
+        graph.add_node("query_agent", profiled(self.query_agent_node, "query_agent"))
+        graph.add_node("query_tools", profiled(self.query_tools_node, "query_tools"))
+        graph.add_node("action_taken", profiled(self.action_taken_node, "action_taken"))
 
         graph.add_conditional_edges(
             START,
@@ -127,9 +146,11 @@ class Agent:
                 "ACTION_INPUT": "action_confirm",
                 "QUERY_INPUT": "query_agent",
                 "INIT_SUMMARY": "init_summary",
+                "LOG_CHUNK": "ingest_log",
             },
         )
         graph.add_edge("init_summary", END)
+        graph.add_edge("ingest_log", END)
         graph.add_edge("action_confirm", "action_taken")
         graph.add_edge("action_taken", END)
         graph.add_conditional_edges(
@@ -160,12 +181,70 @@ The summary should include:
 Output should be conciese and clear, less than 300 words
 """.strip()
             )
-            summary = llm.invoke([sumary_prompt, HumanMessage(content=state["log"])])
-            return {"summary": summary.content, "messages": [summary]}
+            # A recurring incident reuses the analysis of its earlier occurrence
+            signature = minhash(log_features(state["log"]))
+            match = incident_index.lookup(state["log"], signature=signature)
+            if match:
+                entry, score = match
+                summary = AIMessage(
+                    content=f"{entry['summary']}\n\n(Reused analysis of a similar past incident, similarity {score:.0%})"
+                )
+            else:
+                # Repeated lines go to the model as templates with counts. Threads
+                # opened on the same alert at once share one request and one index entry
+                messages = [sumary_prompt, HumanMessage(content=compress_log(state["log"]))]
+
+                def summarize():
+                    result = llm.invoke(messages)
+                    incident_index.add(state["log"], result.content, signature=signature)
+                    return result
+
+                summary = coalesced_invoke(summary_flight, llm, messages, fn=summarize)
+            log_index, _ = ingest(None, state["log"], final=True)
+            return {"summary": summary.content, "messages": [summary], "log_index": log_index}
         else:
             return state
 
+    def ingest_log_node(self, state: AgentState):
+        # Only the new chunk is parsed; the summary is updated from the delta
+        chunk = state["log_chunk"]
+        # The full log is not kept in state: every checkpoint would store it again
+        log_index, entries = ingest(state.get("log_index"), chunk)
+        update = {
+            "log_index": log_index,
+            "log_chunk": "",
+        }
+        if not entries:
+            return update
+        update_prompt = SystemMessage(
+            content="""
+You are a system operation expert. You are following a live incident log.
+You will get the current summary, statistics of the whole log so far and the newly arrived log entries.
+Update the summary with what the new entries change, keeping the same structure:
+- Summary title
+- Situation summary
+- Call chain analyst
+- Root cause analysis 
+
+Output should be conciese and clear, less than 300 words
+""".strip()
+        )
+        summary = llm.invoke(
+            [
+                update_prompt,
+                HumanMessage(
+                    content=f"Current summary:\n{state.get('summary') or '(none yet)'}\n\n"
+                    f"Log statistics:\n{format_index(log_index)}\n\n"
+                    f"New log entries:\n{compress_log(format_entries(entries))}"
+                ),
+            ]
+        )
+        update.update({"summary": summary.content, "messages": [summary]})
+        return update
+
     def is_action(self, state: AgentState):
+        if state.get("log_chunk"):
+            return "LOG_CHUNK"
         if len(state["messages"]) == 0:
             return "INIT_SUMMARY"
         classify_prompt = SystemMessage(
@@ -174,7 +253,7 @@ You are a smart assistant. You should classify the log into two categories: acti
 Only return the category name (query or action), nothing else.                                        
 """.strip()
         )
-        result = llm.invoke([classify_prompt] + state["messages"])
+        result = llm.invoke([classify_prompt] + resolve(state["messages"]))
         route_state = "ACTION_INPUT" if result.content == "action" else "QUERY_INPUT"
         return route_state
 
@@ -184,7 +263,7 @@ Only return the category name (query or action), nothing else.
             content="What ever user asked, you should confirm it by a rhetorical question and highlight the action should be taken."
         )
 
-        return {"messages": [llm.invoke([sys_msg] + state["messages"])]}
+        return {"messages": [llm.invoke([sys_msg] + resolve(state["messages"]))]}
 
     def action_taken_node(self, state: AgentState):
         return {"messages": [AIMessage(content="Action done")]}
@@ -215,7 +294,7 @@ And skip the addition of the brackets as well as the Document source preamble in
 """.strip()
         )
 
-        message = llm.bind_tools(self.tools).invoke([sys_prompt] + state["messages"])
+        message = bound_model(llm, self.tools).invoke([sys_prompt] + resolve(state["messages"]))
 
         return {"messages": [message]}
 
@@ -226,8 +305,9 @@ And skip the addition of the brackets as well as the Document source preamble in
         for t in tool_calls:
             print(f"Calling: {t}")
             result = self.tools[0].invoke(t["args"])
-            message = ToolMessage(
-                content=str(result), tool_call_id=t["id"], name=t["name"]
+            # Search results go to the blob store; state keeps a reference
+            message = blob_store.externalize(
+                ToolMessage(content=str(result), tool_call_id=t["id"], name=t["name"])
             )
             results.append(message)
 
@@ -0,0 +1,229 @@
+"""
+Incremental log parsing for log_agent.
+
+Log text arrives in chunks; only the new chunk is parsed and folded into a
+small structured index (levels, loggers, tags, error codes, time range)
+that is kept in graph state. The last entry of a chunk may be incomplete,
+so it is held back as `pending` until the next entry header arrives.
+
+Follow a live file and push it to a log_agent thread:
+
+    python log_ingest.py /var/log/app.log --thread-id <id> --url http://localhost:2024
+"""
+
+import argparse
+import codecs
+import logging
+import os
+import re
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_header_re = re.compile(
+    r"^(?P<ts>\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?)\s+"
+    r"\[(?P<level>[A-Z]+)\]\s+\[(?P<thread>[^\]]*)\]\s*(?P<rest>.*)$",
+    re.MULTILINE,
+)
+_logger_re = re.compile(r"^\s*(?P<logger>[A-Za-z_$][\w.$]*)\s+-\s*(?P<rest>.*)$", re.MULTILINE)
+_tag_re = re.compile(r"\[(?P<tag>[A-Za-z][\w]*)\]")
+_error_code_re = re.compile(r"\b[A-Z][A-Z0-9]+(?:_[A-Z0-9]+){2,}\b")
+
+# Keep the per-key counters and the held-back text in state bounded
+MAX_KEYS = 200
+MAX_PENDING = 256 * 1024
+
+
+def parse_entries(text: str) -> List[Dict[str, str]]:
+    """Split log text into entries starting at each timestamped header."""
+    entries = []
+    matches = list(_header_re.finditer(text))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        body = text[match.end() : end].strip("\n")
+        message = (match.group("rest") + "\n" + body).strip()
+        logger_match = _logger_re.match(message)
+        logger_name = logger_match.group("logger") if logger_match else ""
+        if logger_match:
+            message = message[logger_match.start("rest") :].strip()
+        tag = _tag_re.match(message)
+        entries.append(
+            {
+                "start": match.start(),
+                "ts": match.group("ts"),
+                "level": match.group("level"),
+                "thread": match.group("thread"),
+                "logger": logger_name,
+                "tag": tag.group("tag") if tag else "",
+                "message": message,
+                "raw": text[match.start() : end].strip("\n"),
+            }
+        )
+    return entries
+
+
+def new_index() -> Dict:
+    return {
+        "entries": 0,
+        "bytes": 0,
+        "levels": {},
+        "loggers": {},
+        "tags": {},
+        "error_codes": {},
+        "first_ts": None,
+        "last_ts": None,
+        "pending": "",
+    }
+
+
+def _count(counter: Dict[str, int], key: str):
+    if not key:
+        return
+    if key in counter or len(counter) < MAX_KEYS:
+        counter[key] = counter.get(key, 0) + 1
+
+
+def ingest(index: Optional[Dict], chunk: str, final: bool = False) -> Tuple[Dict, List[Dict[str, str]]]:
+    """Fold `chunk` into `index`; returns the new index and the complete new entries.
+
+    With `final=False` the trailing entry is kept pending, since its
+    continuation lines may still be in the next chunk.
+    """
+    index = {**(index or new_index())}
+    for key in ("levels", "loggers", "tags", "error_codes"):
+        index[key] = dict(index[key])
+    text = index["pending"] + chunk
+    index["bytes"] += len(chunk.encode("utf-8"))
+    entries = parse_entries(text)
+    if entries and not final:
+        index["pending"] = text[entries.pop()["start"] :]
+    elif not entries and text.strip() and (final or len(text) > MAX_PENDING):
+        # Unrecognised format: pass the text through as one entry
+        entries = [{"start": 0, "ts": "", "level": "", "thread": "", "logger": "", "tag": "", "message": text, "raw": text}]
+        index["pending"] = ""
+    else:
+        index["pending"] = "" if entries or final else text
+    for entry in entries:
+        index["entries"] += 1
+        _count(index["levels"], entry["level"])
+        _count(index["loggers"], entry["logger"])
+        _count(index["tags"], entry["tag"])
+        for code in set(_error_code_re.findall(entry["message"])):
+            _count(index["error_codes"], code)
+        index["first_ts"] = index["first_ts"] or entry["ts"]
+        index["last_ts"] = entry["ts"]
+    return index, entries
+
+
+def format_index(index: Dict, top: int = 10) -> str:
+    """Compact text view of the index for prompts."""
+
+    def top_items(counter):
+        items = sorted(counter.items(), key=lambda kv: -kv[1])[:top]
+        return ", ".join(f"{k}={v}" for k, v in items) or "-"
+
+    return "\n".join(
+        [
+            f"Entries: {index['entries']} ({index['first_ts']} .. {index['last_ts']})",
+            f"Levels: {top_items(index['levels'])}",
+            f"Error codes: {top_items(index['error_codes'])}",
+            f"Tags: {top_items(index['tags'])}",
+            f"Loggers: {top_items(index['loggers'])}",
+        ]
+    )
+
+
+def format_entries(entries: List[Dict[str, str]]) -> str:
+    return "\n\n".join(entry["raw"] for entry in entries)
+
+
+def tail_file(
+    path: str,
+    on_chunk: Callable[[str], None],
+    poll_interval: float = 1.0,
+    flush_interval: float = 5.0,
+    max_buffer: int = 1 << 20,
+    from_start: bool = False,
+    stop: Optional[threading.Event] = None,
+):
+    """Follow `path` and hand appended text to `on_chunk` in batches.
+
+    Text is buffered for up to `flush_interval` seconds. The buffer is
+    bounded by `max_buffer` bytes: when a slow consumer lets it grow past
+    that, the oldest lines are dropped (and the drop is logged) rather
+    than growing memory. Truncation or rotation restarts from the top
+    of the new file; while the file is missing (before it is created, or
+    between the rename and re-create of a rotation) it is polled for.
+    """
+    stop = stop or threading.Event()
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    try:
+        stat = os.stat(path)
+        inode, position = stat.st_ino, 0 if from_start else stat.st_size
+    except FileNotFoundError:
+        # Not created yet: everything written to it is new
+        inode, position = None, 0
+    buffer = ""
+    last_flush = time.monotonic()
+    while not stop.is_set():
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            # Rotation by rename: wait for the new file to be created
+            stat = None
+        if stat is not None and (stat.st_ino != inode or stat.st_size < position):
+            if inode is not None:
+                logger.info(f"{path} was rotated or truncated, reading from the start")
+            inode, position = stat.st_ino, 0
+            decoder.reset()
+        if stat is not None and stat.st_size > position:
+            try:
+                with open(path, "rb") as file:
+                    file.seek(position)
+                    data = file.read(max_buffer)
+            except FileNotFoundError:
+                data = b""
+            position += len(data)
+            buffer += decoder.decode(data)
+            if len(buffer) > max_buffer:
+                cut = buffer.find("\n", len(buffer) - max_buffer)
+                cut = cut + 1 if cut >= 0 else len(buffer) - max_buffer
+                logger.warning(f"Tail buffer full, dropped {cut} chars of {path}")
+                buffer = buffer[cut:]
+        now = time.monotonic()
+        if buffer and now - last_flush >= flush_interval:
+            on_chunk(buffer)
+            buffer = ""
+            last_flush = now
+        if stat is None or stat.st_size <= position:
+            stop.wait(poll_interval)
+    if buffer:
+        on_chunk(buffer)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tail a log file into a log_agent thread")
+    parser.add_argument("path")
+    parser.add_argument("--thread-id", required=True)
+    parser.add_argument("--url", default="http://localhost:2024")
+    parser.add_argument("--assistant", default="log_agent")
+    parser.add_argument("--from-start", action="store_true")
+    parser.add_argument("--flush-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    from langgraph_sdk import get_sync_client
+
+    client = get_sync_client(url=args.url)
+
+    def send(chunk: str):
+        client.runs.wait(args.thread_id, args.assistant, input={"log_chunk": chunk})
+        logger.info(f"Sent {len(chunk)} chars to thread {args.thread_id}")
+
+    tail_file(args.path, send, flush_interval=args.flush_interval, from_start=args.from_start)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,179 @@
+"""
+Online log template mining (Drain) for log_agent prompts.
+
+Each log entry is reduced to one line and routed through a fixed-depth
+parse tree (token count, then the leading tokens) to a small group of
+templates; the line joins the most similar template, turning the
+differing tokens into `<*>` slots, or starts a new one. Work per line is
+bounded by the tree depth and the templates in its leaf, and memory by
+`max_clusters` (least recently used templates are evicted) and
+`max_samples` values per slot.
+"""
+
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from log_ingest import ingest
+
+WILDCARD = "<*>"
+
+_split_re = re.compile(r"([\s=,;]+)")
+_digit_re = re.compile(r"\d")
+
+
+class LogCluster:
+    __slots__ = ("id", "tokens", "seps", "count", "first_ts", "last_ts", "samples")
+
+    def __init__(self, cluster_id: int, tokens: List[str], seps: List[str], ts: Optional[str]):
+        self.id = cluster_id
+        self.tokens = tokens
+        self.seps = seps
+        self.count = 1
+        self.first_ts = ts
+        self.last_ts = ts
+        self.samples: Dict[int, List[str]] = {}
+
+    def template(self) -> str:
+        parts = []
+        for i, token in enumerate(self.tokens):
+            parts.append(token)
+            if i < len(self.seps):
+                parts.append(" " if self.seps[i].isspace() else self.seps[i])
+        return "".join(parts).strip()
+
+
+class TemplateMiner:
+    """Streaming Drain template miner.
+
+    `sim_threshold` is the fraction of positions that must match a template
+    for a line to join it; `depth` is the number of leading tokens used to
+    navigate the tree and `max_children` caps the fan-out of each node.
+    """
+
+    def __init__(self, sim_threshold: float = 0.5, depth: int = 4, max_children: int = 100,
+                 max_clusters: int = 1000, max_samples: int = 3):
+        self.sim_threshold = sim_threshold
+        self.depth = max(depth - 2, 1)
+        self.max_children = max_children
+        self.max_clusters = max_clusters
+        self.max_samples = max_samples
+        self.root: Dict = {}
+        self.clusters: "OrderedDict[int, LogCluster]" = OrderedDict()
+        self._leaves: Dict[int, List[LogCluster]] = {}
+        self._next_id = 0
+        self.lines = 0
+        self.evicted = 0
+
+    def _leaf(self, tokens: List[str]) -> List[LogCluster]:
+        node = self.root.setdefault(len(tokens), {})
+        for token in tokens[: self.depth]:
+            key = WILDCARD if _digit_re.search(token) else token
+            if key not in node:
+                key = key if len(node) < self.max_children else WILDCARD
+            node = node.setdefault(key, {})
+        return node.setdefault(None, [])
+
+    def _similarity(self, cluster: LogCluster, tokens: List[str]):
+        same = params = 0
+        for template_token, token in zip(cluster.tokens, tokens):
+            if template_token == WILDCARD:
+                params += 1
+            elif template_token == token:
+                same += 1
+        return same / len(tokens), params
+
+    def _sample(self, cluster: LogCluster, position: int, value: str):
+        values = cluster.samples.setdefault(position, [])
+        if len(values) < self.max_samples and value not in values:
+            values.append(value)
+
+    def _evict(self):
+        while len(self.clusters) > self.max_clusters:
+            _, cluster = self.clusters.popitem(last=False)
+            self._leaves.pop(cluster.id).remove(cluster)
+            self.evicted += 1
+
+    def add(self, line: str, ts: Optional[str] = None) -> LogCluster:
+        parts = _split_re.split(line.strip())
+        tokens, seps = parts[0::2], parts[1::2]
+        self.lines += 1
+        leaf = self._leaf(tokens)
+
+        best, best_key = None, (-1.0, -1)
+        for cluster in leaf:
+            key = self._similarity(cluster, tokens)
+            if key > best_key:
+                best, best_key = cluster, key
+        if best is None or best_key[0] < self.sim_threshold:
+            best = LogCluster(self._next_id, tokens, seps, ts)
+            self._next_id += 1
+            leaf.append(best)
+            self._leaves[best.id] = leaf
+            self.clusters[best.id] = best
+            self._evict()
+            return best
+
+        for i, (template_token, token) in enumerate(zip(best.tokens, tokens)):
+            if template_token == WILDCARD:
+                self._sample(best, i, token)
+            elif template_token != token:
+                self._sample(best, i, template_token)
+                self._sample(best, i, token)
+                best.tokens[i] = WILDCARD
+        best.count += 1
+        best.first_ts = best.first_ts or ts
+        best.last_ts = ts or best.last_ts
+        self.clusters.move_to_end(best.id)
+        return best
+
+    def add_log(self, text: str, chunk_size: int = 256 * 1024):
+        """Mine every entry of `text`; unrecognised formats are mined per line.
+
+        The text is parsed a chunk at a time so only one chunk of entries
+        is alive at once.
+        """
+        index = None
+        for offset in range(0, max(len(text), 1), chunk_size):
+            final = offset + chunk_size >= len(text)
+            index, entries = ingest(index, text[offset : offset + chunk_size], final=final)
+            for entry in entries:
+                if entry["level"]:
+                    self.add(entry_line(entry), entry["ts"])
+                else:
+                    for line in entry["raw"].splitlines():
+                        if line.strip():
+                            self.add(line)
+
+
+def entry_line(entry: Dict[str, str]) -> str:
+    """One-line form of a parsed log entry: level, logger and flattened message."""
+    message = " ".join(entry["message"].split())
+    return f"[{entry['level']}] {entry['logger']} - {message}" if entry["logger"] else f"[{entry['level']}] {message}"
+
+
+def format_templates(miner: TemplateMiner, top: int = 50) -> str:
+    """Compact text view of the templates for prompts, most frequent first."""
+    clusters = sorted(miner.clusters.values(), key=lambda c: -c.count)
+    lines = [
+        f"{miner.lines} log entries as {len(clusters)} templates "
+        f"(count, first..last timestamp, template; {WILDCARD} marks a variable field):"
+    ]
+    for cluster in clusters[:top]:
+        span = f"{cluster.first_ts}..{cluster.last_ts}" if cluster.first_ts else "-"
+        lines.append(f"[{cluster.count}x] {span} {cluster.template()}")
+        for values in list(cluster.samples.values())[:3]:
+            lines.append(f"    e.g. {' | '.join(v[:80] for v in values)}")
+    rest = clusters[top:]
+    if rest or miner.evicted:
+        lines.append(f"... {sum(c.count for c in rest)} entries in {len(rest)} rarer templates omitted"
+                     + (f", {miner.evicted} templates evicted" if miner.evicted else ""))
+    return "\n".join(lines)
+
+
+def compress_log(text: str, top: int = 50) -> str:
+    """Template view of `text`, or `text` itself when that is not shorter."""
+    miner = TemplateMiner()
+    miner.add_log(text)
+    compressed = format_templates(miner, top)
+    return compressed if len(compressed) < len(text) else text
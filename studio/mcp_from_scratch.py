@@ -1,10 +1,16 @@
+import argparse
 import asyncio
+import gzip
 import json
 import logging
 import sys
 import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import Any, Dict, List, Optional
 import os
+
+from doc_registry import registry
+
 current_file_path = os.path.abspath(__file__)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,30 +20,22 @@ class MCPHandler:
     
     def __init__(self):
         """初始化MCP处理器"""
-        self.tools = {"read_document_with_mcp":{
+        self.registry = registry
+
+    @property
+    def tools(self) -> Dict[str, Dict[str, Any]]:
+        """工具定义，层级枚举由文档注册表实时生成"""
+        return {
+            "read_document_with_mcp": {
                 "name": "read_document_with_mcp",
-                "description": """
-                Finds the tech document based on the layer.
-                Args:
-                    layer: the layer of tech document to find only include "frontend", "backend"
-                """,
-                "inputSchema": {
-                    "type": "object",
-                    "properties": {
-                        "layer": {"type": "string"},
-                    }
-                }
-            }}
+                "description": self.registry.tool_description("layer"),
+                "inputSchema": self.registry.input_schema("layer"),
+            }
+        }
+
     def read_document_with_mcp(self, layer: str) -> str:
         try:
-            if layer == "frontend":
-                with open(os.path.join(os.path.dirname(current_file_path), "tech_doc/frontend.md"), "r", encoding="utf-8") as file:
-                    return file.read()  # 从 frontend.md 读取文件
-            elif layer == "backend":
-                with open(os.path.join(os.path.dirname(current_file_path), "tech_doc/backend.md"), "r", encoding="utf-8") as file:
-                    return file.read()  # 从 backend.md 读取文件
-            else:
-                raise ValueError("Unsupported layer. Only 'frontend' and 'backend' are allowed.")
+            return self.registry.read(layer)
         except FileNotFoundError:
             return f"文档文件 {layer}.md 不存在"
         except Exception as e:
@@ -167,7 +165,11 @@ async def main():
             
             # 处理请求
             response = await handler.handle_request(request)
-            
+
+            # 通知（没有id）不需要响应
+            if "id" not in request:
+                continue
+
             # 输出响应
             print(json.dumps(response, ensure_ascii=False))
             sys.stdout.flush()
@@ -179,5 +181,107 @@ async def main():
             logger.error(traceback.format_exc())
             break
 
+# 超过该大小且客户端支持时使用gzip压缩
+GZIP_MIN_SIZE = 1024
+
+
+class MCPHTTPRequestHandler(BaseHTTPRequestHandler):
+    """Streamable HTTP传输（JSON响应模式）
+
+    HTTP/1.1长连接：同一连接上的请求（包括流水线请求）按顺序处理，
+    多个agent worker共享同一个服务进程和文档内存。
+    GET /docs/<layer> 按ETag返回文档，未变化时返回304。
+    """
+
+    protocol_version = "HTTP/1.1"
+    handler = MCPHandler()
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def send_body(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+        headers = dict(headers or {})
+        if len(body) >= GZIP_MIN_SIZE and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+            headers["Vary"] = "Accept-Encoding"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_empty(self, status: int, headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        if self.path.split("?")[0].rstrip("/") != "/mcp":
+            return self.send_empty(404)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        try:
+            payload = json.loads(body)
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON: {e}")
+            error = {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "Parse error"}}
+            return self.send_body(400, json.dumps(error).encode(), "application/json")
+
+        requests = payload if isinstance(payload, list) else [payload]
+        responses = []
+        for request in requests:
+            response = asyncio.run(self.handler.handle_request(request))
+            if "id" in request:
+                responses.append(response)
+        # 只有通知或响应时返回202
+        if not responses:
+            return self.send_empty(202)
+        result = responses if isinstance(payload, list) else responses[0]
+        self.send_body(200, json.dumps(result, ensure_ascii=False).encode("utf-8"), "application/json")
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/docs":
+            manifest = json.dumps(self.handler.registry.manifest(), ensure_ascii=False).encode("utf-8")
+            return self.send_body(200, manifest, "application/json")
+        if path.startswith("/docs/"):
+            entry = self.handler.registry.get(path[len("/docs/"):])
+            if entry is None:
+                return self.send_empty(404)
+            headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+            if entry.etag in self.headers.get("If-None-Match", ""):
+                return self.send_empty(304, headers)
+            return self.send_body(200, entry.content.encode("utf-8"), "text/markdown; charset=utf-8", headers)
+        # 不提供服务端推送的SSE流
+        self.send_empty(405, {"Allow": "POST"})
+
+    def do_DELETE(self):
+        self.send_empty(405, {"Allow": "POST"})
+
+
+def serve_http(host: str, port: int):
+    server = ThreadingHTTPServer((host, port), MCPHTTPRequestHandler)
+    server.daemon_threads = True
+    logger.info(f"MCP HTTP server listening on http://{host}:{port}/mcp")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="MCP doc server from scratch")
+    parser.add_argument("--transport", choices=["stdio", "http"], default=os.environ.get("MCP_TRANSPORT", "stdio"))
+    parser.add_argument("--host", default=os.environ.get("MCP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MCP_PORT") or 8100))
+    args = parser.parse_args()
+    if args.transport == "http":
+        serve_http(args.host, args.port)
+    else:
+        asyncio.run(main()) 
\ No newline at end of file
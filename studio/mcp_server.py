@@ -1,36 +1,111 @@
 from mcp.server.fastmcp import FastMCP
+import argparse
 import asyncio
 import os
+
+from doc_registry import registry
+
 current_file_path = os.path.abspath(__file__)
+DOC_TOOL = "read_document_with_mcp"
+
+
+class DocMCP(FastMCP):
+    async def list_tools(self):
+        """每次list_tools时按注册表刷新文档工具的描述和layer枚举，新增文档无需重启"""
+        tool = self._tool_manager.get_tool(DOC_TOOL)
+        if tool is not None:
+            properties = tool.parameters.get("properties", {})
+            tool.description = registry.tool_description("layer")
+            tool.parameters = {
+                **tool.parameters,
+                "properties": {**properties, "layer": {**properties.get("layer", {}), "enum": registry.names()}},
+            }
+        return await super().list_tools()
+
+
 # Create an MCP server
-mcp = FastMCP("Demo")
+mcp = DocMCP("Demo")
 
 # Add an addition tool
-@mcp.tool()
 def read_document_with_mcp(layer: str) -> str:
-    """Finds the tech document based on the layer.
-
-    Args:
-        layer: the layer of tech document to find only include "frontend", "backend"
-    """
     try:
-        if layer == "frontend":
-            with open(os.path.join(os.path.dirname(current_file_path), "tech_doc/frontend.md"), "r", encoding="utf-8") as file:
-                return file.read()  # read file from frontend.md
-        elif layer == "backend":
-            with open(os.path.join(os.path.dirname(current_file_path), "tech_doc/backend.md"), "r", encoding="utf-8") as file:
-                return file.read()  # read file from backend.md
-        else:
-            raise ValueError("Unsupported layer. Only 'frontend' and 'backend' are allowed.")
+        return registry.read(layer)
     except FileNotFoundError:
         return f"文档文件 {layer}.md 不存在"
     except Exception as e:
         return f"读取文档时出错: {str(e)}"
 
+
+# 工具描述由文档注册表生成，新文档无需修改代码
+mcp.add_tool(read_document_with_mcp, name=DOC_TOOL, description=registry.tool_description("layer"))
+
+
+# HTTP模式下直接按ETag提供文档，未变化的文档返回304
+@mcp.custom_route("/docs", methods=["GET"])
+async def list_documents(request):
+    from starlette.responses import JSONResponse
+
+    return JSONResponse(registry.manifest())
+
+
+@mcp.custom_route("/docs/{layer}", methods=["GET"])
+async def get_document(request):
+    from starlette.responses import PlainTextResponse, Response
+
+    entry = registry.get(request.path_params["layer"])
+    if entry is None:
+        return PlainTextResponse(f"文档 {request.path_params['layer']} 不存在", status_code=404)
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if entry.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return PlainTextResponse(entry.content, headers=headers, media_type="text/markdown; charset=utf-8")
+
+
+def http_app():
+    """Streamable HTTP应用：无状态、JSON响应，便于多个agent worker共享，大响应gzip压缩"""
+    from starlette.middleware.gzip import GZipMiddleware
+
+    mcp.settings.stateless_http = True
+    mcp.settings.json_response = True
+    app = mcp.streamable_http_app()
+    app.add_middleware(GZipMiddleware, minimum_size=1024)
+    return app
+
+
+async def serve_http(host: str, port: int, http2: bool):
+    app = http_app()
+    if http2:
+        # hypercorn支持HTTP/2（h2c）与HTTP/1.1 keep-alive
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config
+
+        config = Config()
+        config.bind = [f"{host}:{port}"]
+        await serve(app, config)
+    else:
+        # uvicorn默认支持HTTP/1.1 keep-alive和流水线请求
+        import uvicorn
+
+        server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, timeout_keep_alive=60))
+        await server.serve()
+
+
 def main():
     """Entry point for the direct execution server."""
-    mcp.run()
+    parser = argparse.ArgumentParser(description="Tech doc MCP server")
+    parser.add_argument("--transport", choices=["stdio", "streamable-http", "sse"],
+                        default=os.environ.get("MCP_TRANSPORT", "stdio"))
+    parser.add_argument("--host", default=os.environ.get("MCP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("MCP_PORT") or 8100))
+    parser.add_argument("--http2", action="store_true", help="serve with hypercorn (HTTP/2), requires hypercorn")
+    args = parser.parse_args()
+
+    if args.transport == "streamable-http":
+        asyncio.run(serve_http(args.host, args.port, args.http2))
+    else:
+        mcp.settings.host, mcp.settings.port = args.host, args.port
+        mcp.run(transport=args.transport)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
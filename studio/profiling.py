@@ -0,0 +1,311 @@
+"""
+On-demand sampling profiler for graph nodes.
+
+Wrap nodes with `profiled(...)` when building a graph; a run is profiled
+only when its config sets `configurable.profile` (e.g. `{"configurable":
+{"profile": true}}` from Studio or the SDK). With the flag off a wrapped
+node only pays one dict lookup.
+
+While a profiled node runs, a background thread samples its stack every
+PROFILE_INTERVAL seconds (default 5ms). Sync nodes are sampled on the
+thread that runs them; async nodes are followed through their await chain
+(gathered tool calls included), so time spent waiting on the model or an
+MCP server shows up under the frame that awaits it. Stacks are rooted at
+`node:<name>` and written after every node to PROFILE_DIR as
+
+    <thread_id>_<run_id>.collapsed        # flamegraph.pl / speedscope, weights in microseconds
+    <thread_id>_<run_id>.speedscope.json  # open in https://www.speedscope.app
+
+The run id is the server's `metadata.run_id`; local runs can pass
+`configurable.run_id`.
+"""
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import List, Optional, Tuple
+
+from langchain_core.runnables import Runnable, RunnableLambda
+
+current_file_path = os.path.abspath(__file__)
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR") or os.path.join(os.path.dirname(current_file_path), ".profiles")
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL") or 0.005)
+MAX_RUNS = 32
+MAX_DEPTH = 200
+
+
+def profiling_enabled(config) -> bool:
+    value = ((config or {}).get("configurable") or {}).get("profile")
+    return value is True or str(value).lower() in ("1", "true", "yes")
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+def _coroutine_frames(coroutine) -> List[str]:
+    names = []
+    while coroutine is not None and len(names) < MAX_DEPTH:
+        frame = getattr(coroutine, "cr_frame", None) or getattr(coroutine, "gi_frame", None)
+        if frame is not None:
+            names.append(_frame_name(frame))
+        coroutine = getattr(coroutine, "cr_await", None) or getattr(coroutine, "gi_yieldfrom", None)
+    return names
+
+
+def _await_stacks(coroutine, waiter, prefix: Tuple[str, ...], depth: int = 0) -> List[Tuple[str, ...]]:
+    """Stacks of a suspended coroutine, following what its task waits on.
+
+    `cr_await` hides the awaited future, so the chain continues through the
+    task's `_fut_waiter`: another task, or a gather whose children are tasks
+    (e.g. ToolNode running tool calls concurrently).
+    """
+    names = prefix + tuple(_coroutine_frames(coroutine))
+    if depth < MAX_DEPTH and waiter is not None:
+        if hasattr(waiter, "get_coro"):
+            return _await_stacks(waiter.get_coro(), getattr(waiter, "_fut_waiter", None), names, depth + 1)
+        children = [c for c in getattr(waiter, "_children", None) or [] if not c.done() and hasattr(c, "get_coro")]
+        if children:
+            stacks = []
+            for child in children:
+                stacks.extend(_await_stacks(child.get_coro(), getattr(child, "_fut_waiter", None), names, depth + 1))
+            return stacks
+    return [names + (f"<await {type(waiter).__name__}>" if waiter is not None else "<ready>",)]
+
+
+class RunProfile:
+    """Sampled stacks of one run, keyed by (thread_id, run_id)."""
+
+    def __init__(self, thread_id: str, run_id: str):
+        self.thread_id = thread_id
+        self.run_id = run_id
+        self.weights: Counter = Counter()  # stack -> seconds
+        self.lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return re.sub(r"[^\w.-]", "_", f"{self.thread_id}_{self.run_id}")
+
+    def add(self, stack: Tuple[str, ...], seconds: float):
+        with self.lock:
+            self.weights[stack] += seconds
+
+    def collapsed(self) -> str:
+        with self.lock:
+            items = sorted(self.weights.items())
+        return "".join(f"{';'.join(stack)} {round(seconds * 1e6)}\n" for stack, seconds in items)
+
+    def speedscope(self) -> dict:
+        with self.lock:
+            items = sorted(self.weights.items())
+        frames, index, samples = [], {}, []
+        for stack, _ in items:
+            for name in stack:
+                if name not in index:
+                    index[name] = len(frames)
+                    frames.append({"name": name})
+            samples.append([index[name] for name in stack])
+        weights = [seconds for _, seconds in items]
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "studio/profiling.py",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"thread {self.thread_id} run {self.run_id}",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def write(self, directory: str = PROFILE_DIR) -> str:
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, self.name)
+        with open(f"{base}.collapsed", "w", encoding="utf-8") as file:
+            file.write(self.collapsed())
+        with open(f"{base}.speedscope.json", "w", encoding="utf-8") as file:
+            json.dump(self.speedscope(), file)
+        return base
+
+
+class NodeSession:
+    """One profiled node execution: where its stack starts and how to sample it."""
+
+    def __init__(self, node: str, profile: RunProfile, frame):
+        self.node = node
+        self.profile = profile
+        self.frame = frame
+        self.thread = threading.get_ident()
+        self.coroutine = None
+        self.task = None
+
+    def _thread_stack(self, frames) -> Optional[Tuple[str, ...]]:
+        frame, chain = frames.get(self.thread), []
+        while frame is not None and frame is not self.frame:
+            chain.append(frame)
+            frame = frame.f_back
+        if frame is None:
+            return None
+        # the wrapper's own helper frames are noise
+        return tuple(_frame_name(f) for f in reversed(chain) if f.f_code.co_filename != current_file_path)
+
+    def sample(self, frames, seconds: float):
+        root = (f"node:{self.node}",)
+        stack = self._thread_stack(frames)
+        if stack is not None:
+            self.profile.add(root + stack, seconds)
+        elif self.coroutine is not None:
+            stacks = _await_stacks(self.coroutine, getattr(self.task, "_fut_waiter", None), root)
+            for stack in stacks:
+                self.profile.add(stack, seconds / len(stacks))
+        else:
+            self.profile.add(root + ("<not running>",), seconds)
+
+
+class Sampler:
+    """Background thread sampling every active session; runs only while one exists."""
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self._sessions = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, session: NodeSession):
+        with self._lock:
+            self._sessions.add(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="node-profiler", daemon=True)
+                self._thread.start()
+
+    def remove(self, session: NodeSession):
+        with self._lock:
+            self._sessions.discard(session)
+
+    def _run(self):
+        last = time.perf_counter()
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                sessions = list(self._sessions)
+                if not sessions:
+                    self._thread = None
+                    return
+            now = time.perf_counter()
+            frames = sys._current_frames()
+            for session in sessions:
+                try:
+                    session.sample(frames, now - last)
+                except Exception as e:  # a stack changing under us must not stop sampling
+                    logger.debug(f"Skipped sample of {session.node}: {e}")
+            last = now
+            del frames
+
+
+sampler = Sampler()
+_runs: "OrderedDict[Tuple[str, str], RunProfile]" = OrderedDict()
+_runs_lock = threading.Lock()
+
+
+def run_profile(config) -> RunProfile:
+    """The profile of the run `config` belongs to."""
+    configurable = config.get("configurable") or {}
+    metadata = config.get("metadata") or {}
+    thread_id = str(configurable.get("thread_id") or metadata.get("thread_id") or "no-thread")
+    run_id = str(metadata.get("run_id") or configurable.get("run_id") or config.get("run_id") or "local")
+    with _runs_lock:
+        profile = _runs.get((thread_id, run_id))
+        if profile is None:
+            profile = _runs[(thread_id, run_id)] = RunProfile(thread_id, run_id)
+            while len(_runs) > MAX_RUNS:
+                _runs.popitem(last=False)
+        return profile
+
+
+def _start(node: str, config, frame) -> NodeSession:
+    session = NodeSession(node, run_profile(config), frame)
+    sampler.add(session)
+    return session
+
+
+def _finish(session: NodeSession):
+    sampler.remove(session)
+    try:
+        base = session.profile.write()
+        logger.info(f"Profile of node {session.node} written to {base}.speedscope.json")
+    except OSError as e:
+        logger.error(f"Failed to write profile {session.profile.name}: {e}")
+
+
+def profiled(node, name: Optional[str] = None):
+    """Wrap a node function or runnable so runs with `configurable.profile` are sampled."""
+    name = name or getattr(node, "name", None) or getattr(node, "__name__", "node")
+
+    if isinstance(node, Runnable):
+        def run(state, config):
+            if not profiling_enabled(config):
+                return node.invoke(state, config)
+            session = _start(name, config, sys._getframe())
+            try:
+                return node.invoke(state, config)
+            finally:
+                _finish(session)
+
+        async def arun(state, config):
+            if not profiling_enabled(config):
+                return await node.ainvoke(state, config)
+            session = _start(name, config, sys._getframe())
+            try:
+                session.coroutine, session.task = node.ainvoke(state, config), asyncio.current_task()
+                return await session.coroutine
+            finally:
+                _finish(session)
+
+        return RunnableLambda(run, afunc=arun, name=name)
+
+    parameters = inspect.signature(node).parameters
+    pass_config = "config" in parameters
+    state_param = next(iter(parameters.values()), None)
+
+    def call(state, config):
+        return node(state, config) if pass_config else node(state)
+
+    if inspect.iscoroutinefunction(node):
+        async def wrapper(state, config):
+            if not profiling_enabled(config):
+                return await call(state, config)
+            session = _start(name, config, sys._getframe())
+            try:
+                session.coroutine, session.task = call(state, config), asyncio.current_task()
+                return await session.coroutine
+            finally:
+                _finish(session)
+    else:
+        def wrapper(state, config):
+            if not profiling_enabled(config):
+                return call(state, config)
+            session = _start(name, config, sys._getframe())
+            try:
+                return call(state, config)
+            finally:
+                _finish(session)
+
+    # keep the node's input schema (read from the first parameter's annotation)
+    wrapper.__name__ = getattr(node, "__name__", name)
+    if state_param is not None and state_param.annotation is not inspect.Parameter.empty:
+        wrapper.__annotations__ = {"state": state_param.annotation}
+    return wrapper
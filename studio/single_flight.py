@@ -0,0 +1,177 @@
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Coalesces identical concurrent requests.
+
+    The first caller for a key (the leader) runs the request; callers that
+    arrive with the same key while it is in flight wait for the leader and
+    get a copy of its result or its exception. If an async leader is
+    cancelled, its followers retry and one of them becomes the new leader.
+    Nothing is cached: once the leader finishes, the next caller runs the
+    request again. Sync callers are coalesced across threads, async callers
+    within their event loop.
+    """
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[Tuple[int, str], asyncio.Future] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.copy(call.result)
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        while True:
+            with self._lock:
+                future = self._async_calls.get(loop_key)
+                leader = future is None
+                if leader:
+                    future = self._async_calls[loop_key] = loop.create_future()
+                    self.leaders += 1
+                else:
+                    self.coalesced += 1
+            if leader:
+                break
+            try:
+                # shield: a cancelled follower must not cancel the shared result
+                return copy.copy(await asyncio.shield(future))
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # The leader was cancelled, not us: retry and elect a new leader
+                logger.debug(f"Leader for {self.name} was cancelled, retrying")
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # followers re-raise it; don't log "exception was never retrieved"
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                del self._async_calls[loop_key]
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            in_flight = len(self._calls) + len(self._async_calls)
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": in_flight}
+
+
+def _default(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return repr(value)
+
+
+def request_key(*parts) -> str:
+    """Stable hash of a request: model/tool identity, messages and params."""
+    text = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=_default)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def model_key(model) -> str:
+    # Keys only need to be stable within the process; bound models are
+    # cached by tool_cache, so the same model and tools share an id.
+    return f"{type(model).__name__}:{id(model)}"
+
+
+flights: Dict[str, SingleFlight] = {}
+
+
+def flight(name: str) -> SingleFlight:
+    """The process-wide group for `name`, e.g. one per node."""
+    group = flights.get(name)
+    if group is None:
+        group = flights.setdefault(name, SingleFlight(name))
+    return group
+
+
+def invoke(group: SingleFlight, model, messages, fn: Optional[Callable[[], Any]] = None, **kwargs):
+    """`model.invoke(messages, **kwargs)`, coalesced with identical in-flight calls.
+
+    `fn` replaces the call when the leader should do more than invoke the
+    model (e.g. also index the result); it runs once per coalesced group.
+    """
+    key = request_key("llm", model_key(model), messages, kwargs)
+    return group.do(key, fn or (lambda: model.invoke(messages, **kwargs)))
+
+
+async def ainvoke(group: SingleFlight, model, messages, **kwargs):
+    key = request_key("llm", model_key(model), messages, kwargs)
+    return await group.ado(key, lambda: model.ainvoke(messages, **kwargs))
+
+
+def coalesce_tool(tool, group: Optional[SingleFlight] = None):
+    """Copy of a StructuredTool whose identical concurrent calls run once.
+
+    Calls are keyed by tool name and arguments; the schema, response format
+    and error handling of the original tool are kept.
+    """
+    group = group or flight(f"tool:{tool.name}")
+    func, coroutine = tool.func, tool.coroutine
+
+    def key(kwargs):
+        # runtime is injected by ToolNode per call and is not part of the request
+        return request_key("tool", tool.name, {k: v for k, v in kwargs.items() if k != "runtime"})
+
+    def run(**kwargs):
+        return group.do(key(kwargs), lambda: func(**kwargs))
+
+    async def arun(**kwargs):
+        return await group.ado(key(kwargs), lambda: coroutine(**kwargs))
+
+    return tool.model_copy(update={"func": run if func else None, "coroutine": arun if coroutine else None})
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """Per-group leader/coalesced counts."""
+    return {name: group.stats for name, group in flights.items()}
@@ -0,0 +1,512 @@
+"""
+Local BaseStore backend on SQLite (WAL) with a memory-mapped vector segment.
+
+Replaces the whole-file pickles `langgraph dev` keeps in
+`.langgraph_api/store.pckl` and `store.vectors.pckl`: every put is an
+incremental row write, items are indexed by (namespace, key) so prefix
+search is a range scan, and embeddings live in a fixed-width float32 file
+that `search()` scores through mmap (with numpy when it is installed).
+
+    python sqlite_store.py migrate [--api-dir .langgraph_api] [--db .langgraph_api/store.sqlite3]
+    python sqlite_store.py stats [--db ...]
+
+For `langgraph dev`, langgraph.json points `store.path` at `generate_store`.
+The server does not hand its `store.index` config to a custom store, so
+semantic search is configured here from the environment:
+
+    STORE_INDEX_EMBED=openai:text-embedding-3-small
+    STORE_INDEX_DIMS=1536
+    STORE_INDEX_FIELDS=$            # comma separated JSON paths, default the whole value
+
+Without STORE_INDEX_EMBED nothing is embedded and `search(query=...)`
+ignores the query, returning filter matches only.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import mmap
+import os
+import pickle
+import sqlite3
+import threading
+from array import array
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from langgraph.store.base import (
+    BaseStore,
+    GetOp,
+    IndexConfig,
+    Item,
+    ListNamespacesOp,
+    Op,
+    PutOp,
+    Result,
+    SearchItem,
+    SearchOp,
+    ensure_embeddings,
+    get_text_at_path,
+    tokenize_path,
+)
+# Same filter and namespace matching semantics as the default in-memory store
+from langgraph.store.memory import _compare_values, _does_match
+
+try:
+    import numpy as np
+except ImportError:  # pure-python scoring fallback
+    np = None
+
+current_file_path = os.path.abspath(__file__)
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_DIR = os.path.join(os.path.dirname(current_file_path), ".langgraph_api")
+DEFAULT_PATH = os.path.join(DEFAULT_API_DIR, "store.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    prefix TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (prefix, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS vectors (
+    slot INTEGER PRIMARY KEY,
+    prefix TEXT,
+    key TEXT,
+    field TEXT
+);
+CREATE INDEX IF NOT EXISTS vectors_item ON vectors (prefix, key);
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+def encode_namespace(namespace: Tuple[str, ...]) -> str:
+    # Namespace labels cannot contain "." (BaseStore validates puts)
+    return ".".join(namespace)
+
+
+def decode_namespace(prefix: str) -> Tuple[str, ...]:
+    return tuple(prefix.split(".")) if prefix else ()
+
+
+def prefix_condition(namespace_prefix: Tuple[str, ...], column: str = "prefix") -> Tuple[str, list]:
+    """SQL matching a namespace and its children as a primary-key range scan."""
+    if not namespace_prefix:
+        return f"{column} IS NOT NULL", []
+    prefix = encode_namespace(namespace_prefix)
+    # "/" is the character after ".", so the range covers exactly "prefix.*"
+    return f"({column} = ? OR ({column} >= ? AND {column} < ?))", [prefix, prefix + ".", prefix + "/"]
+
+
+class VectorSegment:
+    """Unit-normalised float32 vectors in fixed-width rows of a mmapped file.
+
+    Row `slot` is at `slot * dims * 4`; the slot table lives in SQLite, so
+    the file itself is just the matrix and grows by doubling.
+    """
+
+    def __init__(self, path: str, dims: int, initial_rows: int = 1024):
+        self.path = path
+        self.dims = dims
+        self.row_bytes = dims * 4
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as file:
+                file.truncate(initial_rows * self.row_bytes)
+        self._file = open(path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    @property
+    def capacity(self) -> int:
+        return len(self._mm) // self.row_bytes
+
+    def _grow(self, rows: int):
+        capacity = self.capacity
+        while capacity < rows:
+            capacity *= 2
+        self._mm.close()
+        self._file.truncate(capacity * self.row_bytes)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    def write(self, slot: int, vector: List[float]):
+        if len(vector) != self.dims:
+            raise ValueError(f"Expected {self.dims} dimensions, got {len(vector)}")
+        if slot >= self.capacity:
+            self._grow(slot + 1)
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        offset = slot * self.row_bytes
+        self._mm[offset : offset + self.row_bytes] = array("f", [x / norm for x in vector]).tobytes()
+
+    def scores(self, query: List[float], slots: List[int]) -> List[float]:
+        """Cosine similarity of `query` with the vectors in `slots`."""
+        norm = math.sqrt(sum(x * x for x in query)) or 1.0
+        if np is not None:
+            matrix = np.frombuffer(self._mm, dtype=np.float32).reshape(-1, self.dims)
+            try:
+                return (matrix[np.asarray(slots, dtype=np.int64)] @ (np.asarray(query, dtype=np.float32) / norm)).tolist()
+            finally:
+                # the mmap cannot be resized or closed while a view is alive
+                del matrix
+        unit = [x / norm for x in query]
+        scores = []
+        for slot in slots:
+            row = array("f", self._mm[slot * self.row_bytes : (slot + 1) * self.row_bytes])
+            scores.append(sum(a * b for a, b in zip(row, unit)))
+        return scores
+
+    def flush(self):
+        self._mm.flush()
+
+    def close(self):
+        self._mm.flush()
+        self._mm.close()
+        self._file.close()
+
+
+class SQLiteStore(BaseStore):
+    """BaseStore on SQLite with optional semantic search.
+
+    `index` takes the same config as InMemoryStore (`dims`, `embed`,
+    `fields`). Each batch is one transaction; WAL lets other processes read
+    while it commits.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, *, index: Optional[IndexConfig] = None):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self.index_config = None
+        self.embeddings = None
+        self._fields: List[Tuple[str, Any]] = []
+        self._segment: Optional[VectorSegment] = None
+        if index:
+            self.index_config = dict(index)
+            self.embeddings = ensure_embeddings(index.get("embed"))
+            self._fields = [(p, tokenize_path(p)) if p != "$" else (p, p) for p in (index.get("fields") or ["$"])]
+            self._segment = self._open_segment(index["dims"])
+        self._next_slot = self._conn.execute("SELECT COALESCE(MAX(slot) + 1, 0) FROM vectors").fetchone()[0]
+        # Slots freed by the open transaction; a rollback gives them back
+        # their vectors, so they must not be overwritten before COMMIT
+        self._freed_in_tx: Set[int] = set()
+
+    def _open_segment(self, dims: int) -> VectorSegment:
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'dims'").fetchone()
+        if row is None:
+            self._conn.execute("INSERT INTO meta (name, value) VALUES ('dims', ?)", (str(dims),))
+        elif int(row[0]) != dims:
+            raise ValueError(f"{self.path} holds {row[0]}-dimensional vectors, index config has {dims}")
+        return VectorSegment(f"{self.path}.vectors", dims)
+
+    def close(self):
+        with self._lock:
+            if self._segment is not None:
+                self._segment.close()
+            self._conn.close()
+
+    # Embedding happens before the transaction so abatch can await it
+
+    def _texts_to_embed(self, ops: List[Op]) -> Tuple[List[str], List[str]]:
+        queries, texts = [], []
+        if not self.embeddings:
+            return queries, texts
+        for op in ops:
+            if isinstance(op, SearchOp) and op.query and op.query not in queries:
+                queries.append(op.query)
+            elif isinstance(op, PutOp):
+                for _, text in self._put_texts(op):
+                    texts.append(text)
+        return queries, list(dict.fromkeys(texts))
+
+    def _put_texts(self, op: PutOp) -> List[Tuple[str, str]]:
+        """(field, text) pairs to embed for a put."""
+        if not self.embeddings or op.value is None or op.index is False:
+            return []
+        paths = self._fields if op.index is None else [(p, tokenize_path(p)) for p in op.index]
+        found = []
+        for path, field in paths:
+            texts = get_text_at_path(op.value, field)
+            if len(texts) > 1:
+                found.extend((f"{path}.{i}", text) for i, text in enumerate(texts))
+            elif texts:
+                found.append((path, texts[0]))
+        return found
+
+    def batch(self, ops: Iterable[Op]) -> List[Result]:
+        ops = list(ops)
+        queries, texts = self._texts_to_embed(ops)
+        query_vectors = {q: self.embeddings.embed_query(q) for q in queries}
+        text_vectors = dict(zip(texts, self.embeddings.embed_documents(texts))) if texts else {}
+        return self._run(ops, query_vectors, text_vectors)
+
+    async def abatch(self, ops: Iterable[Op]) -> List[Result]:
+        ops = list(ops)
+        queries, texts = self._texts_to_embed(ops)
+        query_vectors = dict(zip(queries, await asyncio.gather(*(self.embeddings.aembed_query(q) for q in queries))))
+        text_vectors = dict(zip(texts, await self.embeddings.aembed_documents(texts))) if texts else {}
+        return await asyncio.to_thread(self._run, ops, query_vectors, text_vectors)
+
+    def _run(self, ops: List[Op], query_vectors: Dict[str, List[float]], text_vectors: Dict[str, List[float]]) -> List[Result]:
+        results: List[Result] = []
+        with self._lock:
+            self._conn.execute("BEGIN")
+            next_slot = self._next_slot
+            try:
+                for op in ops:
+                    if isinstance(op, GetOp):
+                        results.append(self._get(op.namespace, op.key))
+                    elif isinstance(op, SearchOp):
+                        results.append(self._search(op, query_vectors.get(op.query) if op.query else None))
+                    elif isinstance(op, ListNamespacesOp):
+                        results.append(self._list_namespaces(op))
+                    elif isinstance(op, PutOp):
+                        self._put(op, text_vectors)
+                        results.append(None)
+                    else:
+                        raise ValueError(f"Unknown operation type: {type(op)}")
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self._next_slot = next_slot
+                raise
+            finally:
+                self._freed_in_tx.clear()
+        return results
+
+    def _get(self, namespace: Tuple[str, ...], key: str) -> Optional[Item]:
+        row = self._conn.execute(
+            "SELECT prefix, key, value, created_at, updated_at FROM items WHERE prefix = ? AND key = ?",
+            (encode_namespace(namespace), key),
+        ).fetchone()
+        return _item(row) if row else None
+
+    def _free_vectors(self, prefix: str, key: str):
+        if self._conn.in_transaction:
+            rows = self._conn.execute("SELECT slot FROM vectors WHERE prefix = ? AND key = ?", (prefix, key))
+            self._freed_in_tx.update(slot for (slot,) in rows)
+        self._conn.execute("UPDATE vectors SET prefix = NULL, key = NULL, field = NULL WHERE prefix = ? AND key = ?",
+                           (prefix, key))
+
+    def _allocate_slot(self) -> int:
+        # The segment is written outside the transaction: only reuse slots
+        # that were already free when it began
+        for (slot,) in self._conn.execute("SELECT slot FROM vectors WHERE prefix IS NULL"):
+            if slot not in self._freed_in_tx:
+                return slot
+        slot, self._next_slot = self._next_slot, self._next_slot + 1
+        return slot
+
+    def _write_vector(self, prefix: str, key: str, field: str, vector: List[float]):
+        slot = self._allocate_slot()
+        self._segment.write(slot, vector)
+        self._conn.execute("INSERT OR REPLACE INTO vectors (slot, prefix, key, field) VALUES (?, ?, ?, ?)",
+                           (slot, prefix, key, field))
+
+    def _put(self, op: PutOp, text_vectors: Dict[str, List[float]]):
+        prefix = encode_namespace(op.namespace)
+        if op.value is None:
+            self._conn.execute("DELETE FROM items WHERE prefix = ? AND key = ?", (prefix, op.key))
+            if self._segment is not None:
+                self._free_vectors(prefix, op.key)
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        self._conn.execute(
+            "INSERT INTO items (prefix, key, value, created_at, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (prefix, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            (prefix, op.key, json.dumps(op.value, ensure_ascii=False), now, now),
+        )
+        to_embed = self._put_texts(op)
+        if to_embed:
+            self._free_vectors(prefix, op.key)
+            for field, text in to_embed:
+                self._write_vector(prefix, op.key, field, text_vectors[text])
+
+    def _search(self, op: SearchOp, query_vector: Optional[List[float]]) -> List[SearchItem]:
+        condition, params = prefix_condition(op.namespace_prefix)
+
+        def matches(item: Item) -> bool:
+            return not op.filter or all(_compare_values(item.value.get(k), v) for k, v in op.filter.items())
+
+        if query_vector is None or self._segment is None:
+            sql = f"SELECT prefix, key, value, created_at, updated_at FROM items WHERE {condition} ORDER BY prefix, key"
+            if not op.filter:
+                rows = self._conn.execute(f"{sql} LIMIT ? OFFSET ?", params + [op.limit, op.offset])
+                return [_search_item(_item(row)) for row in rows]
+            found = []
+            for row in self._conn.execute(sql, params):
+                item = _item(row)
+                if matches(item):
+                    found.append(item)
+                    if len(found) >= op.offset + op.limit:
+                        break
+            return [_search_item(item) for item in found[op.offset :]]
+
+        rows = self._conn.execute(f"SELECT slot, prefix, key FROM vectors WHERE {condition}", params).fetchall()
+        scores = self._segment.scores(query_vector, [slot for slot, _, _ in rows]) if rows else []
+        if np is not None:
+            order = np.argsort(-np.asarray(scores, dtype=np.float32), kind="stable").tolist()
+        else:
+            order = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        # best first, so an item's first field seen is its max-pooled score
+        ranked, wanted, seen = [], op.offset + op.limit, set()
+        for i in order:
+            _, prefix, key = rows[i]
+            if (prefix, key) in seen:
+                continue
+            seen.add((prefix, key))
+            item = self._get(decode_namespace(prefix), key)
+            if item is not None and matches(item):
+                ranked.append(_search_item(item, scores[i]))
+                if len(ranked) >= wanted:
+                    break
+        if len(ranked) < wanted:
+            # like InMemoryStore, fill up with items that have no embedding
+            embedded = {(prefix, key) for _, prefix, key in rows}
+            sql = f"SELECT prefix, key, value, created_at, updated_at FROM items WHERE {condition} ORDER BY prefix, key"
+            for row in self._conn.execute(sql, params):
+                if (row[0], row[1]) in embedded:
+                    continue
+                item = _item(row)
+                if matches(item):
+                    ranked.append(_search_item(item))
+                    if len(ranked) >= wanted:
+                        break
+        return ranked[op.offset :]
+
+    def _list_namespaces(self, op: ListNamespacesOp) -> List[Tuple[str, ...]]:
+        namespaces = [decode_namespace(row[0]) for row in self._conn.execute("SELECT DISTINCT prefix FROM items")]
+        if op.match_conditions:
+            namespaces = [ns for ns in namespaces if all(_does_match(c, ns) for c in op.match_conditions)]
+        if op.max_depth is not None:
+            namespaces = {ns[: op.max_depth] for ns in namespaces}
+        return sorted(namespaces)[op.offset : op.offset + op.limit]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            items = self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            namespaces = self._conn.execute("SELECT COUNT(DISTINCT prefix) FROM items").fetchone()[0]
+            vectors = self._conn.execute("SELECT COUNT(*) FROM vectors WHERE prefix IS NOT NULL").fetchone()[0]
+        return {"items": items, "namespaces": namespaces, "vectors": vectors}
+
+    def import_item(self, item: Item, vectors: Optional[Dict[str, List[float]]] = None):
+        """Insert an existing item keeping its timestamps and embeddings (no re-embedding)."""
+        prefix = encode_namespace(tuple(item.namespace))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO items (prefix, key, value, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (prefix, item.key, json.dumps(item.value, ensure_ascii=False),
+                 _timestamp(item.created_at), _timestamp(item.updated_at)),
+            )
+            if vectors:
+                if self._segment is None:
+                    self._segment = self._open_segment(len(next(iter(vectors.values()))))
+                self._free_vectors(prefix, item.key)
+                for field, vector in vectors.items():
+                    self._write_vector(prefix, item.key, field, vector)
+
+
+def _timestamp(value) -> str:
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _item(row) -> Item:
+    prefix, key, value, created_at, updated_at = row
+    return Item(value=json.loads(value), key=key, namespace=decode_namespace(prefix),
+                created_at=created_at, updated_at=updated_at)
+
+
+def _search_item(item: Item, score: Optional[float] = None) -> SearchItem:
+    return SearchItem(namespace=item.namespace, key=item.key, value=item.value,
+                      created_at=item.created_at, updated_at=item.updated_at, score=score)
+
+
+def migrate_pickles(store: SQLiteStore, api_dir: str = DEFAULT_API_DIR) -> Dict[str, int]:
+    """Copy the `langgraph dev` pickled store into `store`, in one transaction.
+
+    `store.pckl` maps namespace -> key -> Item and `store.vectors.pckl`
+    maps namespace -> key -> field -> embedding; embeddings are copied
+    as they are, so nothing is re-embedded.
+    """
+    def load(name):
+        path = os.path.join(api_dir, name)
+        if not os.path.exists(path):
+            return {}
+        with open(path, "rb") as file:
+            return pickle.load(file) or {}
+
+    data, vectors = load("store.pckl"), load("store.vectors.pckl")
+    counts = {"items": 0, "vectors": 0}
+    now = datetime.now(timezone.utc)
+    with store._lock:
+        store._conn.execute("BEGIN")
+        try:
+            for namespace, items in data.items():
+                for key, item in items.items():
+                    if not isinstance(item, Item):
+                        item = Item(value=dict(item), key=key, namespace=tuple(namespace), created_at=now, updated_at=now)
+                    item_vectors = dict(vectors.get(namespace, {}).get(key) or {})
+                    store.import_item(item, item_vectors)
+                    counts["items"] += 1
+                    counts["vectors"] += len(item_vectors)
+            store._conn.execute("COMMIT")
+        except BaseException:
+            store._conn.execute("ROLLBACK")
+            raise
+    if store._segment is not None:
+        store._segment.flush()
+    return counts
+
+
+def index_from_env() -> Optional[IndexConfig]:
+    """Index config from STORE_INDEX_EMBED, STORE_INDEX_DIMS and STORE_INDEX_FIELDS."""
+    embed = os.environ.get("STORE_INDEX_EMBED")
+    if not embed:
+        return None
+    dims = os.environ.get("STORE_INDEX_DIMS")
+    if not dims:
+        raise ValueError("STORE_INDEX_DIMS is required when STORE_INDEX_EMBED is set")
+    fields = [f.strip() for f in (os.environ.get("STORE_INDEX_FIELDS") or "$").split(",") if f.strip()]
+    return {"embed": embed, "dims": int(dims), "fields": fields}
+
+
+@contextlib.asynccontextmanager
+async def generate_store():
+    """Store factory for langgraph.json (`"store": {"path": "./sqlite_store.py:generate_store"}`)."""
+    index = index_from_env()
+    if index is None:
+        logger.info("STORE_INDEX_EMBED is not set, store semantic search is disabled")
+    store = SQLiteStore(os.environ.get("STORE_DB_PATH") or DEFAULT_PATH, index=index)
+    try:
+        yield store
+    finally:
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite store for langgraph dev")
+    parser.add_argument("command", choices=["migrate", "stats"])
+    parser.add_argument("--api-dir", default=DEFAULT_API_DIR)
+    parser.add_argument("--db", default=os.environ.get("STORE_DB_PATH") or DEFAULT_PATH)
+    args = parser.parse_args()
+
+    store = SQLiteStore(args.db, index=index_from_env())
+    try:
+        if args.command == "migrate":
+            counts = migrate_pickles(store, args.api_dir)
+            print(f"Migrated {counts['items']} items and {counts['vectors']} vectors from {args.api_dir} to {args.db}")
+        print(store.stats())
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
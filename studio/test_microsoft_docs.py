@@ -52,26 +52,12 @@ def test_local_tools():
     """测试本地工具"""
     print("\n🔍 测试本地工具...")
     
-    def find_document(type: str) -> str:
-        try:
-            if type == "frontend":
-                with open("./tech_doc/frontend.md", "r", encoding="utf-8") as file:
-                    return file.read()
-            elif type == "backend":
-                with open("./tech_doc/backend.md", "r", encoding="utf-8") as file:
-                    return file.read()
-            else:
-                return "不支持的类型"
-        except FileNotFoundError:
-            return f"文档文件 {type}.md 不存在"
-    
-    # 测试前端文档
-    result = find_document("frontend")
-    print(f"前端文档长度: {len(result)} 字符")
-    
-    # 测试后端文档
-    result = find_document("backend")
-    print(f"后端文档长度: {len(result)} 字符")
+    from doc_registry import registry
+
+    # 遍历注册表中的所有文档
+    for entry in registry.manifest():
+        result = registry.read(entry["name"])
+        print(f"{entry['name']} 文档长度: {len(result)} 字符, 约 {entry['token_estimate']} tokens")
 
 if __name__ == "__main__":
     print("🚀 开始测试MCP工具...")
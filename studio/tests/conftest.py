@@ -0,0 +1,42 @@
+import os
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+# Modules in studio/ import each other by plain name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Graph modules build their models and on-disk stores at import time
+_scratch = tempfile.mkdtemp(prefix="studio_tests_")
+for key, value in {
+    "OPENAI_API_KEY": "sk-test",
+    "GOOGLE_API_KEY": "test",
+    "TAVILY_API_KEY": "test",
+    "INCIDENT_INDEX_PATH": os.path.join(_scratch, "incident_index.json"),
+    "BLOB_STORE_DIR": os.path.join(_scratch, "blobs"),
+    "PROFILE_DIR": os.path.join(_scratch, "profiles"),
+}.items():
+    os.environ.setdefault(key, value)
+
+
+@pytest.fixture
+def doc_server(tmp_path, monkeypatch):
+    """mcp_from_scratch over HTTP on a free port, serving docs from tmp_path.
+
+    Yields the /mcp URL and the doc directory.
+    """
+    import mcp_from_scratch
+    from doc_registry import DocRegistry
+
+    (tmp_path / "backend.md").write_text("# Backend\n", encoding="utf-8")
+    registry = DocRegistry(roots=[str(tmp_path)], min_interval=0)
+    monkeypatch.setattr(mcp_from_scratch.MCPHTTPRequestHandler.handler, "registry", registry)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), mcp_from_scratch.MCPHTTPRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/mcp", tmp_path
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,32 @@
+from langchain_core.messages import HumanMessage
+
+from agent_human_in_loop import RESULT, confirm_template, describe_calls, parse_request
+
+
+def test_parse_chained_request():
+    calls = parse_request("Add 3 and 4, then multiply by 2")
+    assert calls == [
+        {"name": "add", "args": {"a": 3, "b": 4}},
+        {"name": "multiply", "args": {"a": RESULT, "b": 2}},
+    ]
+    assert describe_calls(calls) == "add 3 and 4, then multiply the result by 2"
+
+
+def test_partially_understood_request_is_not_planned():
+    assert parse_request("Divide 10 by 2, then subtract 3") == []
+    question = confirm_template({"messages": [HumanMessage(content="Divide 10 by 2, then subtract 3")]})
+    assert question["messages"][0].content == 'Do you really want me to work out "Divide 10 by 2, then subtract 3"?'
+
+
+def test_step_without_operands_is_not_planned():
+    assert parse_request("multiply by 2") == []
+
+
+def test_ambiguous_steps_are_not_planned():
+    for request in ("Multiply 2.5 by 4", "10 / 2 + 3", "Add 1, 2 and 3", "add 1 and 2 and 3", "1 + 2 + 3"):
+        assert parse_request(request) == [], request
+
+
+def test_single_operator_requests_still_parse():
+    assert parse_request("10 / 2") == [{"name": "divide", "args": {"a": 10, "b": 2}}]
+    assert parse_request("what is 6 times 7") == [{"name": "multiply", "args": {"a": 6, "b": 7}}]
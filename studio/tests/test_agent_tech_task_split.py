@@ -0,0 +1,103 @@
+from agent_tech_task_split import merge_layers, merge_structured, parse_dependencies
+
+BACKEND = """
+name: UserService
+type: Service
+layer: Business Logic Layer
+job: Loads users
+Depends On:
+  UserRepository: Repository
+
+**name:** UserRepository
+type: Repository
+layer: Data Layer
+job: Stores users
+"""
+
+FRONTEND = """
+- name: UserService
+type: API Client
+layer: Service Layer
+job: Calls the user API
+props:
+  baseUrl: string
+Depends On:
+  - `UserService`: Service [backend]
+  - HttpClient: Client
+"""
+
+
+def test_parse_dependencies():
+    assert parse_dependencies(BACKEND) == {"UserService": [("UserRepository", None)], "UserRepository": []}
+    assert parse_dependencies(FRONTEND) == {"UserService": [("UserService", "backend"), ("HttpClient", None)]}
+
+
+def test_fields_after_depends_on_end_the_list():
+    content = "name: LoginForm\nDepends On:\n  AuthService: Service\nprops:\n  userId: string\n"
+    assert parse_dependencies(content) == {"LoginForm": [("AuthService", None)]}
+
+
+def test_merge_layers_prefers_the_dependents_own_layer():
+    results = [{"layer": "frontend", "content": FRONTEND}, {"layer": "backend", "content": BACKEND}]
+    content = merge_layers({"messages": [], "layer_results": results})["messages"][0].content
+    assert "- UserService (frontend) -> UserService (backend)" in content
+    assert "(backend) -> UserRepository" not in content
+
+
+def record(name, depends_on=()):
+    return {
+        "name": name,
+        "type": "Service",
+        "layer": "Service Layer",
+        "job": f"{name} job",
+        "depends_on": [{"name": n, "type": "Service", "layer": l} for n, l in depends_on],
+    }
+
+
+def test_merge_structured_keeps_same_named_components():
+    results = [
+        {"layer": "frontend", "components": [record("UserService", [("UserService", "backend")])]},
+        {"layer": "backend", "components": [record("UserService", [("UserRepository", None)]), record("UserRepository"), record("UserRepository")]},
+    ]
+    update = merge_structured({"messages": [], "layer_results": results})
+    assert [(c["key"], c["scope"]) for c in update["components"]] == [
+        ("backend:UserService", "backend"),
+        ("backend:UserRepository", "backend"),
+        ("frontend:UserService", "frontend"),
+    ]
+    assert update["build_order"] == ["backend:UserRepository", "backend:UserService", "frontend:UserService"]
+    content = update["messages"][0].content
+    assert "- frontend:UserService -> backend:UserService" in content
+    assert "- backend:UserRepository (only the first definition is kept)" in content
+
+
+def test_structured_worker_reports_invalid_components(monkeypatch):
+    import json
+
+    from langchain_core.messages import AIMessageChunk
+
+    import agent_tech_task_split
+
+    args = json.dumps({"components": [record("UserService"), {"name": "Broken", "type": "Service"}]})
+
+    class Model:
+        def bind_tools(self, tools, **kwargs):
+            return self
+
+        def stream(self, messages):
+            for i in range(0, len(args), 7):
+                yield AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[{"name": "TaskSplit" if i == 0 else None, "args": args[i:i + 7], "id": "1", "index": 0}],
+                )
+
+    events = []
+    monkeypatch.setattr(agent_tech_task_split, "llm", Model())
+    monkeypatch.setattr(agent_tech_task_split, "get_stream_writer", lambda: events.append)
+    result = agent_tech_task_split.structured_layer_worker({"layer": "backend", "messages": []})["layer_results"][0]
+    assert [c["name"] for c in result["components"]] == ["UserService"]
+    assert len(events) == 1
+    assert len(result["errors"]) == 1 and result["errors"][0].startswith("Broken: layer: Field required")
+
+    content = merge_structured({"messages": [], "layer_results": [result]})["messages"][0].content
+    assert "## Invalid Components\n\n- backend: Broken: layer: Field required" in content
@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import approval_queue
+from approval_queue import ApprovalQueue, format_pending
+
+NOW = datetime.now(timezone.utc)
+
+
+class FakeThreads:
+    def __init__(self, threads, states):
+        self.threads, self.states = threads, states
+        self.updates = []
+        self.active = self.max_active = 0
+
+    async def search(self, status, limit, offset, sort_by, sort_order):
+        return self.threads[offset : offset + limit]
+
+    async def get_state(self, thread_id):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.001)
+        self.active -= 1
+        if thread_id == "broken":
+            raise RuntimeError("state unavailable")
+        return self.states[thread_id]
+
+    async def update_state(self, thread_id, values, as_node):
+        self.updates.append((thread_id, values["messages"][0]["content"], as_node))
+
+
+class FakeRuns:
+    def __init__(self):
+        self.resumed = []
+
+    async def wait(self, thread_id, assistant, input=None):
+        if thread_id == "t-fail":
+            raise RuntimeError("run failed")
+        self.resumed.append((thread_id, assistant))
+
+
+class FakeClient:
+    def __init__(self, threads, states):
+        self.threads, self.runs = FakeThreads(threads, states), FakeRuns()
+
+
+def make_client():
+    threads, states = [], {}
+    for i, (node, age) in enumerate([("action_taken", 7200), ("action_taken", 10), ("tools", 30)]):
+        thread_id = f"t-{i}"
+        threads.append({"thread_id": thread_id, "metadata": {"graph_id": "log_agent"},
+                        "updated_at": (NOW - timedelta(seconds=age)).isoformat()})
+        states[thread_id] = {"next": [node], "values": {"messages": [{"content": f"restart service {i}"}]}}
+    threads.append({"thread_id": "t-done", "metadata": {}, "updated_at": NOW.isoformat()})
+    states["t-done"] = {"next": [], "values": {}}
+    threads.append({"thread_id": "broken", "metadata": {}, "updated_at": NOW.isoformat()})
+    return FakeClient(threads, states)
+
+
+def test_refresh_pages_and_indexes_by_node(monkeypatch):
+    monkeypatch.setattr(approval_queue, "PAGE_SIZE", 2)
+    client = make_client()
+    queue = ApprovalQueue(client, concurrency=2)
+    assert asyncio.run(queue.refresh()) == 3
+    assert client.threads.max_active <= 2
+    assert [p.thread_id for p in queue.pending("action_taken")] == ["t-0", "t-1"]
+    assert [p.thread_id for p in queue.pending(older_than=60)] == ["t-0"]
+    assert {node: len(items) for node, items in queue.by_node().items()} == {"action_taken": 2, "tools": 1}
+    assert queue.pending()[0].last_message == "restart service 0"
+    assert "t-0" in format_pending(queue.pending())
+
+
+def test_approve_reject_and_expire():
+    client = make_client()
+    queue = ApprovalQueue(client, ttl=3600)
+
+    async def run():
+        await queue.refresh()
+        expired = await queue.expire()
+        rejected = await queue.reject(["t-2", "unknown"], reason="peak hours")
+        approved = await queue.approve(["t-1"])
+        return expired, rejected, approved
+
+    expired, rejected, approved = asyncio.run(run())
+    assert expired == {"t-0": "ok"} and rejected == {"t-2": "ok"} and approved == {"t-1": "ok"}
+    assert client.threads.updates == [
+        ("t-0", "Action rejected: approval expired after 3600s", "action_taken"),
+        ("t-2", "Action rejected: peak hours", "tools"),
+    ]
+    assert client.runs.resumed == [("t-1", "log_agent")]
+    assert queue.pending() == []
+
+
+def test_failures_are_reported_per_thread():
+    client = make_client()
+    client.threads.threads[1]["thread_id"] = "t-fail"
+    client.threads.states["t-fail"] = client.threads.states["t-1"]
+    queue = ApprovalQueue(client)
+
+    async def run():
+        await queue.refresh()
+        return await queue.approve(["t-0", "t-fail"])
+
+    outcome = asyncio.run(run())
+    assert outcome == {"t-0": "ok", "t-fail": "error: run failed"}
+    assert [p.thread_id for p in queue.pending("action_taken")] == ["t-fail"]
@@ -0,0 +1,52 @@
+import asyncio
+import os
+
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+
+from blob_store import BLOB_PREFIX, BlobStore, is_ref, store_large_results
+
+
+def test_large_results_are_stored_once_and_resolved(tmp_path):
+    store = BlobStore(root=str(tmp_path), threshold=10)
+    text = "a large document " * 10
+    small = ToolMessage(content="ok", tool_call_id="1")
+    first = store.externalize(ToolMessage(content=text, tool_call_id="2"))
+    second = store.externalize(ToolMessage(content=text, tool_call_id="3"))
+
+    assert store.externalize(small) is small
+    assert is_ref(first.content) and first.content == second.content
+    assert first.additional_kwargs["blob"] == {"kind": "text", "size": len(text)}
+    assert sum(len(files) for _, _, files in os.walk(tmp_path)) == 1
+    # already a reference: left alone
+    assert store.externalize(first) is first
+
+    resolved = store.resolve([AIMessage(content="q"), first, small])
+    assert [m.content for m in resolved] == ["q", text, "ok"]
+
+
+def test_json_content_round_trips_and_survives_a_cold_cache(tmp_path):
+    content = [{"type": "text", "text": "x" * 50}]
+    message = BlobStore(root=str(tmp_path), threshold=10).externalize(ToolMessage(content=content, tool_call_id="1"))
+    fresh = BlobStore(root=str(tmp_path), threshold=10)
+    assert fresh.resolve([message])[0].content == content
+
+
+def test_missing_blob_resolves_to_a_note(tmp_path):
+    message = ToolMessage(content=f"{BLOB_PREFIX}{'0' * 64}", tool_call_id="1")
+    assert "no longer available" in BlobStore(root=str(tmp_path)).resolve([message])[0].content
+
+
+def test_cache_is_bounded(tmp_path):
+    store = BlobStore(root=str(tmp_path), cache_bytes=100)
+    digests = [store.put(str(i) * 60) for i in range(3)]
+    assert list(store._cache) == [digests[2]]
+    assert store.get(digests[0]) == "0" * 60
+
+
+def test_store_large_results_wraps_tool_nodes(tmp_path):
+    store = BlobStore(root=str(tmp_path), threshold=10)
+    node = RunnableLambda(lambda state: {"messages": [ToolMessage(content="y" * 20, tool_call_id="1")]})
+    wrapped = store_large_results(node, store)
+    assert is_ref(wrapped.invoke({})["messages"][0].content)
+    assert is_ref(asyncio.run(wrapped.ainvoke({}))["messages"][0].content)
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from component_graph import Component, ComponentGraph, ComponentStreamParser, TaskSplit
+
+
+def component(name, depends_on=(), **kwargs):
+    fields = {"type": "Service", "layer": "Service Layer", "job": f"{name} job", **kwargs}
+    return Component(
+        name=name,
+        depends_on=[{"name": n, "type": "Service", "layer": l} for n, l in depends_on],
+        **fields,
+    )
+
+
+def test_stream_parser_emits_components_as_they_complete():
+    split = TaskSplit(components=[
+        component("AuthService", props=[{"name": "token", "type": "string"}]),
+        component("LoginForm", job='says "hi" {not a brace} \\ done'),
+    ])
+    text = json.dumps(split.model_dump())
+    parser = ComponentStreamParser()
+    emitted = []
+    for i in range(0, len(text), 7):
+        emitted.append([c.name for c in parser.feed(text[i : i + 7])])
+    first = next(i for i, names in enumerate(emitted) if names)
+    assert emitted[first] == ["AuthService"]
+    # the first component is emitted before the second one is complete
+    assert first < len(emitted) - 1
+    assert parser.components == split.components
+    assert parser.errors == []
+
+
+def test_stream_parser_skips_invalid_components_and_other_arrays():
+    parser = ComponentStreamParser()
+    text = '{"notes": [{"name": "x"}], "components": [{"name": "Broken"}, ' + component("Ok").model_dump_json() + "]}"
+    assert [c.name for c in parser.feed(text)] == ["Ok"]
+    assert len(parser.errors) == 1
+
+
+def test_same_name_in_different_layers_is_kept_apart():
+    graph = ComponentGraph([
+        ("backend", component("UserService", depends_on=[("UserRepository", None)])),
+        ("backend", component("UserRepository")),
+        ("frontend", component("UserService", depends_on=[("UserService", "backend")])),
+    ])
+    assert list(graph.components) == ["backend:UserService", "backend:UserRepository", "frontend:UserService"]
+    assert graph.edges["frontend:UserService"] == ["backend:UserService"]
+    assert graph.cross_scope_edges() == [("frontend:UserService", "backend:UserService")]
+    assert graph.topological_order() == ["backend:UserRepository", "backend:UserService", "frontend:UserService"]
+
+
+def test_dependency_resolution_and_duplicates():
+    graph = ComponentGraph([
+        ("frontend", component("Api", depends_on=[("Store", None), ("Gateway", "backend"), ("Logger", None)])),
+        ("backend", component("Store")),
+        ("backend", component("Store", job="second definition")),
+    ])
+    # unique name in another layer resolves, an unknown one stays external
+    assert graph.edges["frontend:Api"] == ["backend:Store"]
+    assert [d.name for d in graph.external["frontend:Api"]] == ["Gateway", "Logger"]
+    assert graph.cross_scope_edges() == [("frontend:Api", "backend:Store"), ("frontend:Api", "backend:Gateway")]
+    assert graph.duplicates == ["backend:Store"]
+    assert graph.components["backend:Store"].job == "Store job"
+
+
+def test_cycle_is_reported():
+    graph = ComponentGraph([
+        (None, component("A", depends_on=[("B", None)])),
+        (None, component("B", depends_on=[("A", None)])),
+    ])
+    assert graph.find_cycle() == ["A", "B", "A"]
+    with pytest.raises(ValueError, match="A -> B -> A"):
+        graph.topological_order()
@@ -0,0 +1,48 @@
+import asyncio
+
+from langchain_core.tools import StructuredTool
+
+from doc_client import DocClient
+
+
+def test_unchanged_doc_is_revalidated(doc_server):
+    url, root = doc_server
+    client = DocClient.from_mcp_url(url)
+    assert client.base_url == url[: -len("/mcp")]
+    assert client.get("backend") == "# Backend\n"
+    assert client.get("backend") == "# Backend\n"
+    assert (client.fetched, client.not_modified) == (1, 1)
+
+    (root / "backend.md").write_text("# Backend v2\n", encoding="utf-8")
+    assert asyncio.run(client.aget("backend")) == "# Backend v2\n"
+    assert client.get("missing") is None
+    assert client.stats == {"fetched": 2, "not_modified": 1, "cached": 1}
+
+
+def test_wrapped_tool_reads_docs_and_falls_back(doc_server):
+    url, _ = doc_server
+    calls = []
+
+    async def call_tool(layer: str):
+        calls.append(layer)
+        return [{"type": "text", "text": f"from tool: {layer}"}], None
+
+    tool = StructuredTool.from_function(
+        coroutine=call_tool, name="read_document_with_mcp", description="docs",
+        response_format="content_and_artifact",
+    )
+    wrapped = DocClient.from_mcp_url(url).wrap_tool(tool)
+    assert wrapped.name == tool.name and wrapped.args == tool.args
+
+    async def run():
+        return [await wrapped.coroutine(layer=layer) for layer in ("backend", "backend", "missing")]
+
+    assert asyncio.run(run()) == [
+        ([{"type": "text", "text": "# Backend\n"}], None),
+        ([{"type": "text", "text": "# Backend\n"}], None),
+        ([{"type": "text", "text": "from tool: missing"}], None),
+    ]
+    assert calls == ["missing"]
+
+    unreachable = DocClient("http://127.0.0.1:9", timeout=0.5).wrap_tool(tool)
+    assert asyncio.run(unreachable.coroutine(layer="backend"))[0][0]["text"] == "from tool: backend"
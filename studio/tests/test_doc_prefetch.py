@@ -0,0 +1,54 @@
+import doc_prefetch
+from doc_registry import DocRegistry
+
+DOCS = {
+    "frontend": "---\nkind: layer\nhints: button, screen\n---\n# Frontend\nReact components, hooks and styles.\n",
+    "backend": "---\nkind: layer\nhints: database\n---\n# Backend\nSpring services, repositories and controllers.\n",
+    "story": "---\nkind: input\n---\nAs a shopper I want a button that shows React hooks.\n",
+}
+
+
+def make_registry(tmp_path, monkeypatch):
+    for name, text in DOCS.items():
+        (tmp_path / f"{name}.md").write_text(text, encoding="utf-8")
+    registry = DocRegistry(roots=[str(tmp_path)], min_interval=0)
+    monkeypatch.setattr(doc_prefetch, "registry", registry)
+    return registry
+
+
+def test_layers_and_hints_come_from_front_matter(tmp_path, monkeypatch):
+    make_registry(tmp_path, monkeypatch)
+    classifier = doc_prefetch.LayerClassifier()
+    assert sorted(classifier.layers()) == ["backend", "frontend"]
+    assert classifier.predict("The screen has a button") == ["frontend"]
+    assert classifier.predict("Saved in the database") == ["backend"]
+    assert classifier.predict("nothing relevant here") == []
+
+
+def test_new_layer_doc_is_classified_without_code_changes(tmp_path, monkeypatch):
+    make_registry(tmp_path, monkeypatch)
+    classifier = doc_prefetch.LayerClassifier()
+    classifier.predict("warm up")
+    (tmp_path / "mobile.md").write_text("---\nhints: swipe\n---\n# Mobile\n", encoding="utf-8")
+    assert classifier.predict("swipe to delete") == ["mobile"]
+
+
+def test_prefetch_skips_unknown_docs(tmp_path, monkeypatch):
+    make_registry(tmp_path, monkeypatch)
+    docs = doc_prefetch.prefetch(["backend", "missing"])
+    assert list(docs) == ["backend"] and docs["backend"].startswith("# Backend")
+
+
+def test_requested_layers_and_stats():
+    from langchain_core.messages import AIMessage
+
+    message = AIMessage(content="", tool_calls=[
+        {"name": "find_document", "args": {"type": "backend"}, "id": "1"},
+        {"name": "other", "args": {"type": "frontend"}, "id": "2"},
+    ])
+    requested = doc_prefetch.requested_layers(message)
+    assert requested == ["backend"]
+    stats = doc_prefetch.PrefetchStats()
+    assert stats.record(["backend", "frontend"], requested)
+    assert not stats.record(["frontend"], requested)
+    assert (stats.hits, stats.misses) == (1, 1)
@@ -0,0 +1,47 @@
+from doc_registry import DocRegistry, split_front_matter
+
+
+def test_split_front_matter():
+    metadata, body = split_front_matter("---\nkind: layer\nhints: api, Database\n# note: x\n---\n# Title\n")
+    assert metadata == {"kind": "layer", "hints": ["api", "Database"]}
+    assert body == "# Title\n"
+    assert split_front_matter("# Title\n---\nkind: input\n---\n") == ({}, "# Title\n---\nkind: input\n---\n")
+
+
+def test_registry_picks_up_new_and_changed_docs(tmp_path):
+    (tmp_path / "backend.md").write_text("---\nkind: layer\nhints: api\n---\n# Backend\n", encoding="utf-8")
+    (tmp_path / "notes.bin").write_text("ignored", encoding="utf-8")
+    registry = DocRegistry(roots=[str(tmp_path)], min_interval=0)
+    entry = registry.get("backend")
+    assert registry.names() == ["backend"]
+    assert (entry.content, entry.headings, entry.kind, entry.hints) == ("# Backend\n", ["Backend"], "layer", ["api"])
+    version, etag = registry.version, entry.etag
+
+    (tmp_path / "story.md").write_text("---\nkind: input\n---\nAs a user\n", encoding="utf-8")
+    (tmp_path / "backend.md").write_text("# Backend v2\n", encoding="utf-8")
+    assert registry.refresh()
+    assert registry.version == version + 1
+    assert registry.get("story").kind == "input"
+    assert registry.get("backend").etag != etag and registry.get("backend").kind == "layer"
+    assert not registry.refresh()
+
+
+def test_bind_doc_tools_cache_is_bounded_and_holds_the_model(monkeypatch):
+    import doc_registry
+    from langchain_core.tools import StructuredTool
+
+    class Model:
+        def bind_tools(self, tools, **kwargs):
+            return ("bound", self, tuple(tools))
+
+    monkeypatch.setattr(doc_registry, "MAX_BOUND", 2)
+    monkeypatch.setattr(doc_registry, "_bound_cache", doc_registry.OrderedDict())
+    tool = StructuredTool.from_function(func=lambda q: q, name="echo", description="Echoes q.")
+    first = Model()
+    bound = doc_registry.bind_doc_tools(first, [tool])
+    assert doc_registry.bind_doc_tools(first, [tool]) is bound
+    models = [Model() for _ in range(3)]
+    for model in models:
+        doc_registry.bind_doc_tools(model, [tool])
+    assert len(doc_registry._bound_cache) == 2
+    assert all(entry[0] in models for entry in doc_registry._bound_cache.values())
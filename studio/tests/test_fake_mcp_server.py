@@ -0,0 +1,60 @@
+import asyncio
+import json
+import time
+
+import pytest
+from mcp.server.fastmcp.exceptions import ToolError
+
+from fake_mcp_server import AWS_DOCS, MICROSOFT_DOCS, FakeBehaviour, aws_server, microsoft_server, search
+
+
+def test_search_ranks_by_term_overlap_and_falls_back_to_the_corpus():
+    assert search(AWS_DOCS, "lambda functions", 2)[0]["title"] == "AWS Lambda developer guide"
+    assert [d["title"] for d in search(MICROSOFT_DOCS, "postgresql", 10)][0].startswith("Azure Database for PostgreSQL")
+    # no overlap at all still returns something, like the real servers
+    assert search(AWS_DOCS, "zzz", 3) == AWS_DOCS[:3]
+
+
+def test_pad_repeats_text_up_to_the_payload():
+    behaviour = FakeBehaviour(payload=50)
+    padded = behaviour.pad("abcdefgh")
+    assert len(padded) == 50 and padded.startswith("abcdefgh\n\nabcdefgh")
+    assert behaviour.pad("x" * 60) == "x" * 60
+    assert behaviour.pad("") == ""
+    assert FakeBehaviour().pad("abc") == "abc"
+
+
+def test_tools_serve_padded_fixture_docs():
+    mcp = aws_server(FakeBehaviour(payload=400))
+    content, _ = asyncio.run(mcp.call_tool("search_documentation", {"search_phrase": "bedrock", "limit": 1}))
+    (result,) = json.loads(content[0].text)
+    assert result["title"] == "Amazon Bedrock user guide" and len(result["context"]) == 400
+
+
+def test_injected_errors_and_latency():
+    failing = microsoft_server(FakeBehaviour(error_rate=1.0, seed=1))
+    with pytest.raises(ToolError, match="Injected failure in microsoft_docs_search"):
+        asyncio.run(failing.call_tool("microsoft_docs_search", {"query": "azure"}))
+
+    slow = microsoft_server(FakeBehaviour(latency=0.05))
+    start = time.perf_counter()
+    asyncio.run(slow.call_tool("microsoft_docs_search", {"query": "azure"}))
+    assert time.perf_counter() - start >= 0.05
+
+    behaviour = FakeBehaviour(latency=0.02, jitter=0.01, error_rate=0.5, seed=7)
+
+    async def outcomes():
+        results = []
+        for _ in range(20):
+            try:
+                await behaviour.before_call("t")
+                results.append(True)
+            except RuntimeError:
+                results.append(False)
+        return results
+
+    results = asyncio.run(outcomes())
+    assert 0 < results.count(False) < 20
+    # the same seed injects the same failures
+    behaviour.random.seed(7)
+    assert asyncio.run(outcomes()) == results
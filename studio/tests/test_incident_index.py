@@ -0,0 +1,67 @@
+import time
+
+from incident_index import IncidentIndex, log_features, mask, minhash, similarity
+
+
+def payment_log(order, ts="2024-05-01 10:00", ip="10.0.0.7"):
+    return "".join([
+        f"{ts}:01 [ERROR] [http-1] com.shop.PaymentService - [PAY] order ORD-{order} charge failed GATEWAY_TIMEOUT_ERROR from {ip}\n",
+        f"{ts}:02 [WARN] [http-1] com.shop.RetryPolicy - [RETRY] retrying order ORD-{order} attempt 2 of 3\n",
+        f"{ts}:05 [ERROR] [http-1] com.shop.OrderService - [ORDER] order ORD-{order} marked failed after 3 attempts\n",
+    ])
+
+
+DISK_LOG = (
+    "2024-05-01 11:00:00 [ERROR] [cron] com.ops.Backup - [DISK] no space left on device /var/backups\n"
+    "2024-05-01 11:00:01 [INFO] [cron] com.ops.Cleanup - [DISK] removed 12 stale archives\n"
+)
+
+
+def test_mask_removes_volatile_values():
+    assert mask("2024-05-01 10:00:01 order ORD-77 from 10.0.0.7 took 35ms") == "<TS> order <ID> from <IP> took <NUM>ms"
+    assert log_features(payment_log(1)) == log_features(payment_log(999, ts="2025-01-09 23:59", ip="192.168.1.2"))
+
+
+def test_recurrence_is_found_and_other_incidents_are_not(tmp_path):
+    index = IncidentIndex(path=str(tmp_path / "index.json"))
+    index.add(payment_log(1), "payment gateway timeouts")
+    entry, score = index.lookup(payment_log(2, ts="2024-06-02 08:30"))
+    assert entry["summary"] == "payment gateway timeouts" and score == 1.0 and entry["hits"] == 1
+    assert index.lookup(DISK_LOG) is None
+
+
+def test_similarity_tracks_jaccard():
+    a = {f"f{i}" for i in range(100)}
+    b = {f"f{i}" for i in range(20, 120)}  # Jaccard 80/120
+    assert similarity(minhash(a), minhash(a)) == 1.0
+    assert abs(similarity(minhash(a), minhash(b)) - 80 / 120) < 0.15
+
+
+def test_index_persists_across_restarts(tmp_path):
+    path = str(tmp_path / "index.json")
+    IncidentIndex(path=path).add(payment_log(1), "payment gateway timeouts")
+    reloaded = IncidentIndex(path=path)
+    assert len(reloaded) == 1
+    assert reloaded.lookup(payment_log(3))[0]["summary"] == "payment gateway timeouts"
+
+
+def test_eviction_by_size_and_age(tmp_path):
+    index = IncidentIndex(path=str(tmp_path / "index.json"), max_entries=1)
+    index.add(payment_log(1), "payment")
+    index.add(DISK_LOG, "disk")
+    assert len(index) == 1 and index.lookup(payment_log(1)) is None
+
+    index = IncidentIndex(path=str(tmp_path / "aged.json"), ttl=0.01)
+    index.add(payment_log(1), "payment")
+    time.sleep(0.02)
+    index.add(DISK_LOG, "disk")
+    assert len(index) == 1 and index.lookup(DISK_LOG)[0]["summary"] == "disk"
+
+
+def test_lookup_evicts_expired_matches(tmp_path):
+    path = str(tmp_path / "index.json")
+    index = IncidentIndex(path=path, ttl=0.01)
+    index.add(payment_log(1), "payment")
+    time.sleep(0.02)
+    assert index.lookup(payment_log(2)) is None
+    assert len(index) == 0 and len(IncidentIndex(path=path)) == 0
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+
+from llm_governor import Governor, parse_duration, parse_limits
+
+
+def test_parse_duration_and_limits():
+    assert parse_duration("20ms") == 0.02
+    assert parse_duration("6m0s") == 360
+    assert parse_duration("2") == 2
+    assert parse_duration("soon") is None
+    assert parse_limits("openai=500rpm/200000tpm, tavily=60rpm") == {
+        "openai": {"rpm": 500, "tpm": 200000},
+        "tavily": {"rpm": 60},
+    }
+
+
+def test_concurrency_limit_admits_in_order():
+    governor = Governor(max_concurrency=1)
+    order = []
+
+    def call(i):
+        with governor.limit("p"):
+            order.append(i)
+            time.sleep(0.02)
+
+    governor.acquire("p")
+    threads = []
+    for i in range(3):
+        threads.append(threading.Thread(target=call, args=(i,)))
+        threads[-1].start()
+        time.sleep(0.02)
+    governor.release("p")
+    for thread in threads:
+        thread.join(5)
+    assert order == [0, 1, 2]
+    assert governor.in_flight == 0
+
+
+def test_cancelled_async_waiter_does_not_leak_a_slot():
+    governor = Governor(max_concurrency=1)
+
+    async def main():
+        async with governor.alimit("p"):
+            waiter = asyncio.ensure_future(governor.aacquire("p"))
+            await asyncio.sleep(0.05)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+        assert governor.in_flight == 0
+        assert governor.metrics()["p"]["queue_depth"] == 0
+        # the next caller is admitted right away
+        await asyncio.wait_for(governor.aacquire("p"), 1)
+        governor.release("p")
+
+    asyncio.run(main())
+    assert governor.in_flight == 0
+
+
+def test_wait_for_timeout_releases_queue_position():
+    governor = Governor(max_concurrency=1)
+
+    async def main():
+        governor.acquire("p")
+        try:
+            await asyncio.wait_for(governor.aacquire("p"), 0.05)
+        except asyncio.TimeoutError:
+            pass
+        governor.release("p")
+        async with governor.alimit("p"):
+            assert governor.in_flight == 1
+
+    asyncio.run(main())
+    assert governor.in_flight == 0
+
+
+def test_async_waiter_woken_by_sync_release():
+    governor = Governor(max_concurrency=1)
+    governor.acquire("p")
+    threading.Timer(0.05, governor.release, args=("p",)).start()
+
+    async def main():
+        waited = await asyncio.wait_for(governor.aacquire("p"), 2)
+        governor.release("p")
+        return waited
+
+    assert 0.03 < asyncio.run(main()) < 1
+
+
+def test_rate_limit_headers_back_off():
+    governor = Governor()
+    governor.observe_headers("p", {"x-ratelimit-remaining-requests": "0", "x-ratelimit-reset-requests": "2s"})
+    assert 1 < governor.metrics()["p"]["backoff_remaining"] <= 2
+
+
+def test_malformed_rate_limit_headers_are_ignored():
+    governor = Governor()
+    governor.observe_headers("p", {"x-ratelimit-remaining-tokens": "n/a", "x-ratelimit-reset-tokens": "1s"})
+    governor.observe_headers("p", {"x-ratelimit-remaining-tokens": "0", "x-ratelimit-reset-tokens": "1.2.3s"})
+    governor.observe_headers("p", {"retry-after": "1.2.3"})
+    assert governor.metrics()["p"]["backoff_remaining"] == 0
+
+
+def test_429_without_headers_backs_off_exponentially():
+    governor = Governor(base_backoff=1, max_backoff=8)
+
+    class RateLimitError(Exception):
+        status_code = 429
+
+    for _ in range(3):
+        governor.observe_error("p", RateLimitError())
+    assert 3 < governor.metrics()["p"]["backoff_remaining"] <= 4
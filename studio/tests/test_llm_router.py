@@ -0,0 +1,199 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from llm_governor import Governor
+from llm_router import BackendHealth, RouterChatModel, make_router
+
+
+class FakeBackend:
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name, self.delay, self.fail = name, delay, fail
+        self.calls = 0
+        self.cancelled = 0
+        self.tools = None
+
+    def _reply(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        return AIMessage(content=self.name)
+
+    def invoke(self, messages, stop=None, **kwargs):
+        time.sleep(self.delay)
+        return self._reply()
+
+    async def ainvoke(self, messages, stop=None, **kwargs):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self._reply()
+
+    def stream(self, messages, stop=None, **kwargs):
+        message = self._reply()
+        for word in message.content:
+            yield AIMessageChunk(content=word)
+
+    def bind_tools(self, tools, **kwargs):
+        bound = FakeBackend(self.name, self.delay, self.fail)
+        bound.tools = tools
+        return bound
+
+
+def router(*backends, **kwargs):
+    return RouterChatModel(
+        backends=list(backends), names=[b.name for b in backends], governor=Governor(), **kwargs
+    )
+
+
+def test_primary_is_used_until_measured_slower():
+    primary, secondary = FakeBackend("primary"), FakeBackend("secondary")
+    model = router(primary, secondary, min_samples=2)
+    assert model.invoke("hi").content == "primary"
+    model.health["primary"].latencies.extend([1.0, 1.0])
+    model.health["secondary"].latencies.extend([0.1, 0.1])
+    assert model.invoke("hi").content == "secondary"
+
+
+def test_single_failure_does_not_move_traffic_off_the_primary():
+    primary, secondary = FakeBackend("primary"), FakeBackend("secondary")
+    model = router(primary, secondary)
+    primary.fail = True
+    assert model.invoke("hi").content == "secondary"
+    primary.fail = False
+    for _ in range(10):
+        assert model.invoke("hi").content == "primary"
+    assert primary.calls == 11 and secondary.calls == 1
+
+
+def test_failure_falls_through_and_opens_the_circuit():
+    broken, backup = FakeBackend("broken", fail=True), FakeBackend("backup")
+    model = router(broken, backup, failure_threshold=2, cooldown=60)
+    for _ in range(2):
+        assert model.invoke("hi").content == "backup"
+    assert model.stats()["broken"]["state"] == "open"
+    model.invoke("hi")
+    assert broken.calls == 2
+
+
+def test_half_open_backend_gets_one_probe_and_recovers():
+    primary, secondary = FakeBackend("primary", fail=True), FakeBackend("secondary")
+    model = router(primary, secondary, failure_threshold=1, cooldown=0.05)
+    assert model.invoke("hi").content == "secondary"
+    assert model.invoke("hi").content == "secondary"
+    assert primary.calls == 1
+    time.sleep(0.06)
+    primary.fail = False
+    for _ in range(10):
+        assert model.invoke("hi").content == "primary"
+    assert primary.calls == 11 and model.stats()["primary"]["state"] == "closed"
+
+
+def test_only_one_caller_claims_the_probe():
+    health = BackendHealth(failure_threshold=1, cooldown=0.01)
+    assert not health.claim_probe()
+    health.record_failure()
+    time.sleep(0.02)
+    assert health.claim_probe()
+    assert not health.claim_probe()
+    health.release_probe()
+    assert health.claim_probe()
+
+
+def test_old_errors_age_out_of_the_error_rate():
+    health = BackendHealth(error_window=0.05)
+    health.record_failure()
+    health.record_success(0.1)
+    assert health.error_rate == 0.5
+    time.sleep(0.06)
+    assert health.error_rate == 0.0
+
+
+def test_circuit_half_opens_after_cooldown():
+    health = BackendHealth(failure_threshold=1, cooldown=0.01)
+    health.record_failure()
+    assert health.state == "open"
+    time.sleep(0.02)
+    assert health.state == "half_open"
+    # a failed probe re-opens it
+    health.record_failure()
+    assert health.state == "open"
+    health.record_success(0.1)
+    assert health.state == "closed" and health.percentile(0.95) == 0.1
+
+
+def test_all_backends_failing_raises_the_last_error():
+    model = router(FakeBackend("a", fail=True), FakeBackend("b", fail=True))
+    with pytest.raises(RuntimeError, match="b down"):
+        model.invoke("hi")
+
+
+def test_sync_hedge_returns_the_faster_backend():
+    slow, fast = FakeBackend("slow", delay=0.5), FakeBackend("fast")
+    model = router(slow, fast, hedge_after=0.02)
+    start = time.perf_counter()
+    assert model.invoke("hi").content == "fast"
+    assert time.perf_counter() - start < 0.4
+
+
+def test_async_hedge_cancels_the_losing_request():
+    slow, fast = FakeBackend("slow", delay=1), FakeBackend("fast", delay=0.01)
+    model = router(slow, fast, hedge_after=0.02)
+    assert asyncio.run(model.ainvoke("hi")).content == "fast"
+    assert slow.cancelled == 1 and fast.calls == 1
+
+
+def test_async_without_hedging_only_calls_the_primary():
+    primary, secondary = FakeBackend("primary", delay=0.02), FakeBackend("secondary")
+    model = router(primary, secondary)
+    assert asyncio.run(model.ainvoke("hi")).content == "primary"
+    assert secondary.calls == 0
+
+
+def test_stream_falls_back_before_the_first_chunk():
+    model = router(FakeBackend("broken", fail=True), FakeBackend("ok"))
+    assert "".join(chunk.content for chunk in model.stream("hi")) == "ok"
+
+
+def test_rate_limit_headers_reach_the_governor_but_not_the_message():
+    class HeaderBackend(FakeBackend):
+        def _reply(self):
+            message = super()._reply()
+            message.response_metadata["headers"] = {
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": "2s",
+                "set-cookie": "session=secret",
+            }
+            return message
+
+        def stream(self, messages, stop=None, **kwargs):
+            for i, chunk in enumerate(super().stream(messages, stop=stop, **kwargs)):
+                if i == 0:
+                    chunk.response_metadata["headers"] = {"x-ratelimit-remaining-requests": "0"}
+                yield chunk
+
+    model = router(HeaderBackend("p"))
+    chunks = list(model.stream("hi"))
+    assert all("headers" not in chunk.response_metadata for chunk in chunks)
+    message = model.invoke("hi")
+    assert "headers" not in message.response_metadata
+    assert model.governor.metrics()["HeaderBackend"]["backoff_remaining"] > 1
+
+
+def test_bind_tools_binds_every_backend_and_shares_health():
+    model = router(FakeBackend("a"), FakeBackend("b"))
+    bound = model.bind_tools(["tool"])
+    assert [b.tools for b in bound.backends] == [["tool"], ["tool"]]
+    bound.invoke("hi")
+    assert model.stats()["a"]["samples"] == 1
+
+
+def test_make_router_reads_env(monkeypatch):
+    monkeypatch.setenv("LLM_HEDGE_AFTER", "0.5")
+    monkeypatch.delenv("LLM_FALLBACK_MODELS", raising=False)
+    model = make_router(FakeBackend("primary"))
+    assert model.hedge_after == 0.5 and len(model.backends) == 1
@@ -0,0 +1,69 @@
+from langchain_core.messages import AIMessage
+
+import log_agent
+
+CHUNK_1 = """2024-05-01 10:00:00 [ERROR] [main] com.app.Db - connection refused (ERR-42)
+2024-05-01 10:00:01 [INFO] [main] com.app.Web - retrying
+"""
+CHUNK_2 = """2024-05-01 10:00:02 [ERROR] [main] com.app.Db - connection refused (ERR-42)
+2024-05-01 10:00:03 [INFO] [main] com.app.Web - recovered
+"""
+
+
+class FakeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def invoke(self, messages):
+        self.prompts.append(messages[-1].content)
+        return AIMessage(content=f"summary {len(self.prompts)}")
+
+
+def test_ingest_log_keeps_only_the_index_in_state(monkeypatch):
+    fake = FakeLLM()
+    monkeypatch.setattr(log_agent, "llm", fake)
+    agent = log_agent.Agent()
+
+    state = {"messages": [], "summary": "initial", "log_chunk": CHUNK_1}
+    update = agent.ingest_log_node(state)
+    assert "log" not in update
+    assert update["log_chunk"] == ""
+    state.update(update, log_chunk=CHUNK_2)
+    update = agent.ingest_log_node(state)
+
+    assert "log" not in update
+    assert update["summary"] == "summary 2"
+    # the model only sees entries it has not seen before; the last entry of a
+    # chunk waits for the next header
+    new_entries = fake.prompts[-1].split("New log entries:")[1]
+    assert "10:00:00" not in new_entries and "10:00:02" in new_entries
+    assert "recovered" not in new_entries
+    assert "summary 1" in fake.prompts[-1]
+
+
+def test_chunk_without_complete_entries_skips_the_model(monkeypatch):
+    fake = FakeLLM()
+    monkeypatch.setattr(log_agent, "llm", fake)
+    agent = log_agent.Agent()
+
+    update = agent.ingest_log_node({"messages": [], "log_chunk": "2024-05-01 10:00:00 [ERROR] [main] com.app"})
+    assert fake.prompts == []
+    assert set(update) == {"log_index", "log_chunk"}
+
+
+def test_init_summary_hashes_the_log_once(monkeypatch):
+    fake = FakeLLM()
+    monkeypatch.setattr(log_agent, "llm", fake)
+    signatures = []
+
+    class Index:
+        def lookup(self, log, signature=None):
+            signatures.append(signature)
+
+        def add(self, log, summary, signature=None):
+            signatures.append(signature)
+
+    monkeypatch.setattr(log_agent, "incident_index", Index())
+    update = log_agent.Agent().init_summary_node({"messages": [], "log": CHUNK_1})
+    assert update["summary"] == "summary 1"
+    assert len(signatures) == 2 and signatures[0] is signatures[1] is not None
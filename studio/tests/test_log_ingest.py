@@ -0,0 +1,98 @@
+import threading
+import time
+
+import log_ingest
+from log_ingest import format_index, ingest, parse_entries, tail_file
+
+LOG = """2024-05-01 10:00:00.123 [ERROR] [http-1] com.app.OrderService - [PAYMENT] charge failed PAYMENT_GATEWAY_TIMEOUT
+java.lang.RuntimeException: timeout
+    at com.app.Gateway.charge(Gateway.java:42)
+2024-05-01 10:00:01,5 [WARN] [http-2] com.app.Retry - retrying order 17
+2024-05-01 10:00:02 [INFO] [main] started
+"""
+
+
+def test_parse_entries_keeps_continuation_lines():
+    first, second, third = parse_entries(LOG)
+    assert (first["level"], first["logger"], first["tag"], first["thread"]) == ("ERROR", "com.app.OrderService", "PAYMENT", "http-1")
+    assert first["raw"].endswith("Gateway.java:42)")
+    assert (second["ts"], second["message"]) == ("2024-05-01 10:00:01,5", "retrying order 17")
+    assert (third["logger"], third["message"]) == ("", "started")
+
+
+def test_chunked_ingest_matches_a_single_pass():
+    whole, whole_entries = ingest(None, LOG, final=True)
+    for size in (1, 7, 50):
+        index, entries = None, []
+        chunks = [LOG[i : i + size] for i in range(0, len(LOG), size)]
+        for i, chunk in enumerate(chunks):
+            index, new = ingest(index, chunk, final=i == len(chunks) - 1)
+            entries.extend(new)
+        assert [e["raw"] for e in entries] == [e["raw"] for e in whole_entries]
+        assert index == whole
+    assert whole["levels"] == {"ERROR": 1, "WARN": 1, "INFO": 1}
+    assert whole["error_codes"] == {"PAYMENT_GATEWAY_TIMEOUT": 1}
+    assert (whole["first_ts"], whole["last_ts"], whole["pending"]) == ("2024-05-01 10:00:00.123", "2024-05-01 10:00:02", "")
+    assert "Error codes: PAYMENT_GATEWAY_TIMEOUT=1" in format_index(whole)
+
+
+def test_ingest_does_not_mutate_the_previous_index():
+    index, _ = ingest(None, LOG)
+    before = {k: (dict(v) if isinstance(v, dict) else v) for k, v in index.items()}
+    ingest(index, LOG)
+    assert index == before
+
+
+def test_unrecognised_text_passes_through(monkeypatch):
+    index, entries = ingest(None, "plain line\nanother\n")
+    assert entries == [] and index["pending"] == "plain line\nanother\n"
+    index, entries = ingest(index, "", final=True)
+    assert [e["raw"] for e in entries] == ["plain line\nanother\n"]
+    monkeypatch.setattr(log_ingest, "MAX_PENDING", 10)
+    _, entries = ingest(None, "x" * 20)
+    assert len(entries) == 1
+
+
+def test_counters_are_bounded(monkeypatch):
+    monkeypatch.setattr(log_ingest, "MAX_KEYS", 2)
+    text = "".join(f"2024-05-01 10:00:0{i} [INFO] [t] com.app.L{i} - hi\n" for i in range(5))
+    index, _ = ingest(None, text, final=True)
+    assert index["loggers"] == {"com.app.L0": 1, "com.app.L1": 1}
+    assert index["entries"] == 5
+
+
+def test_tail_file_follows_appends_and_truncation(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("old\n", encoding="utf-8")
+    chunks, stop = [], threading.Event()
+    thread = threading.Thread(target=tail_file, args=(str(path), chunks.append),
+                              kwargs={"poll_interval": 0.01, "flush_interval": 0, "stop": stop})
+    thread.start()
+    time.sleep(0.05)
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("new 1\n")
+    time.sleep(0.1)
+    path.write_text("rotated\n", encoding="utf-8")
+    time.sleep(0.1)
+    stop.set()
+    thread.join(2)
+    assert "".join(chunks) == "new 1\nrotated\n"
+
+
+def test_tail_file_waits_for_a_renamed_file_to_come_back(tmp_path):
+    path = tmp_path / "app.log"
+    chunks, stop = [], threading.Event()
+    thread = threading.Thread(target=tail_file, args=(str(path), chunks.append),
+                              kwargs={"poll_interval": 0.01, "flush_interval": 0, "stop": stop})
+    thread.start()
+    time.sleep(0.05)
+    path.write_text("first\n", encoding="utf-8")
+    time.sleep(0.1)
+    path.rename(tmp_path / "app.log.1")
+    time.sleep(0.05)
+    assert thread.is_alive()
+    path.write_text("second\n", encoding="utf-8")
+    time.sleep(0.1)
+    stop.set()
+    thread.join(2)
+    assert "".join(chunks) == "first\nsecond\n"
@@ -0,0 +1,49 @@
+from log_templates import WILDCARD, TemplateMiner, compress_log, format_templates
+
+
+def test_similar_lines_join_one_template_with_samples():
+    miner = TemplateMiner()
+    for user in ("alice", "bob", "carol", "dave"):
+        miner.add(f"login failed for user={user} from 10.0.0.1", ts=f"t-{user}")
+    miner.add("disk full on /var")
+    assert len(miner.clusters) == 2
+    cluster = max(miner.clusters.values(), key=lambda c: c.count)
+    assert cluster.template() == f"login failed for user={WILDCARD} from 10.0.0.1"
+    assert cluster.count == 4 and (cluster.first_ts, cluster.last_ts) == ("t-alice", "t-dave")
+    # only max_samples distinct values are kept per slot
+    assert list(cluster.samples.values()) == [["alice", "bob", "carol"]]
+
+
+def test_different_lengths_and_dissimilar_lines_stay_apart():
+    miner = TemplateMiner()
+    miner.add("connection reset by peer")
+    miner.add("connection reset by remote peer")
+    miner.add("cache miss key a b c")
+    miner.add("cache hit ratio is low")
+    assert len(miner.clusters) == 4
+
+
+def test_clusters_are_evicted_least_recently_used():
+    miner = TemplateMiner(max_clusters=2)
+    miner.add("alpha one")
+    miner.add("beta two three")
+    miner.add("alpha one")
+    miner.add("gamma four five six")
+    assert [c.template() for c in miner.clusters.values()] == ["alpha one", "gamma four five six"]
+    assert miner.evicted == 1
+    assert "1 templates evicted" in format_templates(miner)
+
+
+def test_compress_log_uses_parsed_entries():
+    log = "".join(
+        f"2024-05-01 10:00:{i:02d} [ERROR] [t-{i}] com.app.Db - connection {i} refused\n    at Db.java:{i}\n"
+        for i in range(30)
+    )
+    compressed = compress_log(log)
+    assert len(compressed) < len(log)
+    assert "30 log entries as 1 templates" in compressed
+    assert f"[30x] 2024-05-01 10:00:00..2024-05-01 10:00:29 [ERROR] com.app.Db - connection {WILDCARD} refused at {WILDCARD}" in compressed
+
+
+def test_short_or_unique_logs_are_left_alone():
+    assert compress_log("just one line") == "just one line"
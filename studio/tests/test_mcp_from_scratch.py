@@ -0,0 +1,43 @@
+import json
+
+import httpx
+
+
+def test_json_rpc_batches_and_notifications(doc_server):
+    url, _ = doc_server
+    with httpx.Client() as client:
+        batch = [
+            {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+            {"jsonrpc": "2.0", "method": "notifications/initialized"},
+            {"jsonrpc": "2.0", "id": 2, "method": "tools/call",
+             "params": {"name": "read_document_with_mcp", "arguments": {"layer": "backend"}}},
+        ]
+        response = client.post(url, json=batch)
+        assert response.status_code == 200
+        first, second = response.json()
+        assert first["result"]["serverInfo"]["name"] == "aiworkshop-mcp-server"
+        assert json.loads(second["result"]["content"][0]["text"]) == "# Backend\n"
+
+        # only notifications: nothing to answer
+        response = client.post(url, json={"jsonrpc": "2.0", "method": "notifications/initialized"})
+        assert response.status_code == 202 and response.content == b""
+
+        response = client.post(url, content=b"{not json")
+        assert response.status_code == 400 and response.json()["error"]["code"] == -32700
+        assert client.get(url).status_code == 405
+
+
+def test_doc_routes_use_etags_and_gzip(doc_server):
+    url, root = doc_server
+    base = url[: -len("/mcp")]
+    (root / "big.md").write_text("# Big\n" + "line\n" * 1000, encoding="utf-8")
+    with httpx.Client() as client:
+        assert [d["name"] for d in client.get(f"{base}/docs").json()] == ["backend", "big"]
+        # httpx decodes the gzip body transparently
+        response = client.get(f"{base}/docs/big", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip" and response.text.startswith("# Big")
+        assert "content-encoding" not in client.get(f"{base}/docs/backend").headers
+        etag = response.headers["etag"]
+        response = client.get(f"{base}/docs/big", headers={"If-None-Match": etag})
+        assert response.status_code == 304 and response.content == b""
+        assert client.get(f"{base}/docs/missing").status_code == 404
@@ -0,0 +1,22 @@
+import asyncio
+
+import mcp_server
+from doc_registry import DocRegistry
+
+
+def test_list_tools_reflects_docs_added_after_import(tmp_path, monkeypatch):
+    (tmp_path / "frontend.md").write_text("# Frontend\n", encoding="utf-8")
+    registry = DocRegistry(roots=[str(tmp_path)], min_interval=0)
+    monkeypatch.setattr(mcp_server, "registry", registry)
+
+    def layer_enum():
+        (tool,) = [t for t in asyncio.run(mcp_server.mcp.list_tools()) if t.name == mcp_server.DOC_TOOL]
+        return tool.description, tool.inputSchema["properties"]["layer"]["enum"]
+
+    description, enum = layer_enum()
+    assert enum == ["frontend"] and '"frontend"' in description
+
+    (tmp_path / "backend.md").write_text("# Backend\n", encoding="utf-8")
+    description, enum = layer_enum()
+    assert sorted(enum) == ["backend", "frontend"] and '"backend"' in description
+    assert mcp_server.read_document_with_mcp("backend") == "# Backend\n"
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import os
+import time
+
+from langchain_core.runnables import RunnableLambda
+
+import profiling
+from profiling import RunProfile, profiled, profiling_enabled, run_profile
+
+CONFIG = {"configurable": {"profile": True, "thread_id": "t1"}, "metadata": {"run_id": "r1"}}
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def busy_node(state: dict):
+    spin(0.05)
+    return {"n": state["n"] + 1}
+
+
+async def waiting_child():
+    await asyncio.sleep(0.05)
+
+
+async def async_node(state: dict, config):
+    await asyncio.gather(waiting_child(), waiting_child())
+    return {"n": state["n"] + 1}
+
+
+def test_flag_parsing():
+    assert profiling_enabled(CONFIG)
+    assert profiling_enabled({"configurable": {"profile": "yes"}})
+    assert not profiling_enabled({"configurable": {}}) and not profiling_enabled(None)
+
+
+def test_disabled_runs_are_not_sampled():
+    wrapper = profiled(busy_node, "busy")
+    assert wrapper.__annotations__ == {"state": dict}
+    assert wrapper({"n": 1}, {"configurable": {"thread_id": "off"}}) == {"n": 2}
+    assert ("off", "local") not in profiling._runs
+
+
+def test_sync_node_stacks_are_sampled_and_written():
+    assert profiled(busy_node, "busy")({"n": 1}, CONFIG) == {"n": 2}
+    profile = run_profile(CONFIG)
+    collapsed = profile.collapsed()
+    assert any(line.startswith("node:busy;busy_node") and "spin (" in line for line in collapsed.splitlines())
+    base = os.path.join(profiling.PROFILE_DIR, "t1_r1")
+    with open(f"{base}.speedscope.json", encoding="utf-8") as file:
+        assert json.load(file)["profiles"][0]["type"] == "sampled"
+
+
+def test_async_node_is_followed_into_gathered_tasks():
+    config = {**CONFIG, "metadata": {"run_id": "r2"}}
+    assert asyncio.run(profiled(async_node, "gather")({"n": 1}, config)) == {"n": 2}
+    stacks = list(run_profile(config).weights)
+    assert any(stack[0] == "node:gather" and any("waiting_child" in f for f in stack) for stack in stacks)
+
+
+def test_runnable_nodes_are_wrapped():
+    node = profiled(RunnableLambda(busy_node, name="lambda"))
+    config = {**CONFIG, "metadata": {"run_id": "r3"}}
+    assert node.invoke({"n": 1}, config) == {"n": 2}
+    assert asyncio.run(node.ainvoke({"n": 1}, config)) == {"n": 2}
+    assert any(stack[0] == "node:lambda" for stack in run_profile(config).weights)
+
+
+def test_speedscope_export_and_run_limit(monkeypatch):
+    profile = RunProfile("t/1", "r")
+    profile.add(("node:a", "f"), 0.5)
+    profile.add(("node:a", "g"), 0.25)
+    assert profile.name == "t_1_r"
+    assert profile.collapsed() == "node:a;f 500000\nnode:a;g 250000\n"
+    data = profile.speedscope()
+    assert [f["name"] for f in data["shared"]["frames"]] == ["node:a", "f", "g"]
+    assert data["profiles"][0]["samples"] == [[0, 1], [0, 2]] and data["profiles"][0]["endValue"] == 0.75
+
+    monkeypatch.setattr(profiling, "MAX_RUNS", 2)
+    for i in range(3):
+        run_profile({"configurable": {"thread_id": "lru", "run_id": str(i)}})
+    assert ("lru", "0") not in profiling._runs and ("lru", "2") in profiling._runs
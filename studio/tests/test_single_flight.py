@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.tools import StructuredTool
+
+from single_flight import SingleFlight, coalesce_tool, invoke, request_key
+
+
+def test_concurrent_sync_calls_share_one_leader():
+    group, calls, gate = SingleFlight("test"), [], threading.Event()
+
+    def fetch():
+        calls.append(1)
+        gate.wait(5)
+        return {"value": 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(group.do("k", fetch))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while group.coalesced < 4:
+        time.sleep(0.001)
+    gate.set()
+    for thread in threads:
+        thread.join()
+    assert calls == [1] and results == [{"value": 42}] * 5
+    # followers get copies, not the leader's object
+    assert len({id(r) for r in results}) == 5
+    assert group.stats == {"leaders": 1, "coalesced": 4, "in_flight": 0}
+    # nothing is cached once the leader is done
+    group.do("k", fetch)
+    assert len(calls) == 2
+
+
+def test_async_followers_get_the_leaders_exception():
+    group, calls = SingleFlight("test"), []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run():
+        return await asyncio.gather(*(group.ado("k", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert calls == [1] and all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_cancelled_follower_does_not_cancel_the_leader():
+    group = SingleFlight("test")
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.create_task(group.ado("k", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(group.ado("k", slow))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_cancelled_leader_hands_over_to_a_follower():
+    group, calls = SingleFlight("test"), []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def run():
+        leader = asyncio.create_task(group.ado("k", slow))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(group.ado("k", slow)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        results = await asyncio.gather(*followers)
+        assert group.stats["in_flight"] == 0
+        return results
+
+    assert asyncio.run(run()) == ["done", "done"]
+    # one of the followers became the new leader; the other waited for it
+    assert len(calls) == 2
+
+
+def test_request_key_depends_on_model_and_arguments():
+    class Model:
+        def model_dump(self):
+            return {"content": "hi"}
+
+    assert request_key("llm", [Model()], {"a": 1, "b": 2}) == request_key("llm", [Model()], {"b": 2, "a": 1})
+    assert request_key("llm", "m1", "x") != request_key("llm", "m2", "x")
+
+
+def test_invoke_uses_fn_once_for_a_group():
+    group, seen = SingleFlight("test"), []
+
+    class Model:
+        def invoke(self, messages):
+            seen.append(messages)
+            return "answer"
+
+    assert invoke(group, Model(), ["hi"]) == "answer" and seen == [["hi"]]
+    assert invoke(group, Model(), ["hi"], fn=lambda: "custom") == "custom"
+
+
+def test_coalesced_tool_ignores_runtime_and_keeps_schema():
+    calls = []
+
+    async def lookup(layer: str, runtime=None) -> str:
+        """Looks up a doc."""
+        calls.append((layer, runtime))
+        await asyncio.sleep(0.01)
+        return f"doc {layer}"
+
+    tool = StructuredTool.from_function(coroutine=lookup, name="lookup")
+    coalesced = coalesce_tool(tool, SingleFlight("tool"))
+    assert coalesced.args == tool.args and coalesced.description == tool.description
+
+    async def run():
+        return await asyncio.gather(*(coalesced.coroutine(layer="a", runtime=i) for i in range(3)))
+
+    assert asyncio.run(run()) == ["doc a"] * 3
+    assert len(calls) == 1
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+from langgraph.store.memory import InMemoryStore
+
+import sqlite_store
+from sqlite_store import SQLiteStore, decode_namespace, encode_namespace, index_from_env
+
+WORDS = ["coffee", "tea", "cart", "payment", "stock"]
+
+
+def embed(texts):
+    # bag of words over a tiny vocabulary
+    return [[float(text.count(w)) + 0.01 * i for i, w in enumerate(WORDS)] for text in texts]
+
+
+INDEX = {"dims": len(WORDS), "embed": embed, "fields": ["text"]}
+
+
+def fill(store):
+    store.put(("users", "alice"), "1", {"text": "coffee coffee cart", "n": 1})
+    store.put(("users", "alice"), "2", {"text": "tea payment", "n": 2})
+    store.put(("users", "bob"), "1", {"text": "stock stock stock", "n": 3})
+    store.put(("usersx",), "1", {"text": "coffee", "n": 4})
+    store.put(("users", "bob"), "2", {"text": "no words", "n": 5}, index=False)
+
+
+def test_namespace_encoding():
+    assert decode_namespace(encode_namespace(("a", "b"))) == ("a", "b")
+
+
+def test_matches_in_memory_store(tmp_path):
+    memory, local = InMemoryStore(index=INDEX), SQLiteStore(str(tmp_path / "s.db"), index=INDEX)
+    for store in (memory, local):
+        fill(store)
+
+    def summary(items):
+        return [(i.namespace, i.key, i.value["n"]) for i in items]
+
+    assert local.get(("users", "alice"), "2").value == {"text": "tea payment", "n": 2}
+    assert local.get(("users", "alice"), "3") is None
+    for kwargs in [
+        {"namespace_prefix": ("users",)},
+        {"namespace_prefix": ("users", "bob")},
+        {"namespace_prefix": ("users",), "filter": {"n": {"$gte": 3}}},
+        {"namespace_prefix": ("users",), "query": "coffee", "limit": 2},
+        {"namespace_prefix": ("users",), "query": "stock", "limit": 10},
+    ]:
+        prefix = kwargs.pop("namespace_prefix")
+        expected, actual = memory.search(prefix, **kwargs), local.search(prefix, **kwargs)
+        key = (lambda i: (i.namespace, i.key)) if "query" not in kwargs else None
+        assert summary(sorted(actual, key=key) if key else actual) == summary(sorted(expected, key=key) if key else expected)
+    # ("usersx",) is not under ("users",)
+    assert ("usersx",) not in [i.namespace for i in local.search(("users",), limit=100)]
+    assert local.list_namespaces(prefix=("users",)) == memory.list_namespaces(prefix=("users",))
+    assert local.list_namespaces(max_depth=1) == memory.list_namespaces(max_depth=1)
+    local.close()
+
+
+def test_reopen_keeps_items_vectors_and_created_at(tmp_path):
+    path = str(tmp_path / "s.db")
+    store = SQLiteStore(path, index=INDEX)
+    fill(store)
+    created = store.get(("users", "alice"), "1").created_at
+    store.put(("users", "alice"), "1", {"text": "payment", "n": 6})
+    store.delete(("users", "bob"), "1")
+    store.close()
+
+    store = SQLiteStore(path, index=INDEX)
+    item = store.get(("users", "alice"), "1")
+    assert item.value["n"] == 6 and item.created_at == created
+    assert store.get(("users", "bob"), "1") is None
+    assert store.search(("users",), query="payment", limit=1)[0].key in ("1", "2")
+    assert "stock" not in [i.value["text"] for i in store.search(("users",), query="stock", limit=1)]
+    store.close()
+    with pytest.raises(ValueError, match="5-dimensional"):
+        SQLiteStore(path, index={**INDEX, "dims": 3})
+
+
+def test_async_batch(tmp_path):
+    store = SQLiteStore(str(tmp_path / "s.db"), index=INDEX)
+
+    async def run():
+        await store.aput(("a",), "k", {"text": "tea"})
+        return await store.asearch(("a",), query="tea")
+
+    assert [i.key for i in asyncio.run(run())] == ["k"]
+    store.close()
+
+
+def test_index_from_env(monkeypatch):
+    monkeypatch.delenv("STORE_INDEX_EMBED", raising=False)
+    assert index_from_env() is None
+    monkeypatch.setenv("STORE_INDEX_EMBED", "openai:text-embedding-3-small")
+    monkeypatch.delenv("STORE_INDEX_DIMS", raising=False)
+    with pytest.raises(ValueError):
+        index_from_env()
+    monkeypatch.setenv("STORE_INDEX_DIMS", "1536")
+    monkeypatch.setenv("STORE_INDEX_FIELDS", "text, summary")
+    assert index_from_env() == {"embed": "openai:text-embedding-3-small", "dims": 1536, "fields": ["text", "summary"]}
+
+
+def test_generate_store_without_index(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORE_DB_PATH", str(tmp_path / "s.db"))
+    monkeypatch.delenv("STORE_INDEX_EMBED", raising=False)
+
+    async def run():
+        async with sqlite_store.generate_store() as store:
+            await store.aput(("a",), "k", {"text": "tea"})
+            assert store.index_config is None
+            return await store.asearch(("a",), query="tea")
+
+    assert [i.score for i in asyncio.run(run())] == [None]
+
+
+def test_rolled_back_batch_keeps_the_old_vectors(tmp_path):
+    store = SQLiteStore(str(tmp_path / "s.db"), index=INDEX)
+    store.put(("docs",), "1", {"text": "coffee"})
+    store.put(("docs",), "2", {"text": "tea"})
+    store.delete(("docs",), "2")
+
+    class Boom:
+        pass
+
+    ops = [sqlite_store.PutOp(("docs",), "1", {"text": "stock"}), Boom()]
+    with pytest.raises(ValueError):
+        store.batch(ops)
+    assert store.get(("docs",), "1").value == {"text": "coffee"}
+    assert store.search(("docs",), query="coffee")[0].score > 0.99
+    # the slot freed before the batch is reused, the rolled back one is not
+    store.put(("docs",), "3", {"text": "cart"})
+    assert store.search(("docs",), query="coffee")[0].key == "1"
+    assert store.search(("docs",), query="coffee")[0].score > 0.99
+    assert store.stats()["vectors"] == 2
+    store.close()
@@ -0,0 +1,48 @@
+from langchain_core.tools import StructuredTool
+
+from tool_cache import ToolSpecCache
+
+
+def add(a: int, b: int) -> int:
+    """Adds a and b."""
+    return a + b
+
+
+class FakeModel:
+    def __init__(self):
+        self.binds = []
+
+    def bind_tools(self, tools, **kwargs):
+        self.binds.append((tools, kwargs))
+        return ("bound", len(self.binds))
+
+
+def test_bound_model_is_reused_until_a_schema_changes():
+    cache, model = ToolSpecCache(), FakeModel()
+    tool = StructuredTool.from_function(add)
+    first = cache.bound_model(model, [tool])
+    assert cache.bound_model(model, [tool]) is first
+    assert model.binds[0][0][0]["function"]["name"] == "add"
+
+    tool.description = "Adds two integers."
+    assert cache.bound_model(model, [tool]) != first
+    assert model.binds[-1][0][0]["function"]["description"] == "Adds two integers."
+    assert cache.bound_model(model, [tool], tool_choice="add") != cache.bound_model(model, [tool])
+    assert cache.stats == {"spec_hits": 1, "spec_misses": 2, "bound_hits": 2, "bound_misses": 3}
+
+
+def test_strict_binding_passes_the_tools_through():
+    cache, model = ToolSpecCache(), FakeModel()
+    tool = StructuredTool.from_function(add)
+    cache.bound_model(model, [tool], strict=True)
+    assert model.binds == [([tool], {"strict": True})]
+
+
+def test_caches_are_bounded():
+    cache, model = ToolSpecCache(max_specs=2, max_bound=2), FakeModel()
+    tools = [StructuredTool.from_function(add, name=f"add{i}") for i in range(3)]
+    for tool in tools:
+        cache.bound_model(model, [tool])
+    assert len(cache._specs) == 2 and len(cache._bound) == 2
+    cache.clear()
+    assert not cache._specs and not cache._bound
@@ -0,0 +1,55 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from tool_executor import ProcessToolExecutor, ToolTimeoutError, cpu_bound, offload_cpu_bound
+
+
+def add(a: int, b: int) -> int:
+    """Adds a and b."""
+    return a + b
+
+
+@cpu_bound
+def worker_pid(n: int) -> int:
+    """Process id of the worker that ran the call."""
+    return os.getpid() + n * 0
+
+
+@cpu_bound(timeout=0.5)
+def sleep_for(seconds: float) -> float:
+    """Sleeps, standing in for a runaway computation."""
+    time.sleep(seconds)
+    return seconds
+
+
+@pytest.fixture
+def pool():
+    executor = ProcessToolExecutor(max_workers=2)
+    yield executor
+    if executor._pool is not None:
+        executor._pool.shutdown(cancel_futures=True)
+
+
+def test_unmarked_tools_start_no_pool(pool):
+    assert offload_cpu_bound([add], pool) == [add]
+    assert pool._pool is None and not pool.warm_start
+
+
+def test_marked_tool_runs_in_a_worker_with_the_same_schema(pool):
+    plain, offloaded = offload_cpu_bound([add, worker_pid], pool)
+    assert plain is add and pool.warm_start
+    assert offloaded.name == "worker_pid" and offloaded.args == {"n": {"title": "N", "type": "integer"}}
+    assert offloaded.invoke({"n": 1}) != os.getpid()
+    assert asyncio.run(offloaded.ainvoke({"n": 1})) != os.getpid()
+
+
+def test_timeout_restarts_the_pool(pool):
+    (offloaded,) = offload_cpu_bound([sleep_for], pool)
+    first = pool.pool()
+    with pytest.raises(ToolTimeoutError):
+        offloaded.invoke({"seconds": 5})
+    assert pool.pool() is not first
+    assert offloaded.invoke({"seconds": 0}) == 0
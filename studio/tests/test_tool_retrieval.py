@@ -0,0 +1,52 @@
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import StructuredTool
+
+from tool_retrieval import ToolRetriever, called_tools, retriever_for
+
+
+def make_tool(name, description):
+    def run(query: str) -> str:
+        return query
+
+    return StructuredTool.from_function(run, name=name, description=description)
+
+
+TOOLS = [
+    make_tool("microsoft_docs_search", "Search Microsoft Learn documentation for Azure and .NET"),
+    make_tool("aws_docs_search", "Search AWS documentation for S3, Lambda and EC2"),
+    make_tool("read_document_with_mcp", "Read the frontend or backend architecture document"),
+    make_tool("weather", "Current weather for a city"),
+]
+
+
+def names(tools):
+    return [t.name for t in tools]
+
+
+def test_select_keeps_the_best_matches_in_original_order():
+    retriever = ToolRetriever(TOOLS)
+    assert names(retriever.select("How do I configure an S3 bucket lambda trigger on AWS?", 1)) == ["aws_docs_search"]
+    assert names(retriever.select("azure or aws documentation", 2)) == ["microsoft_docs_search", "aws_docs_search"]
+
+
+def test_select_falls_back_to_every_tool():
+    retriever = ToolRetriever(TOOLS)
+    assert retriever.select("zzz qqq", 2) == TOOLS
+    assert retriever.select("aws", 0) == TOOLS
+    assert retriever.select("aws", 4) == TOOLS
+
+
+def test_called_tools_are_always_kept():
+    messages = [
+        HumanMessage(content="weather?"),
+        AIMessage(content="", tool_calls=[{"name": "weather", "args": {"query": "Paris"}, "id": "1"}]),
+    ]
+    assert called_tools(messages) == ["weather"]
+    selected = ToolRetriever(TOOLS).select("backend architecture document", 1, called_tools(messages))
+    assert names(selected) == ["read_document_with_mcp", "weather"]
+
+
+def test_retriever_is_shared_per_tool_list():
+    first = retriever_for(TOOLS)
+    assert retriever_for(TOOLS) is first
+    assert retriever_for(TOOLS[:2]) is not first
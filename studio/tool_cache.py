@@ -0,0 +1,110 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Sequence, Tuple
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+MAX_SPECS = 1024
+MAX_BOUND = 256
+
+
+def schema_hash(tool) -> str:
+    """Hash of what goes into a tool spec: name, description and args schema."""
+    schema = getattr(tool, "args_schema", None)
+    if schema is not None and not isinstance(schema, dict):
+        # Pydantic schema classes are immutable once defined; identity is enough
+        schema = f"{schema.__module__}.{schema.__qualname__}:{id(schema)}"
+    payload = json.dumps(
+        [getattr(tool, "name", None), getattr(tool, "description", None), schema],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+class ToolSpecCache:
+    """Memoised tool specs and tool-bound models.
+
+    Specs are keyed by tool identity and schema hash, so an MCP tool whose
+    schema changes (same object, new `args_schema`) is converted again.
+    Bound models are keyed by the model, the tool keys and the bind
+    arguments and shared across nodes and threads. Both caches are LRU
+    bounded and hold strong references to their keys' objects so ids
+    cannot be reused while cached.
+    """
+
+    def __init__(self, max_specs: int = MAX_SPECS, max_bound: int = MAX_BOUND):
+        self.max_specs = max_specs
+        self.max_bound = max_bound
+        self._specs: "OrderedDict[Tuple[int, str], Tuple[Any, Dict]]" = OrderedDict()
+        self._hashes: "OrderedDict[tuple, str]" = OrderedDict()
+        self._bound: "OrderedDict[Hashable, Tuple[Any, Sequence, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"spec_hits": 0, "spec_misses": 0, "bound_hits": 0, "bound_misses": 0}
+
+    def _key(self, tool) -> Tuple[int, str]:
+        if isinstance(tool, dict):
+            return id(tool), hashlib.sha1(json.dumps(tool, sort_keys=True, default=str).encode()).hexdigest()
+        # Hash each schema once; replacing the schema, name or description re-hashes
+        ident = (id(tool), id(getattr(tool, "args_schema", None)), getattr(tool, "name", None),
+                 getattr(tool, "description", None))
+        digest = self._hashes.get(ident)
+        if digest is None:
+            digest = schema_hash(tool)
+            with self._lock:
+                self._hashes[ident] = digest
+                while len(self._hashes) > self.max_specs:
+                    self._hashes.popitem(last=False)
+        return id(tool), digest
+
+    def spec(self, tool, key=None) -> Dict:
+        """OpenAI-format spec of `tool`, converted once per schema."""
+        key = key or self._key(tool)
+        with self._lock:
+            cached = self._specs.get(key)
+            if cached is not None:
+                self._specs.move_to_end(key)
+                self.stats["spec_hits"] += 1
+                return cached[1]
+            self.stats["spec_misses"] += 1
+        spec = convert_to_openai_tool(tool)
+        with self._lock:
+            self._specs[key] = (tool, spec)
+            while len(self._specs) > self.max_specs:
+                self._specs.popitem(last=False)
+        return spec
+
+    def bound_model(self, llm, tools: Sequence, **kwargs):
+        """`llm.bind_tools(tools, **kwargs)`, reused while the tool schemas are unchanged."""
+        tool_keys = tuple(self._key(t) for t in tools)
+        key = (id(llm), tool_keys, json.dumps(kwargs, sort_keys=True, default=str))
+        with self._lock:
+            cached = self._bound.get(key)
+            if cached is not None:
+                self._bound.move_to_end(key)
+                self.stats["bound_hits"] += 1
+                return cached[2]
+            self.stats["bound_misses"] += 1
+        # `strict` changes the converted schema, so leave conversion to the model then
+        specs = list(tools) if "strict" in kwargs else [self.spec(t, k) for t, k in zip(tools, tool_keys)]
+        bound = llm.bind_tools(specs, **kwargs)
+        with self._lock:
+            self._bound[key] = (llm, list(tools), bound)
+            while len(self._bound) > self.max_bound:
+                self._bound.popitem(last=False)
+        return bound
+
+    def clear(self):
+        with self._lock:
+            self._specs.clear()
+            self._hashes.clear()
+            self._bound.clear()
+
+
+tool_cache = ToolSpecCache()
+
+
+def bound_model(llm, tools: Sequence, **kwargs):
+    return tool_cache.bound_model(llm, tools, **kwargs)
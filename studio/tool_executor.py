@@ -0,0 +1,138 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = float(os.environ.get("CPU_TOOL_TIMEOUT") or 30)
+
+
+class ToolTimeoutError(TimeoutError):
+    """A CPU-bound tool exceeded its per-call timeout."""
+
+
+def cpu_bound(fn: Optional[Callable] = None, *, timeout: Optional[float] = None):
+    """Mark a tool function to run in the worker process pool.
+
+    The function must be defined at module level so it pickles by
+    reference; only its arguments and result cross the process boundary.
+    """
+
+    def mark(f):
+        f.__cpu_bound__ = True
+        f.__cpu_timeout__ = timeout
+        return f
+
+    return mark(fn) if fn is not None else mark
+
+
+def _noop():
+    return None
+
+
+class ProcessToolExecutor:
+    """Process pool that runs CPU-bound tools off the GIL.
+
+    No worker is started until a graph offloads a `@cpu_bound` tool
+    (`warm()`) or a call needs one. A call that exceeds its timeout
+    terminates every worker of the pool (ProcessPoolExecutor can't kill a
+    single worker) and a fresh pool is started; calls sharing the killed
+    pool fail with BrokenProcessPool.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, default_timeout: float = DEFAULT_TIMEOUT):
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.default_timeout = default_timeout
+        self.warm_start = False
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+                if self.warm_start:
+                    # Start all workers now so the first tool call doesn't pay for it
+                    for _ in range(self.max_workers):
+                        self._pool.submit(_noop)
+            return self._pool
+
+    def warm(self):
+        """Start the workers ahead of the first call, and again after a restart."""
+        self.warm_start = True
+        self.pool()
+
+    def _kill(self, pool: ProcessPoolExecutor):
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        logger.warning("Terminated tool worker pool after a timeout")
+
+    def run(self, fn: Callable, args: tuple = (), kwargs: Optional[dict] = None, timeout: Optional[float] = None):
+        pool = self.pool()
+        future = pool.submit(fn, *args, **(kwargs or {}))
+        timeout = timeout or self.default_timeout
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            self._kill(pool)
+            raise ToolTimeoutError(f"Tool {fn.__name__} timed out after {timeout}s")
+        except BrokenProcessPool:
+            self._kill(pool)
+            raise
+
+    async def arun(self, fn: Callable, args: tuple = (), kwargs: Optional[dict] = None, timeout: Optional[float] = None):
+        pool = self.pool()
+        future = asyncio.wrap_future(pool.submit(fn, *args, **(kwargs or {})))
+        timeout = timeout or self.default_timeout
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._kill(pool)
+            raise ToolTimeoutError(f"Tool {fn.__name__} timed out after {timeout}s")
+        except BrokenProcessPool:
+            self._kill(pool)
+            raise
+
+
+executor = ProcessToolExecutor()
+
+
+def _offloaded(fn: Callable, pool: ProcessToolExecutor):
+    from langchain_core.tools import StructuredTool
+
+    timeout = fn.__cpu_timeout__
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        return pool.run(fn, args, kwargs, timeout)
+
+    @functools.wraps(fn)
+    async def arun(*args, **kwargs):
+        return await pool.arun(fn, args, kwargs, timeout)
+
+    return StructuredTool.from_function(func=run, coroutine=arun)
+
+
+def offload_cpu_bound(tools: List, pool: Optional[ProcessToolExecutor] = None) -> List:
+    """Return `tools` with `@cpu_bound` functions routed to the process pool.
+
+    Unmarked (trivial) tools are returned unchanged and keep running
+    in-process; the pool is only started when a tool is marked. The
+    wrappers keep the original signature and docstring, so the generated
+    tool schemas are identical.
+    """
+    pool = pool or executor
+    marked = [getattr(fn, "__cpu_bound__", False) for fn in tools]
+    if any(marked):
+        pool.warm()
+    return [_offloaded(fn, pool) if cpu else fn for fn, cpu in zip(tools, marked)]
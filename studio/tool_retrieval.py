@@ -0,0 +1,92 @@
+import logging
+import math
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence
+
+from doc_prefetch import tokenize
+
+logger = logging.getLogger(__name__)
+
+
+def tool_text(tool) -> str:
+    """Searchable text of a tool: name, description and argument docs."""
+    parts = [tool.name.replace("_", " ").replace("-", " ").replace(".", " "), tool.description or ""]
+    for arg, spec in tool.args.items():
+        parts.append(arg.replace("_", " "))
+        if isinstance(spec, dict):
+            parts.append(str(spec.get("description", "")))
+    return "\n".join(parts)
+
+
+class ToolRetriever:
+    """BM25 index over tool names and descriptions.
+
+    Built once per tool list; `select` scores a question against every
+    tool with a few dict lookups and returns the top `k`, keeping the
+    original tool order so the same subset always maps to the same bound
+    model. Tools the conversation already called are always kept.
+    """
+
+    def __init__(self, tools: Sequence, k1: float = 1.2, b: float = 0.75):
+        self.tools = list(tools)
+        self.k1 = k1
+        self.b = b
+        self._terms: List[Counter] = [Counter(tokenize(tool_text(t))) for t in self.tools]
+        self._lengths = [sum(terms.values()) for terms in self._terms]
+        self._avg_length = sum(self._lengths) / max(len(self._lengths), 1) or 1.0
+        df = Counter(t for terms in self._terms for t in terms)
+        n = len(self.tools)
+        self._idf = {t: math.log(1 + (n - c + 0.5) / (c + 0.5)) for t, c in df.items()}
+
+    def scores(self, text: str) -> List[float]:
+        tokens = set(tokenize(text))
+        scores = []
+        for terms, length in zip(self._terms, self._lengths):
+            score = 0.0
+            for token in tokens:
+                tf = terms.get(token)
+                if tf:
+                    norm = tf + self.k1 * (1 - self.b + self.b * length / self._avg_length)
+                    score += self._idf[token] * tf * (self.k1 + 1) / norm
+            scores.append(score)
+        return scores
+
+    def select(self, text: str, k: int, always: Iterable[str] = ()) -> List:
+        """Top-`k` tools for `text` plus the named `always` tools.
+
+        Falls back to every tool when `k` covers them all or nothing in
+        the question matches any tool.
+        """
+        if k <= 0 or k >= len(self.tools):
+            return self.tools
+        scores = self.scores(text)
+        if not any(scores):
+            return self.tools
+        ranked = sorted(range(len(self.tools)), key=lambda i: -scores[i])[:k]
+        keep = {i for i in ranked if scores[i] > 0}
+        always = set(always)
+        keep.update(i for i, t in enumerate(self.tools) if t.name in always)
+        selected = [self.tools[i] for i in sorted(keep)]
+        logger.debug(f"Selected tools {[t.name for t in selected]} of {len(self.tools)}")
+        return selected
+
+
+_retrievers: Dict[tuple, ToolRetriever] = {}
+_lock = threading.Lock()
+
+
+def retriever_for(tools: Sequence) -> ToolRetriever:
+    """Shared retriever for a tool list, rebuilt when the list changes."""
+    key = tuple(id(t) for t in tools)
+    with _lock:
+        retriever = _retrievers.get(key)
+        if retriever is None:
+            _retrievers.clear()
+            retriever = _retrievers[key] = ToolRetriever(tools)
+        return retriever
+
+
+def called_tools(messages) -> List[str]:
+    """Names of the tools already called in the conversation."""
+    return [call["name"] for m in messages for call in (getattr(m, "tool_calls", None) or [])]